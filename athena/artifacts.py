@@ -0,0 +1,104 @@
+import logging
+import os
+from io import BytesIO
+from typing import Dict, List, NamedTuple, Optional
+
+from PIL import Image
+
+log = logging.getLogger(__name__)
+
+# Upload limit of a Discord guild without boosts
+DISCORD_UPLOAD_LIMIT = 8 * 1024 * 1024
+# JPEG qualities tried in order until the image fits into the limit
+JPEG_QUALITIES = (90, 80, 70, 60)
+THUMBNAIL_WIDTH = 1024
+
+
+class ShopArtifact(NamedTuple):
+    filename: str
+    data: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+class ShopArtifacts:
+    """
+    Encoded variants of one Item Shop image, largest first: the full PNG,
+    a JPEG that fits into the Discord upload limit and a small thumbnail.
+
+    ``url`` is the Discord attachment URL of a variant once it has been
+    uploaded, so the image is not uploaded again for every request.
+    """
+
+    def __init__(self, full: ShopArtifact, compressed: ShopArtifact, thumbnail: ShopArtifact):
+        self.full = full
+        self.compressed = compressed
+        self.thumbnail = thumbnail
+        self.url: Optional[str] = None
+
+    def __iter__(self):
+        return iter((self.full, self.compressed, self.thumbnail))
+
+    @property
+    def sizes(self) -> Dict[str, int]:
+        return {artifact.filename: artifact.size for artifact in self}
+
+    def Pick(self, limit: int = DISCORD_UPLOAD_LIMIT) -> ShopArtifact:
+        """Return the largest variant that can be uploaded within the limit, the thumbnail if none can."""
+
+        for artifact in self:
+            if artifact.size <= limit:
+                return artifact
+
+        return self.thumbnail
+
+    @classmethod
+    def Encode(cls, png: bytes, raster: Image.Image, limit: int = DISCORD_UPLOAD_LIMIT):
+        """Return the variants of the already encoded PNG and its RGB raster."""
+
+        compressed = None
+        for quality in JPEG_QUALITIES:
+            buffer = BytesIO()
+            raster.save(buffer, format="JPEG", optimize=True, quality=quality)
+            compressed = buffer.getvalue()
+            if len(compressed) <= limit:
+                break
+        else:
+            log.warning(f"Item Shop JPEG is {len(compressed)} bytes even at quality {quality}")
+
+        thumbnail = raster.resize(
+            (THUMBNAIL_WIDTH, round(raster.height * THUMBNAIL_WIDTH / raster.width)), Image.ANTIALIAS
+        )
+        buffer = BytesIO()
+        thumbnail.save(buffer, format="JPEG", optimize=True, quality=85)
+
+        return cls(
+            ShopArtifact("itemshop.png", png),
+            ShopArtifact("itemshop.jpg", compressed),
+            ShopArtifact("itemshop_thumbnail.jpg", buffer.getvalue()),
+        )
+
+    def Save(self, directory: str = "athena/"):
+        """Write every variant into the directory, each file is replaced when complete."""
+
+        for artifact in self:
+            path = os.path.join(directory, artifact.filename)
+            with open(f"{path}.tmp", "wb") as file:
+                file.write(artifact.data)
+            os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def Load(cls, directory: str = "athena/"):
+        """Return the variants saved by an earlier render, None if any of them is missing."""
+
+        artifacts: List[ShopArtifact] = []
+        for filename in ("itemshop.png", "itemshop.jpg", "itemshop_thumbnail.jpg"):
+            try:
+                with open(os.path.join(directory, filename), "rb") as file:
+                    artifacts.append(ShopArtifact(filename, file.read()))
+            except FileNotFoundError:
+                return None
+
+        return cls(*artifacts)
@@ -0,0 +1,139 @@
+import logging
+import os
+import struct
+import zlib
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+from .artifacts import ShopArtifacts
+
+log = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG row filter "Up", every byte is stored as the difference to the byte above
+PNG_FILTER_UP = b"\x02"
+
+
+def png_chunk(kind: bytes, data: bytes = b"") -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+class ShopAssembler:
+    """
+    Assembles the Item Shop image one horizontal strip at a time.
+
+    The background is resized and the cards are pasted per strip, and every
+    strip goes straight into the PNG stream and into the RGB raster of the
+    JPEG, so no full size RGBA canvas exists and the PNG is never read back.
+    The JPEG raster is the only buffer that grows with the shop, libjpeg
+    (through Pillow) needs the whole image to encode.
+    """
+
+    def __init__(self, width: int, height: int, background: str,
+                 directory: str = "athena/assets/images/", stripHeight: int = 530):
+        self.width = width
+        self.height = height
+        self.background = f"{directory}{background}"
+        self.stripHeight = stripHeight
+        self.cards: List[Tuple[Image.Image, int, int]] = []
+
+    def Paste(self, card: Image.Image, position: Tuple[int, int]):
+        """Place the card with its top left corner at the provided position."""
+
+        self.cards.append((card, *position))
+
+    def BackgroundSource(self) -> Optional[Tuple[Image.Image, int, int]]:
+        """
+        Return the background template with its size when resized to cover the image, None if it is missing.
+
+        The template is decoded for every image instead of being kept in the
+        image assets, it is larger than all the cards of a shop together.
+        """
+
+        try:
+            source = Image.open(self.background)
+            source.load()
+        except FileNotFoundError:
+            log.warning(
+                f"Failed to open {os.path.basename(self.background)}, defaulting to dark gray")
+            return None
+
+        ratio = max(self.width / source.width, self.height / source.height)
+        return source, int(source.width * ratio), int(source.height * ratio)
+
+    def Strips(self):
+        """Yield the top and the RGBA image of every strip, from the top of the image down."""
+
+        background = self.BackgroundSource()
+
+        for top in range(0, self.height, self.stripHeight):
+            bottom = min(top + self.stripHeight, self.height)
+            strip = Image.new("RGBA", (self.width, bottom - top))
+
+            if background is None:
+                strip.paste((34, 37, 40), [0, 0, strip.width, strip.height])
+            else:
+                source, width, height = background
+                if top < height:
+                    # The rows of the background resized as a whole that fall into this strip
+                    end = min(bottom, height)
+                    scale = source.height / height
+                    layer = source.resize(
+                        (width, end - top), Image.ANTIALIAS,
+                        box=(0, top * scale, source.width, end * scale),
+                    )
+                    strip.paste(layer, (int(self.width / 2) - int(width / 2), 0))
+
+            for card, x, y in self.cards:
+                if y < bottom and y + card.height > top:
+                    strip.paste(card, (x, y - top), card)
+
+            yield top, strip
+
+        if background is not None:
+            background[0].close()
+
+    def Encode(self) -> ShopArtifacts:
+        """Encode the image as PNG and JPEG variants in a single pass over the strips."""
+
+        raster = Image.new("RGB", (self.width, self.height))
+        compressor = zlib.compressobj(6)
+        # The row above the first row is all zeros
+        previous = Image.new("RGBA", (self.width, 1))
+        rowSize = self.width * 4
+
+        with BytesIO() as file:
+            file.write(PNG_SIGNATURE)
+            file.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)))
+
+            for top, strip in self.Strips():
+                above = Image.new("RGBA", strip.size)
+                above.paste(previous, (0, 0))
+                above.paste(strip.crop((0, 0, strip.width, strip.height - 1)), (0, 1))
+                filtered = ImageChops.subtract_modulo(strip, above).tobytes()
+
+                rows = b"".join(
+                    PNG_FILTER_UP + filtered[offset:offset + rowSize]
+                    for offset in range(0, len(filtered), rowSize)
+                )
+                data = compressor.compress(rows)
+                if data:
+                    file.write(png_chunk(b"IDAT", data))
+
+                previous = strip.crop((0, strip.height - 1, strip.width, strip.height))
+                raster.paste(strip.convert("RGB"), (0, top))
+
+            file.write(png_chunk(b"IDAT", compressor.flush()))
+            file.write(png_chunk(b"IEND"))
+            png = file.getvalue()
+
+        return ShopArtifacts.Encode(png, raster)
+
+    def Save(self, directory: str = "athena/") -> ShopArtifacts:
+        """Encode the image and write the variants into the directory, return the variants."""
+
+        artifacts = self.Encode()
+        artifacts.Save(directory)
+        return artifacts
@@ -7,11 +7,11 @@ from time import sleep
 
 import coloredlogs
 from PIL import Image, ImageDraw
-from util import ImageUtil, Utility
+
+from .assembler import ShopAssembler
+from .util import ImageUtil, Utility
 
 log = logging.getLogger(__name__)
-coloredlogs.install(
-    level="INFO", fmt="[%(asctime)s] %(message)s", datefmt="%d.%m.%Y %H:%M:%S")
 
 
 class Athena:
@@ -99,11 +99,15 @@ class Athena:
         else:
             return 100
 
-    def GenerateImage(self, date: str, itemShop: dict):
+    def GenerateImage(self, date: str, itemShop: dict, cards: dict = None):
         """
         Generate the Item Shop image using the provided Item Shop.
 
-        Return True if image sucessfully saved.
+        Optionally provide the pre-rendered cards (offer id: card),
+        otherwise every card is rendered here.
+
+        Return the encoded variants of the image (athena.artifacts.ShopArtifacts)
+        if it was sucessfully saved.
         """
 
         try:
@@ -136,38 +140,22 @@ class Athena:
         # Determine the max amount of rows required for the current
         # This allows us to determine the image height.
 
-        shopImage = Image.new("RGBA", (width, (530 * height) + cardStartY))
-
-        try:
-            background = ImageUtil.Open(self, f"monotonic_background.png")
-            background = ImageUtil.RatioResize(
-                self, background, shopImage.width, shopImage.height
-            )
-            shopImage.paste(
-                background, ImageUtil.CenterX(
-                    self, background.width, shopImage.width)
-            )
-        except FileNotFoundError:
-            log.warning(
-                "Failed to open background.png, defaulting to dark gray")
-            shopImage.paste(
-                (34, 37, 40), [0, 0, shopImage.size[0], shopImage.size[1]])
+        shopImage = ShopAssembler(width, (530 * height) + cardStartY, "monotonic_background.png")
 
 
         # Track grid position
         i = 0
 
         for item in shop_array:
-            card = Athena.GenerateCard(self, item)
+            card = Athena.Card(self, item, cards)
 
             if card is not None:
-                shopImage.paste(
+                shopImage.Paste(
                     card,
                     (
                         (20 + ((i % rows) * (310 + 20))),
                         (cardStartY + ((i // rows) * (510 + 20))),
                     ),
-                    card,
                 )
 
                 i += 1
@@ -176,18 +164,27 @@ class Athena:
         i = 0
 
         try:
-            shopImage.save("athena/itemshop.png")
-            shopImageJPG = Image.open('athena/itemshop.png')
-            shopImageJPG = shopImageJPG.convert("RGB")
-            shopImageJPG.save("athena/itemshop.jpg", optimize=True, quality=90)
-            log.info("Generated Item Shop image [png & jpg]")
+            artifacts = shopImage.Save("athena/")
+            log.info(f"Generated Item Shop image {artifacts.sizes}")
 
-            return True
+            return artifacts
         except Exception as e:
             log.critical(f"Failed to save Item Shop image, {e}")
 
-    def GenerateCard(self, item: dict):
-        """Return the card image for the provided Fortnite Item Shop item."""
+    def Card(self, item: dict, cards: dict = None):
+        """Return the pre-rendered card of the item if provided, otherwise render it."""
+
+        if cards is not None:
+            return cards.get(item["offerId"])
+
+        return Athena.GenerateCard(self, item)
+
+    def GenerateCard(self, item: dict, image: Image.Image = None):
+        """
+        Return the card image for the provided Fortnite Item Shop item.
+
+        Optionally provide the already downloaded icon, otherwise it is downloaded here.
+        """
 
         try:
             name = item["items"][0]["name"].lower()
@@ -254,7 +251,7 @@ class Athena:
             layer = ImageUtil.Open(self, "./shopTemplates/CommonBG.png")
         card.paste(layer)
 
-        icon = ImageUtil.Download(self, icon)
+        icon = ImageUtil.Download(self, icon) if image is None else image
         if (category == "outfit") or (category == "emote"):
             icon = ImageUtil.RatioResize(self, icon, 285, 365)
         elif category == "wrap":
@@ -278,8 +275,7 @@ class Athena:
 
         canvas = ImageDraw.Draw(card)
 
-        vbucks = ImageUtil.Open(self, "vbucks.png")
-        vbucks = ImageUtil.RatioResize(self, vbucks, 40, 40)
+        vbucks = ImageUtil.OpenResized(self, "vbucks.png", 40, 40)
 
         if date_diff.isdigit():
             font = ImageUtil.Font(self, 40)
@@ -302,8 +298,7 @@ class Athena:
             font = ImageUtil.Font(self, 30)
             new = 'НОВИНКА'
             textWidth, _ = font.getsize(new)
-            label = ImageUtil.Open(self, "label.png")
-            label = ImageUtil.RatioResize(self, label, 50, 50)
+            label = ImageUtil.OpenResized(self, "label.png", 50, 50)
             card.paste(label,ImageUtil.CenterX(self, 0, 0, 0),label)
             canvas.text(ImageUtil.CenterX(self, 10, 37, 7), new, (255, 255, 255), font=font)
 
@@ -333,6 +328,9 @@ class Athena:
 
 
 if __name__ == "__main__":
+    coloredlogs.install(
+        level="INFO", fmt="[%(asctime)s] %(message)s", datefmt="%d.%m.%Y %H:%M:%S")
+
     try:
         Athena.main(Athena)
 
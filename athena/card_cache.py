@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+from hashlib import sha1
+from threading import Lock
+from typing import Dict, Optional
+
+from PIL import Image
+
+log = logging.getLogger(__name__)
+
+
+class CardCache:
+    """
+    Rendered shop cards on disk, addressed by the hash of their Athena.CardKey.
+
+    A card that appeared in an earlier shop with the same icon, price,
+    rarity, name and days since it was last seen is read from here instead
+    of being downloaded and drawn again. Reading a card marks it as used;
+    the least recently used cards are deleted once the cards take more than
+    ``max_bytes``.
+
+    The methods do blocking file I/O and are called from executor threads.
+    """
+
+    def __init__(self, directory: str = "athena/cache/cards", max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # file name: size, in the order of the last use
+        self._files: Dict[str, int] = {}
+        entries = sorted(os.scandir(directory), key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if entry.name.endswith(".png"):
+                self._files[entry.name] = entry.stat().st_size
+        self._size = sum(self._files.values())
+        with self._lock:
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    @staticmethod
+    def filename(key: tuple) -> str:
+        return sha1(json.dumps(key, ensure_ascii=False).encode()).hexdigest() + ".png"
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def get(self, key: tuple) -> Optional[Image.Image]:
+        filename = self.filename(key)
+        with self._lock:
+            if filename not in self._files:
+                return None
+            self._files[filename] = self._files.pop(filename)
+
+        path = self._path(filename)
+        try:
+            card = Image.open(path)
+            card.load()
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            log.warning(f"Failed to read cached card {filename}, {e}")
+            self._forget(filename)
+            return None
+        return card
+
+    def put(self, key: tuple, card: Image.Image) -> None:
+        filename = self.filename(key)
+        path = self._path(filename)
+        temporary = f"{path}.tmp"
+        # Cards are small, fast compression is enough
+        card.save(temporary, format="PNG", compress_level=1)
+        os.replace(temporary, path)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            self._size += size - self._files.pop(filename, 0)
+            self._files[filename] = size
+            self._evict()
+
+    def _evict(self) -> None:
+        # The newest card is kept even if it alone is over the limit
+        while self._size > self.max_bytes and len(self._files) > 1:
+            oldest = next(iter(self._files))
+            self._size -= self._files.pop(oldest)
+            try:
+                os.remove(self._path(oldest))
+            except FileNotFoundError:
+                pass
+
+    def _forget(self, filename: str) -> None:
+        with self._lock:
+            self._size -= self._files.pop(filename, 0)
+        try:
+            os.remove(self._path(filename))
+        except FileNotFoundError:
+            pass
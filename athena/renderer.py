@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from . import athena_monotonic
+from .artifacts import ShopArtifacts
+from .athena import Athena
+from .card_cache import CardCache
+
+log = logging.getLogger(__name__)
+
+# Shops with more entries are drawn as one grid on the monotonic background
+MONOTONIC_THRESHOLD = 59
+DEFAULT_PROCESSES = 2
+# forkserver is not available on Windows
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def render_card(item: dict, icon: bytes) -> Optional[Tuple[str, Tuple[int, int], bytes]]:
+    """
+    Draws the card of the item in a worker process.
+    Returns the raw card, images are not picklable.
+    """
+    image = Image.open(BytesIO(icon)).convert("RGBA")
+    card = Athena.GenerateCard(Athena, item, image)
+    if card is None:
+        return None
+    return card.mode, card.size, card.tobytes()
+
+
+class ShopRenderer():
+    """
+    Renders the Item Shop image from the combined shop of fortnite-api.com
+    that the caller already downloaded.
+
+    Icons are downloaded concurrently (at most ``downloads`` at once) through
+    the bot's HTTP client, the cards are drawn in a pool of ``processes``
+    worker processes and the image is assembled in a thread. The workers are
+    started by a forkserver: forking the bot itself would copy its threads'
+    locks in whatever state they are. Cards that are
+    in the ``card_cache`` are neither downloaded nor drawn.
+
+    The encoded variants of the last image are kept in ``artifacts`` until
+    the next render, ``latest`` reads the saved ones after a restart.
+    """
+
+    def __init__(self, http_client, processes: int = DEFAULT_PROCESSES, downloads: int = 16,
+                 configuration: str = 'athena/configuration.json',
+                 card_cache: Optional[CardCache] = None) -> None:
+        with open(configuration, 'r', encoding='utf-8') as f:
+            self.language = json.load(f)['language']
+        self.http_client = http_client
+        self.card_cache = card_cache if card_cache is not None else CardCache()
+        self.processes = processes
+        self.downloads = downloads
+        self.artifacts: Optional[ShopArtifacts] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context(START_METHOD))
+        return self._pool
+
+    @staticmethod
+    def entries(shop: dict) -> list:
+        return [entry for section in ('featured', 'daily') if shop.get(section)
+                for entry in shop[section]['entries']]
+
+    async def download(self, url: str, semaphore: asyncio.Semaphore) -> Optional[bytes]:
+        async with semaphore:
+            async with self.http_client.get(url) as r:
+                if r.status != 200:
+                    log.critical(f"Failed to GET {url} (HTTP {r.status})")
+                    return None
+                return await r.read()
+
+    async def render_cards(self, shop: dict) -> Dict[str, Image.Image]:
+        """
+        Returns the cards of the shop by offer id, entries that failed are missing
+        """
+        loop = asyncio.get_event_loop()
+        semaphore = asyncio.Semaphore(self.downloads)
+
+        async def card(entry: dict) -> Optional[Image.Image]:
+            info = Athena.CardInfo(Athena, entry)
+            if info is None:
+                return None
+            key = Athena.CardKey(Athena, entry, info)
+            cached = await loop.run_in_executor(None, self.card_cache.get, key)
+            if cached is not None:
+                return cached
+
+            icon = await self.download(info['icon'], semaphore)
+            if icon is None:
+                return None
+            raw = await loop.run_in_executor(self.pool, render_card, entry, icon)
+            if raw is None:
+                return None
+            rendered = Image.frombytes(*raw)
+            await loop.run_in_executor(None, self.card_cache.put, key, rendered)
+            return rendered
+
+        entries = self.entries(shop)
+        cards = await asyncio.gather(*(card(entry) for entry in entries), return_exceptions=True)
+
+        rendered = {}
+        for entry, result in zip(entries, cards):
+            if isinstance(result, Exception):
+                log.error(f"Failed to render item {entry.get('offerId')}, {result!r}")
+            elif result is not None:
+                rendered[entry['offerId']] = result
+        return rendered
+
+    async def render(self, shop: dict) -> Optional[ShopArtifacts]:
+        """
+        Renders the shop, ``shop`` is the ``data`` of the API response.
+        Returns the variants of the image if it was saved.
+        """
+        cards = await self.render_cards(shop)
+        generator = Athena if len(self.entries(shop)) <= MONOTONIC_THRESHOLD else athena_monotonic.Athena
+        date = shop['date'].split('T')[0]
+        artifacts = await asyncio.get_event_loop().run_in_executor(
+            None, generator.GenerateImage, generator, date, shop, cards)
+        if artifacts:
+            self.artifacts = artifacts
+        return artifacts
+
+    async def latest(self) -> Optional[ShopArtifacts]:
+        """
+        Returns the variants of the last rendered image, None if there is none
+        """
+        if self.artifacts is None:
+            self.artifacts = await asyncio.get_event_loop().run_in_executor(None, ShopArtifacts.Load)
+        return self.artifacts
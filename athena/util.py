@@ -4,7 +4,9 @@ import logging
 from datetime import datetime
 
 import requests
-from PIL import Image, ImageFont
+from PIL import Image
+
+from lib.utils.image_assets import assets
 
 log = logging.getLogger(__name__)
 
@@ -69,9 +71,22 @@ class ImageUtil:
     """Class containing utilitarian image-based functions intended to reduce duplicate code."""
 
     def Open(self, filename: str, directory: str = "athena/assets/images/"):
-        """Return the specified image file."""
+        """
+        Return the specified image file.
+
+        The image is decoded once and shared, do not draw on it.
+        """
+
+        return assets.image(f"{directory}{filename}")
+
+    def OpenResized(self, filename: str, maxWidth: int, maxHeight: int, directory: str = "athena/assets/images/"):
+        """
+        Return the specified image file resized like RatioResize.
+
+        The resized image is kept for the next call with the same size, do not draw on it.
+        """
 
-        return Image.open(f"{directory}{filename}")
+        return assets.ratio_resized(f"{directory}{filename}", maxWidth, maxHeight)
 
     def Download(self, url: str):
         """Download and return the raw file from the specified url as an image object."""
@@ -107,13 +122,13 @@ class ImageUtil:
         """Return a font object with the specified font file and size."""
 
         try:
-            return ImageFont.truetype(f"{directory}{font}", size)
+            return assets.font(f"{directory}{font}", size)
         except OSError:
             log.warn(
                 "BurbankBigRegular-Black.ttf not found, defaulted font to LuckiestGuy-Regular.ttf"
             )
 
-            return ImageFont.truetype(f"{directory}LuckiestGuy-Regular.ttf", size)
+            return assets.font(f"{directory}LuckiestGuy-Regular.ttf", size)
         except Exception as e:
             log.error(f"Failed to load font, {e}")
 
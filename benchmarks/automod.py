@@ -0,0 +1,86 @@
+"""
+Replays a message corpus through AutoModDetector and through the separate
+regex and keyword checks it replaced, checks that both find the same URLs,
+invites, emoji and scam rules and compares their speed.
+
+Usage (from the repository root, the corpus argument is required):
+    python -m benchmarks.automod messages.txt [--rules rules.json] [--repeat 5]
+or, running the file directly, with the repository on the import path:
+    PYTHONPATH=. python benchmarks/automod.py messages.txt
+
+The corpus is a text file with one message per line. Messages with links
+and invites cost more than plain text, so measure a corpus of each kind.
+The rules default to ./data/json/automod_rules.json.
+"""
+import argparse
+import re
+from time import perf_counter
+
+from lib.utils.automod import (DISCORD_INVITE_PATTERN, EMOJI_PATTERN,
+                               UNICODE_EMOJI_PATTERN, URL_PATTERN,
+                               AutoModDetector)
+
+RULES = './data/json/automod_rules.json'
+
+
+def separate_checks(detector):
+    def check(content):
+        urls = re.findall(URL_PATTERN, content)
+        invites = re.findall(DISCORD_INVITE_PATTERN, content)
+        emoji_count = len(re.findall(EMOJI_PATTERN, content)) + len(re.findall(UNICODE_EMOJI_PATTERN, content))
+        scam = tuple(
+            rule.name for rule in detector.rules
+            if (urls or not rule.requires_url)
+            and any(word in content for word in rule.keywords)
+            and not any(word in content for word in rule.exceptions)
+        )
+        return tuple(urls), tuple(invites), emoji_count, scam
+    return check
+
+
+def single_scan(detector):
+    def check(content):
+        detection = detector.detect(content)
+        return detection.urls, detection.invites, detection.emoji_count, detection.scam
+    return check
+
+
+def measure(check, messages, repeat):
+    results = []
+    start = perf_counter()
+    for _ in range(repeat):
+        results = [check(message) for message in messages]
+    elapsed = perf_counter() - start
+    return results, elapsed / (repeat * len(messages))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('corpus')
+    parser.add_argument('--rules', default=RULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        messages = [line.rstrip('\n') for line in f]
+
+    detector = AutoModDetector.from_file(args.rules)
+    new, new_time = measure(single_scan(detector), messages, args.repeat)
+    old, old_time = measure(separate_checks(detector), messages, args.repeat)
+
+    print(f'{len(detector.rules)} scam rules, {len(messages)} messages:')
+    print(f'  separate checks: {old_time * 1e6:.1f} µs per message')
+    print(f'  AutoModDetector: {new_time * 1e6:.1f} µs per message ({old_time / new_time:.1f}x faster)')
+    print(f'  {sum(1 for result in old if result[3])} messages triggered a scam rule')
+
+    mismatches = 0
+    for message, o, n in zip(messages, old, new):
+        if o != n:
+            mismatches += 1
+            print(f'  MISMATCH {message!r}: separate checks {o}, AutoModDetector {n}')
+
+    print('Results are identical' if not mismatches else f'{mismatches} mismatches')
+
+
+if __name__ == '__main__':
+    main()
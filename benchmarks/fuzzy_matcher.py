@@ -0,0 +1,63 @@
+"""
+Replays a message corpus through FuzzyMatcher and difflib.get_close_matches
+with the filters and cutoffs of MessagesHandler, checks that both return the
+same matches and compares their speed.
+
+Usage (from the repository root):
+    python -m benchmarks.fuzzy_matcher messages.txt [--repeat 5]
+
+The corpus is a text file with one message per line.
+"""
+import argparse
+from difflib import get_close_matches
+from time import perf_counter
+
+from lib.utils.fuzzy_matcher import FuzzyMatcher
+
+FILTERS = (
+    ('./data/txt/rep_filter.txt', 0.75),
+    ('./data/txt/question_filter.txt', 0.85),
+)
+
+
+def measure(match, messages, repeat):
+    results = []
+    start = perf_counter()
+    for _ in range(repeat):
+        results = [match(message) for message in messages]
+    elapsed = perf_counter() - start
+    return results, elapsed / (repeat * len(messages))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('corpus')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        messages = [line.rstrip('\n').lower() for line in f]
+
+    mismatches = 0
+    for filename, cutoff in FILTERS:
+        with open(filename, 'r', encoding='utf-8') as f:
+            phrases = [line.strip() for line in f if line != '']
+
+        matcher = FuzzyMatcher(phrases, cutoff)
+        new, new_time = measure(matcher.get_close_matches, messages, args.repeat)
+        old, old_time = measure(lambda m: get_close_matches(m, phrases, cutoff=cutoff), messages, args.repeat)
+
+        print(f'{filename} (cutoff {cutoff}):')
+        print(f'  difflib:      {old_time * 1e6:.1f} µs per message')
+        print(f'  FuzzyMatcher: {new_time * 1e6:.1f} µs per message ({old_time / new_time:.1f}x faster)')
+        print(f'  {sum(map(bool, old))} of {len(messages)} messages matched')
+        for message, o, n in zip(messages, old, new):
+            if o != n:
+                mismatches += 1
+                print(f'  MISMATCH {message!r}: difflib {o}, FuzzyMatcher {n}')
+
+    print('Results are identical' if not mismatches else f'{mismatches} mismatches')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Compares ProfanityMatcher with better_profanity on a recorded message corpus.
+
+Usage (from the repository root):
+    pip install better-profanity==0.6.1
+    python -m benchmarks.profanity messages.txt [--repeat 5]
+
+The corpus is a text file with one message per line.
+"""
+import argparse
+from time import perf_counter
+
+from lib.utils.profanity_matcher import ProfanityMatcher
+
+PROFANITY_FILE = './data/txt/profanity.txt'
+
+
+def measure(check, messages, repeat):
+    results = []
+    start = perf_counter()
+    for _ in range(repeat):
+        results = [check(message) for message in messages]
+    elapsed = perf_counter() - start
+    return results, elapsed / (repeat * len(messages))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('corpus')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        messages = [line.rstrip('\n') for line in f if line.strip()]
+
+    start = perf_counter()
+    matcher = ProfanityMatcher(cache_size=0)
+    matcher.load_censor_words_from_file(PROFANITY_FILE)
+    print(f'ProfanityMatcher: compiled in {(perf_counter() - start) * 1000:.1f} ms')
+    new, new_time = measure(matcher.contains_profanity, messages, args.repeat)
+    print(f'ProfanityMatcher: {new_time * 1e6:.1f} µs per message')
+
+    try:
+        from better_profanity import Profanity
+    except ImportError:
+        print('better_profanity is not installed, skipping the comparison')
+        return
+
+    start = perf_counter()
+    profanity = Profanity()
+    profanity.load_censor_words_from_file(PROFANITY_FILE)
+    print(f'better_profanity: loaded in {(perf_counter() - start) * 1000:.1f} ms')
+    old, old_time = measure(profanity.contains_profanity, messages, args.repeat)
+    print(f'better_profanity: {old_time * 1e6:.1f} µs per message ({old_time / new_time:.1f}x slower)')
+
+    missed = [m for m, o, n in zip(messages, old, new) if o and not n]
+    extra = [m for m, o, n in zip(messages, old, new) if n and not o]
+    print(f'{len(messages)} messages, {sum(old)} flagged by better_profanity, {sum(new)} by ProfanityMatcher')
+    print(f'Missed by ProfanityMatcher: {len(missed)}')
+    for message in missed:
+        print(f'  - {message}')
+    print(f'Flagged only by ProfanityMatcher (homoglyphs, leetspeak): {len(extra)}')
+    for message in extra:
+        print(f'  + {message}')
+
+
+if __name__ == '__main__':
+    main()
@@ -86,6 +86,20 @@ ALTER TABLE public.mutes
     OWNER to postgres;
 
 
+CREATE TABLE public.purchases
+(
+    id bigserial,
+    user_id bigint NOT NULL,
+    currency text NOT NULL,
+    item text DEFAULT 'Не указано',
+    price bigint NOT NULL,
+    purchased_at timestamp without time zone DEFAULT (now())::timestamp without time zone
+);
+
+ALTER TABLE public.purchases
+    OWNER to postgres;
+
+
 CREATE TABLE public.reactions
 (
     emoji text,
@@ -138,6 +152,19 @@ ALTER TABLE public.stats_customization
     OWNER to postgres;
 
 
+CREATE TABLE public.user_achievements
+(
+    user_id bigint NOT NULL,
+    internal_id text NOT NULL,
+    achieved_at timestamp without time zone DEFAULT (now())::timestamp without time zone,
+    given_by bigint,
+    PRIMARY KEY (user_id, internal_id)
+);
+
+ALTER TABLE public.user_achievements
+    OWNER to postgres;
+
+
 CREATE TABLE public.users_info
 (
     user_id bigint,
@@ -155,14 +182,12 @@ ALTER TABLE public.users_info
 CREATE TABLE public.users_stats
 (
     user_id bigint,
-    achievements_list json DEFAULT '{"user_achievements_list":[]}'::json,
     messages_count bigint DEFAULT 0,
     last_message_date timestamp without time zone DEFAULT (now())::timestamp without time zone,
     rep_rank bigint DEFAULT 0,
     lost_reputation bigint DEFAULT 0,
     profanity_triggers bigint DEFAULT 0,
     invoice_time bigint DEFAULT 0,
-    purchases json DEFAULT '{"vbucks_purchases":[],"realMoney_purchases":[]}'::json,
     mutes_story json DEFAULT '{"user_mute_story":[]}'::json,
     warns_story json DEFAULT '{"user_warn_story":[]}'::json
 );
@@ -179,3 +204,18 @@ CREATE TABLE public.voice_activity
 
 ALTER TABLE public.voice_activity
     OWNER to postgres;
+
+
+CREATE INDEX leveling_xp_total_idx
+    ON public.leveling USING btree
+    (xp_total DESC);
+
+
+CREATE INDEX purchases_user_id_currency_idx
+    ON public.purchases USING btree
+    (user_id, currency, purchased_at);
+
+
+CREATE INDEX user_achievements_internal_id_idx
+    ON public.user_achievements USING btree
+    (internal_id);
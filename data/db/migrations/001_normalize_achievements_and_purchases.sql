@@ -0,0 +1,67 @@
+-- Moves users_stats.achievements_list and users_stats.purchases into
+-- the user_achievements and purchases tables.
+-- Run once on an existing database: psql -d <database> -f 001_normalize_achievements_and_purchases.sql
+
+BEGIN;
+
+CREATE TABLE public.user_achievements
+(
+    user_id bigint NOT NULL,
+    internal_id text NOT NULL,
+    achieved_at timestamp without time zone DEFAULT (now())::timestamp without time zone,
+    given_by bigint,
+    PRIMARY KEY (user_id, internal_id)
+);
+
+ALTER TABLE public.user_achievements
+    OWNER to postgres;
+
+CREATE INDEX user_achievements_internal_id_idx
+    ON public.user_achievements USING btree
+    (internal_id);
+
+
+CREATE TABLE public.purchases
+(
+    id bigserial,
+    user_id bigint NOT NULL,
+    currency text NOT NULL,
+    item text DEFAULT 'Не указано',
+    price bigint NOT NULL,
+    purchased_at timestamp without time zone DEFAULT (now())::timestamp without time zone
+);
+
+ALTER TABLE public.purchases
+    OWNER to postgres;
+
+CREATE INDEX purchases_user_id_currency_idx
+    ON public.purchases USING btree
+    (user_id, currency, purchased_at);
+
+
+INSERT INTO public.user_achievements (user_id, internal_id, achieved_at, given_by)
+SELECT s.user_id,
+       a.key,
+       to_timestamp(a.value->>'achieved_at', 'DD.MM.YYYY HH24:MI:SS')::timestamp,
+       (a.value->>'given_by')::bigint
+FROM public.users_stats s,
+     json_array_elements(s.achievements_list->'user_achievements_list') e,
+     json_each(e) a
+ON CONFLICT DO NOTHING;
+
+INSERT INTO public.purchases (user_id, currency, item, price, purchased_at)
+SELECT s.user_id,
+       c.currency,
+       p->>'item',
+       (p->>'price')::bigint,
+       to_timestamp(p->>'date', 'DD.MM.YYYY HH24:MI:SS')::timestamp
+FROM public.users_stats s,
+     (VALUES ('vbucks', 'vbucks_purchases'), ('rubles', 'realMoney_purchases')) c(currency, json_key),
+     json_array_elements(s.purchases->c.json_key) WITH ORDINALITY AS t(p, n)
+ORDER BY s.user_id, c.currency, t.n;
+
+ALTER TABLE public.users_stats
+    DROP COLUMN achievements_list,
+    DROP COLUMN purchases;
+
+COMMIT;
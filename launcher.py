@@ -1,5 +1,7 @@
-from lib.bot import bot
-
 VERSION = "3.4.1"
 
-bot.run(VERSION)
+# The shop renderer starts worker processes that import this module again
+if __name__ == "__main__":
+    from lib.bot import bot
+
+    bot.run(VERSION)
@@ -6,7 +6,7 @@ from os import getenv
 import asyncpg
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from better_profanity import Profanity
+from apscheduler.triggers.interval import IntervalTrigger
 from discord import Intents
 from discord.ext.commands import Bot as BotBase
 from discord.ext.commands import (Context, ExtensionAlreadyLoaded,
@@ -14,10 +14,17 @@ from discord.ext.commands import (Context, ExtensionAlreadyLoaded,
 from dotenv import load_dotenv
 from loguru import logger
 
-from ..db import async_db, db
+from ..db import async_db, write_buffer
 from ..utils.constants import (HIDEOUT_GUILD_ID, HIDEOUT_LOGS_CHANNEL,
                                MAIN_GUILD_ID, OWNER_ID)
-from ..utils.utils import insert_new_user_in_db
+from ..utils.automod import AutoModDetector
+from ..utils.event_bus import event_bus
+from ..utils.http_client import HTTPClient
+from ..utils.leaderboard_cache import LeaderboardCache
+from ..utils.message_analysis import MessageAnalysis
+from ..utils.profanity_matcher import ProfanityMatcher
+from ..utils.profile_cache import ProfileCache
+from ..utils.utils import insert_new_users_in_db
 
 load_dotenv()
 logger.add("logs/{time:DD-MM-YYYY---HH-mm-ss}.log",
@@ -57,8 +64,16 @@ class Bot(BotBase):
         self.logs_channel = None
         self.pg_pool = None
         self.db = None
+        self.users_stats_buffer = None
+        self.leveling_buffer = None
+        self.leaderboards = None
+        self.profiles = None
         self.scheduler = AsyncIOScheduler()
-        self.profanity = Profanity()
+        self.profanity = ProfanityMatcher()
+        # Rules are loaded by the moderation cog
+        self.automod = AutoModDetector()
+        # Not discord.py's self.http: outbound requests to the APIs the cogs use
+        self.http_client = HTTPClient()
         self.channels_with_message_counting = [
             546404724216430602, # админка
             686499834949140506, # гвардия
@@ -67,11 +82,7 @@ class Bot(BotBase):
             546408250158088192, # поддержка
             644523860326219776, # медиа
         ]
-        try:
-            data = db.records('SELECT user_id FROM blacklist')
-            self.banlist = [i[0] for i in data]
-        except:
-            self.banlist = []
+        self.banlist = []
 
         self.load_music_cogs(self.scheduler)
 
@@ -99,6 +110,46 @@ class Bot(BotBase):
         except Exception as e:
             raise e
 
+        self.users_stats_buffer = write_buffer.WriteBehindBuffer(
+            self.pg_pool, 'users_stats',
+            increments={'messages_count': 'bigint'},
+            latest={'last_message_date': 'timestamp'},
+            journal='./data/journal/users_stats.jsonl'
+        )
+        self.leveling_buffer = write_buffer.WriteBehindBuffer(
+            self.pg_pool, 'leveling',
+            increments={'level': 'bigint', 'xp': 'bigint', 'xp_total': 'bigint'},
+            latest={'xp_lock': 'timestamp'},
+            journal='./data/journal/leveling.jsonl'
+        )
+        for buffer in self.write_buffers:
+            loop.run_until_complete(buffer.replay())
+        self.profiles = ProfileCache(self.pg_pool, self.leveling_buffer)
+        self.scheduler.add_job(self.flush_write_buffers, IntervalTrigger(seconds=30),
+                               misfire_grace_time=300)
+        self.scheduler.add_job(self.profanity.compact, IntervalTrigger(minutes=15),
+                               misfire_grace_time=300)
+
+        self.leaderboards = LeaderboardCache(self.db)
+        loop.run_until_complete(self.leaderboards.load())
+        event_bus.subscribe('counter_changed', self.leaderboards.on_counter_changed)
+
+        try:
+            self.banlist = loop.run_until_complete(
+                self.db.column('SELECT user_id FROM blacklist')
+            )
+        except:
+            self.banlist = []
+
+    @property
+    def write_buffers(self) -> tuple:
+        return (self.users_stats_buffer, self.leveling_buffer)
+
+    @logger.catch
+    async def flush_write_buffers(self):
+        for buffer in self.write_buffers:
+            await buffer.flush()
+
     @logger.catch
     def setup(self):
         for cog in COGS:
@@ -202,9 +253,14 @@ class Bot(BotBase):
         sched.add_job(self.load_music_player_cog_scheduler, CronTrigger(
             day_of_week=5, hour=3), misfire_grace_time=300)
 
-    @logger.catch
-    async def process_commands(self, message):
+    async def analyze_message(self, message) -> MessageAnalysis:
         ctx = await self.get_context(message, cls=Context)
+        return MessageAnalysis.build(message, ctx, self.profanity, self.automod)
+
+    @logger.catch
+    async def process_commands(self, message, ctx=None):
+        if ctx is None:
+            ctx = await self.get_context(message, cls=Context)
 
         if ctx.command is not None:
             if message.author.id in self.banlist:
@@ -228,14 +284,16 @@ class Bot(BotBase):
             self.profanity.load_censor_words_from_file("./data/txt/profanity.txt")
             print("\nLogged in as:", bot.user)
             print("ID:", bot.user.id)
-            for member in self.guild.members:
-                if member.pending is False:
-                    rec = await self.pg_pool.fetchval('SELECT user_id FROM users_info WHERE user_id = $1', member.id)
-                    if rec is None:
-                        await insert_new_user_in_db(self.db, self.pg_pool, member)
+            known_users = set(await self.db.column('SELECT user_id FROM users_info'))
+            new_members = [
+                member for member in self.guild.members
+                if member.pending is False and member.id not in known_users
+            ]
+            await insert_new_users_in_db(self.pg_pool, new_members)
+            for member in new_members:
+                self.leaderboards.add_user(member.id)
 
-            db.execute("DELETE FROM voice_activity;")
-            db.commit()
+            await self.pg_pool.execute("DELETE FROM voice_activity;")
 
             while not self.cogs_ready.all_ready():
                 await asyncio.sleep(0.5)
@@ -255,6 +313,13 @@ class Bot(BotBase):
         else:
             print("Bot reconnected")
 
+    async def close(self):
+        for buffer in self.write_buffers:
+            if buffer is not None:
+                await buffer.close()
+        await self.http_client.close()
+        await super().close()
+
     async def on_connect(self):
         print("Bot connected")
 
@@ -263,7 +328,11 @@ class Bot(BotBase):
 
     @logger.catch
     async def on_message(self, message):
-        await self.process_commands(message)
+        # The message is parsed once, the cogs listen for on_message_analyzed
+        # and share the analysis instead of parsing the message again.
+        analysis = await self.analyze_message(message)
+        self.dispatch('message_analyzed', analysis)
+        await self.process_commands(message, analysis.ctx)
 
 
 bot = Bot()
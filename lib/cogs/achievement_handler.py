@@ -1,6 +1,6 @@
-import ast
+import asyncio
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 
 from discord import Member
 from discord.ext import tasks
@@ -8,353 +8,241 @@ from discord.ext.commands import Cog
 from discord.utils import get
 from loguru import logger
 
-from ..utils.utils import joined_date
+from ..utils.event_bus import event_bus
+
+# Events of the same user that arrive within this delay are evaluated together
+EVALUATION_DELAY = 5
+
+# metric: [(threshold, achievement), ...]
+# An achievement is earned when the metric of the member reaches the threshold.
+ACHIEVEMENT_RULES: Dict[str, List[Tuple[int, str]]] = {
+    'messages': [
+        (1_000, 'AID_Writer_1'),
+        (5_000, 'AID_Writer_2'),
+        (10_000, 'AID_Writer_3'),
+        (25_000, 'AID_Writer_4'),
+        (50_000, 'AID_Writer_5'),
+        (100_000, 'AID_Writer_6'),
+    ],
+    'days_on_server': [
+        (7, 'AID_Old_1'),
+        (30, 'AID_Old_2'),
+        (30 * 3, 'AID_Old_3'),
+        (30 * 6, 'AID_Old_4'),
+        (365, 'AID_Old_5'),
+        (365 * 2, 'AID_Old_6'),
+        (365 * 3, 'AID_Old_7'),
+    ],
+    'roles': [
+        (3, 'AID_RoleMaster_1'),
+        (5, 'AID_RoleMaster_2'),
+        (10, 'AID_RoleMaster_3'),
+        (15, 'AID_RoleMaster_4'),
+        (20, 'AID_RoleMaster_5'),
+    ],
+    'vbucks': [
+        (1, 'AID_Patron_1'),
+        (5_000, 'AID_Patron_2'),
+        (10_000, 'AID_Patron_3'),
+        (25_000, 'AID_Patron_4'),
+        (50_000, 'AID_Patron_5'),
+        (100_000, 'AID_Patron_6'),
+    ],
+    'reputation': [
+        (1_000, 'AID_ReputationMaster_1'),
+        (5_000, 'AID_ReputationMaster_2'),
+        (10_000, 'AID_ReputationMaster_3'),
+        (25_000, 'AID_ReputationMaster_4'),
+        (50_000, 'AID_ReputationMaster_5'),
+    ],
+    'esport_role': [
+        (1, 'AID_Kotleta_1'),
+    ],
+    'philanthropist_role': [
+        (1, 'AID_Philanthropist_1'),
+    ],
+    'voice_hours': [
+        (10, 'AID_VoiceMaster_1'),
+        (25, 'AID_VoiceMaster_2'),
+        (50, 'AID_VoiceMaster_3'),
+        (100, 'AID_VoiceMaster_4'),
+        (250, 'AID_VoiceMaster_5'),
+    ],
+    'level': [
+        (3, 'AID_Leveling_1'),
+        (10, 'AID_Leveling_2'),
+        (25, 'AID_Leveling_3'),
+        (50, 'AID_Leveling_4'),
+        (75, 'AID_Leveling_5'),
+        (100, 'AID_Leveling_6'),
+    ],
+    'approved_songs': [
+        (5, 'AID_MusicDJ_1'),
+        (15, 'AID_MusicDJ_2'),
+        (25, 'AID_MusicDJ_3'),
+    ],
+}
+
+
+def earned_achievements(metrics: Dict[str, int]) -> List[str]:
+    """
+    Returns the achievements whose thresholds are reached by the metrics
+    """
+    return [achievement
+            for metric, rules in ACHIEVEMENT_RULES.items()
+            for threshold, achievement in rules
+            if metrics.get(metric, 0) >= threshold]
 
 
 class AchievementHandler(Cog, name='AchievementHandler'):
     def __init__(self, bot):
         self.bot = bot
+        self.pending_users: Set[int] = set()
+        self.evaluation_task: Optional[asyncio.Task] = None
+        event_bus.subscribe('counter_changed', self.on_counter_changed)
         self.achievements_manager.start()
 
+    def cog_unload(self):
+        event_bus.unsubscribe('counter_changed', self.on_counter_changed)
+        self.achievements_manager.cancel()
+
     @Cog.listener()
     async def on_ready(self):
         if not self.bot.ready:
            self.bot.cogs_ready.ready_up("achievement_handler")
 
-    @tasks.loop(hours=1.0)
+    @Cog.listener()
+    async def on_member_update(self, before: Member, after: Member):
+        if before.roles != after.roles:
+            await self.on_counter_changed(after.id, 'roles', len(after.roles) - 1)
+
+    async def on_counter_changed(self, user_id: int, counter: str, value: Optional[int]):
+        """
+        Queues the user for evaluation. Users are evaluated in one batch
+        after EVALUATION_DELAY seconds.
+        """
+        self.pending_users.add(user_id)
+        if self.evaluation_task is None or self.evaluation_task.done():
+            self.evaluation_task = asyncio.get_event_loop().create_task(self.evaluate_pending_users())
+
+    async def evaluate_pending_users(self):
+        await self.bot.wait_until_ready()
+        while self.pending_users:
+            await asyncio.sleep(EVALUATION_DELAY)
+            user_ids, self.pending_users = self.pending_users, set()
+
+            AS_COG = self.bot.get_cog('Система достижений')
+            if not AS_COG:
+                return
+            members = [self.bot.guild.get_member(user_id) for user_id in user_ids]
+            await self.handle_achievements(self.eligible_members(members, AS_COG), AS_COG)
+
+    def eligible_members(self, members: List[Optional[Member]], cog: Cog) -> List[Member]:
+        return [member for member in members
+                if member is not None
+                and not member.pending
+                and member.id not in cog.achievements_banlist
+                and member.id not in self.bot.banlist]
+
+    @tasks.loop(hours=6.0)
     @logger.catch
     async def achievements_manager(self):
+        """
+        Reconciles the achievements of the whole guild. Counters with events
+        are evaluated as they change, this sweep catches time-based
+        achievements and anything the events missed.
+        """
         AS_COG = self.bot.get_cog('Система достижений')
         if not AS_COG:
             return
-        for member in self.bot.guild.members:
-            if member.pending:
-                continue
-            if member.id in AS_COG.achievements_banlist:
-                continue
-            if member.id in self.bot.banlist:
-                continue
 
-            user_achievements = await self.get_user_achievements(member)
-            await self.handle_achievements(member, user_achievements, AS_COG)
+        await self.handle_achievements(self.eligible_members(self.bot.guild.members, AS_COG), AS_COG)
 
     @achievements_manager.before_loop
     async def wait_before_handle_achievements(self):
         await self.bot.wait_until_ready()
 
-    async def get_user_achievements(self, user: Member) -> List[str]:
-        data = await self.bot.pg_pool.fetchval(
-            'SELECT achievements_list FROM users_stats WHERE user_id = $1',
-            user.id)
-        data = ast.literal_eval(data)
-        data = data['user_achievements_list']
-        user_achievements = [key for dic in data for key in dic.keys()]
-        return user_achievements
-
-    @logger.catch
-    async def handle_achievements(self, member: Member, achievements: List[str], cog: Cog):
-        await self.writer_handler(member, achievements, cog)
-        await self.old_handler(member, achievements, cog)
-        await self.role_master_handler(member, achievements, cog)
-        await self.reputation_master_handler(member, achievements, cog)
-        await self.kotleta_handler(member, achievements, cog)
-        await self.philanthropist_handler(member, achievements, cog)
-        await self.voice_master_handler(member, achievements, cog)
-        await self.leveling_handler(member, achievements, cog)
-        await self.musicDJ_handler(member, achievements, cog)
-
-    @logger.catch
-    async def writer_handler(self, member, achievements, cog):
-        data = await self.bot.pg_pool.fetchval(
-            'SELECT messages_count FROM users_stats WHERE user_id = $1',
-            member.id)
-        WRITER_1 = 'AID_Writer_1'
-        WRITER_2 = 'AID_Writer_2'
-        WRITER_3 = 'AID_Writer_3'
-        WRITER_4 = 'AID_Writer_4'
-        WRITER_5 = 'AID_Writer_5'
-        WRITER_6 = 'AID_Writer_6'
-
-        if data >= 1_000:
-            if WRITER_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, WRITER_1)
-                #await cog.achievement_award_notification(WRITER_1, member)
-        if data >= 5_000:
-            if WRITER_2 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, WRITER_2)
-                #await cog.achievement_award_notification(WRITER_2, member)
-        if data >= 10_000:
-            if WRITER_3 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, WRITER_3)
-                #await cog.achievement_award_notification(WRITER_3, member)
-        if data >= 25_000:
-            if WRITER_4 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, WRITER_4)
-                #await cog.achievement_award_notification(WRITER_4, member)
-        if data >= 50_000:
-            if WRITER_5 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, WRITER_5)
-                #await cog.achievement_award_notification(WRITER_5, member)
-        if data >= 100_000:
-            if WRITER_6 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, WRITER_6)
-                #await cog.achievement_award_notification(WRITER_6, member)
-
-    @logger.catch
-    async def old_handler(self, member, achievements, cog):
-        diff = datetime.utcnow() - (await joined_date(self.bot.pg_pool, member))
-        OLD_1 = 'AID_Old_1'
-        OLD_2 = 'AID_Old_2'
-        OLD_3 = 'AID_Old_3'
-        OLD_4 = 'AID_Old_4'
-        OLD_5 = 'AID_Old_5'
-        OLD_6 = 'AID_Old_6'
-        OLD_7 = 'AID_Old_7'
-
-        if diff.days >= 7:
-            if OLD_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, OLD_1)
-                #await cog.achievement_award_notification(OLD_1, member)
-        if diff.days >= 30:
-            if OLD_2 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, OLD_2)
-                #await cog.achievement_award_notification(OLD_2, member)
-        if diff.days >= 30 * 3:
-            if OLD_3 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, OLD_3)
-                #await cog.achievement_award_notification(OLD_3, member)
-        if diff.days >= 30 * 6:
-            if OLD_4 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, OLD_4)
-                #await cog.achievement_award_notification(OLD_4, member)
-        if diff.days >= 365:
-            if OLD_5 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, OLD_5)
-                #await cog.achievement_award_notification(OLD_5, member)
-        if diff.days >= 365 * 2:
-            if OLD_6 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, OLD_6)
-                #await cog.achievement_award_notification(OLD_6, member)
-        if diff.days >= 365 * 3:
-            if OLD_7 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, OLD_7)
-                #await cog.achievement_award_notification(OLD_7, member)
-
-    @logger.catch
-    async def role_master_handler(self, member, achievements, cog):
-        roles = len(member.roles) - 1
-        ROLE_MASTER_1 = 'AID_RoleMaster_1'
-        ROLE_MASTER_2 = 'AID_RoleMaster_2'
-        ROLE_MASTER_3 = 'AID_RoleMaster_3'
-        ROLE_MASTER_4 = 'AID_RoleMaster_4'
-        ROLE_MASTER_5 = 'AID_RoleMaster_5'
-
-        if roles >= 3:
-            if ROLE_MASTER_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, ROLE_MASTER_1)
-                #await cog.achievement_award_notification(ROLE_MASTER_1, member)
-        if roles >= 5:
-            if ROLE_MASTER_2 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, ROLE_MASTER_2)
-                #await cog.achievement_award_notification(ROLE_MASTER_2, member)
-        if roles >= 10:
-            if ROLE_MASTER_3 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, ROLE_MASTER_3)
-                #await cog.achievement_award_notification(ROLE_MASTER_3, member)
-        if roles >= 15:
-            if ROLE_MASTER_4 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, ROLE_MASTER_4)
-                #await cog.achievement_award_notification(ROLE_MASTER_4, member)
-        if roles >= 20:
-            if ROLE_MASTER_5 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, ROLE_MASTER_5)
-                #await cog.achievement_award_notification(ROLE_MASTER_5, member)
-
-    @logger.catch
-    async def patron_handler(self, member, achievements, cog):
-        data = await self.bot.pg_pool.fetchval(
-            'SELECT purchases FROM users_stats WHERE user_id = $1',
-            member.id)
-        data = ast.literal_eval(data)
-        vbucks = sum(data['vbucks_purchases'][i]['price']
-                    for i in range(len(data['vbucks_purchases'])))
-        PATRON_1 = 'AID_Patron_1'
-        PATRON_2 = 'AID_Patron_2'
-        PATRON_3 = 'AID_Patron_3'
-        PATRON_4 = 'AID_Patron_4'
-        PATRON_5 = 'AID_Patron_5'
-        PATRON_6 = 'AID_Patron_6'
-
-        if vbucks > 0:
-            if PATRON_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, PATRON_1)
-                #await cog.achievement_award_notification(PATRON_1, member)
-        if vbucks >= 5_000:
-            if PATRON_2 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, PATRON_2)
-                #await cog.achievement_award_notification(PATRON_2, member)
-        if vbucks >= 10_000:
-            if PATRON_3 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, PATRON_3)
-                #await cog.achievement_award_notification(PATRON_3, member)
-        if vbucks >= 25_000:
-            if PATRON_4 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, PATRON_4)
-                #await cog.achievement_award_notification(PATRON_4, member)
-        if vbucks >= 50_000:
-            if PATRON_5 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, PATRON_5)
-                #await cog.achievement_award_notification(PATRON_5, member)
-        if vbucks >= 100_000:
-            if PATRON_6 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, PATRON_6)
-                #await cog.achievement_award_notification(PATRON_6, member)
-
-    @logger.catch
-    async def reputation_master_handler(self, member, achievements, cog):
-        rep_rank = await self.bot.pg_pool.fetchval(
-            'SELECT rep_rank FROM users_stats WHERE user_id = $1',
-            member.id)
-        REP_MASTER_1 = 'AID_ReputationMaster_1'
-        REP_MASTER_2 = 'AID_ReputationMaster_2'
-        REP_MASTER_3 = 'AID_ReputationMaster_3'
-        REP_MASTER_4 = 'AID_ReputationMaster_4'
-        REP_MASTER_5 = 'AID_ReputationMaster_5'
-
-        if rep_rank >= 1_000:
-            if REP_MASTER_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, REP_MASTER_1)
-                #await cog.achievement_award_notification(REP_MASTER_1, member)
-        if rep_rank >= 5_000:
-            if REP_MASTER_2 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, REP_MASTER_2)
-                #await cog.achievement_award_notification(REP_MASTER_2, member)
-        if rep_rank >= 10_000:
-            if REP_MASTER_3 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, REP_MASTER_3)
-                #await cog.achievement_award_notification(REP_MASTER_3, member)
-        if rep_rank >= 25_000:
-            if REP_MASTER_4 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, REP_MASTER_4)
-                #await cog.achievement_award_notification(REP_MASTER_4, member)
-        if rep_rank >= 50_000:
-            if REP_MASTER_5 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, REP_MASTER_5)
-                #await cog.achievement_award_notification(REP_MASTER_5, member)
-
-    @logger.catch
-    async def kotleta_handler(self, member, achievements, cog):
-        esport_role = get(member.guild.roles, name='Киберспортсмен')
-        KOTLETA_1 = 'AID_Kotleta_1'
-
-        if esport_role in member.roles:
-            if KOTLETA_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, KOTLETA_1)
-                #await cog.achievement_award_notification(KOTLETA_1, member)
-
-    @logger.catch
-    async def philanthropist_handler(self, member, achievements, cog):
-        stark_role = get(member.guild.roles, name='Филантроп')
-        PHILANTHROPIST_1 = 'AID_Philanthropist_1'
-
-        if stark_role in member.roles:
-            if PHILANTHROPIST_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, PHILANTHROPIST_1)
-                #await cog.achievement_award_notification(PHILANTHROPIST_1, member)
-
-    @logger.catch
-    async def voice_master_handler(self, member, achievements, cog):
-        seconds = await self.bot.pg_pool.fetchval(
-            'SELECT invoice_time FROM users_stats WHERE user_id = $1',
-            member.id)
-        hours = seconds//3600
-        VOICE_MASTER_1 = 'AID_VoiceMaster_1'
-        VOICE_MASTER_2 = 'AID_VoiceMaster_2'
-        VOICE_MASTER_3 = 'AID_VoiceMaster_3'
-        VOICE_MASTER_4 = 'AID_VoiceMaster_4'
-        VOICE_MASTER_5 = 'AID_VoiceMaster_5'
-
-        if hours >= 10:
-            if VOICE_MASTER_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, VOICE_MASTER_1)
-                #await cog.achievement_award_notification(VOICE_MASTER_1, member)
-        if hours >= 25:
-            if VOICE_MASTER_2 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, VOICE_MASTER_2)
-                #await cog.achievement_award_notification(VOICE_MASTER_2, member)
-        if hours >= 50:
-            if VOICE_MASTER_3 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, VOICE_MASTER_3)
-                #await cog.achievement_award_notification(VOICE_MASTER_3, member)
-        if hours >= 100:
-            if VOICE_MASTER_4 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, VOICE_MASTER_4)
-                #await cog.achievement_award_notification(VOICE_MASTER_4, member)
-        if hours >= 250:
-            if VOICE_MASTER_5 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, VOICE_MASTER_5)
-                #await cog.achievement_award_notification(VOICE_MASTER_5, member)
+    async def collect_metrics(self, members: List[Member]) -> Tuple[Dict[int, Dict[str, int]], Dict[int, Set[str]]]:
+        """
+        Loads the achievement metrics and the unlocked achievements of the members
+        with one query per data source.
+        Members without a users_stats record are left out.
+        """
+        user_ids = [member.id for member in members]
+        stats = await self.bot.db.records(
+            'SELECT user_id, messages_count, rep_rank, invoice_time '
+            'FROM users_stats WHERE user_id = ANY($1::bigint[])',
+            user_ids)
+        achievements = await self.bot.db.records(
+            'SELECT user_id, internal_id FROM user_achievements WHERE user_id = ANY($1::bigint[])',
+            user_ids)
+        vbucks = dict(await self.bot.db.records(
+            "SELECT user_id, sum(price) FROM purchases "
+            "WHERE currency = 'vbucks' AND user_id = ANY($1::bigint[]) "
+            "GROUP BY user_id",
+            user_ids))
+        levels = dict(await self.bot.db.records(
+            'SELECT user_id, level FROM leveling WHERE user_id = ANY($1::bigint[])',
+            user_ids))
+        joined = dict(await self.bot.db.records(
+            'SELECT user_id, joined_at FROM users_info WHERE user_id = ANY($1::bigint[])',
+            user_ids))
+        songs = dict(await self.bot.db.records(
+            "SELECT suggestion_author_id, count(*) FROM song_suggestions "
+            "WHERE suggestion_type = 'add' AND curator_decision = 'true' "
+            "AND suggestion_author_id = ANY($1::bigint[]) "
+            "GROUP BY suggestion_author_id",
+            user_ids))
+
+        esport_role = get(self.bot.guild.roles, name='Киберспортсмен')
+        stark_role = get(self.bot.guild.roles, name='Филантроп')
+        members = {member.id: member for member in members}
+        now = datetime.utcnow()
+        metrics = {}
+        unlocked = {user_id: set() for user_id, *_ in stats}
+        for user_id, internal_id in achievements:
+            if user_id in unlocked:
+                unlocked[user_id].add(internal_id)
+
+        for user_id, messages_count, rep_rank, invoice_time in stats:
+            member = members[user_id]
+            joined_at = joined.get(user_id) or member.joined_at
+            level = (levels.get(user_id) or 0) + self.bot.leveling_buffer.pending(user_id).get('level', 0)
+            messages = messages_count + self.bot.users_stats_buffer.pending(user_id).get('messages_count', 0)
+
+            metrics[user_id] = {
+                'messages': messages,
+                'days_on_server': (now - joined_at).days,
+                'roles': len(member.roles) - 1,
+                'vbucks': vbucks.get(user_id, 0),
+                'reputation': rep_rank,
+                'esport_role': int(esport_role in member.roles),
+                'philanthropist_role': int(stark_role in member.roles),
+                'voice_hours': invoice_time // 3600,
+                'level': level,
+                'approved_songs': songs.get(user_id, 0),
+            }
+
+        return metrics, unlocked
 
     @logger.catch
-    async def leveling_handler(self, member, achievements, cog):
-        level = await self.bot.pg_pool.fetchval(
-            'SELECT level FROM leveling WHERE user_id = $1',
-            member.id)
-        LEVELING_1 = 'AID_Leveling_1'
-        LEVELING_2 = 'AID_Leveling_2'
-        LEVELING_3 = 'AID_Leveling_3'
-        LEVELING_4 = 'AID_Leveling_4'
-        LEVELING_5 = 'AID_Leveling_5'
-        LEVELING_6 = 'AID_Leveling_6'
-
-        if level >= 3:
-            if LEVELING_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, LEVELING_1)
-                #await cog.achievement_award_notification(LEVELING_1, member)
-        if level >= 10:
-            if LEVELING_2 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, LEVELING_2)
-                #await cog.achievement_award_notification(LEVELING_2, member)
-        if level >= 25:
-            if LEVELING_3 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, LEVELING_3)
-                #await cog.achievement_award_notification(LEVELING_3, member)
-        if level >= 50:
-            if LEVELING_4 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, LEVELING_4)
-                #await cog.achievement_award_notification(LEVELING_4, member)
-        if level >= 75:
-            if LEVELING_5 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, LEVELING_5)
-                #await cog.achievement_award_notification(LEVELING_5, member)
-        if level >= 100:
-            if LEVELING_6 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, LEVELING_6)
-                #await cog.achievement_award_notification(LEVELING_6, member)
+    async def handle_achievements(self, members: List[Member], cog: Cog):
+        """
+        Evaluates the achievement rules for the members in memory
+        and gives all new achievements in one batch
+        """
+        if not members:
+            return
 
-    @logger.catch
-    async def musicDJ_handler(self, member, achievements, cog):
-        suggestions = await self.bot.pg_pool.fetch(
-            "SELECT suggestion_id FROM song_suggestions "
-            "WHERE suggestion_type = 'add' AND curator_decision = 'true' "
-            "AND suggestion_author_id = $1", member.id
-        )
-        MUSIC_DJ_1 = 'AID_MusicDJ_1'
-        MUSIC_DJ_2 = 'AID_MusicDJ_2'
-        MUSIC_DJ_3 = 'AID_MusicDJ_3'
+        metrics, unlocked = await self.collect_metrics(members)
+        awards = {}
+        for user_id, user_metrics in metrics.items():
+            new = [a for a in earned_achievements(user_metrics) if a not in unlocked[user_id]]
+            if new:
+                awards[user_id] = new
 
-        if len(suggestions) >= 5:
-            if MUSIC_DJ_1 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, MUSIC_DJ_1)
-                #await cog.achievement_award_notification(MUSIC_DJ_1, member)
-        if len(suggestions) >= 15:
-            if MUSIC_DJ_2 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, MUSIC_DJ_2)
-                #await cog.achievement_award_notification(MUSIC_DJ_2, member)
-        if len(suggestions) >= 25:
-            if MUSIC_DJ_3 not in achievements:
-                await cog.give_achievement(self.bot.guild.me.id, member.id, MUSIC_DJ_3)
-                #await cog.achievement_award_notification(MUSIC_DJ_3, member)
+        if awards:
+            await cog.give_achievements(self.bot.guild.me.id, awards)
 
 
 def setup(bot):
@@ -1,10 +1,7 @@
-import ast
 import asyncio
-import json
 from datetime import datetime
-from operator import itemgetter
 from random import choice
-from typing import Optional
+from typing import Dict, List, Optional
 
 from discord import Color, Embed, Forbidden, Member
 from discord.ext.commands import (Cog, check_any, command, dm_only, guild_only,
@@ -12,8 +9,10 @@ from discord.ext.commands import (Cog, check_any, command, dm_only, guild_only,
 from discord.ext.menus import ListPageSource, MenuPages
 from loguru import logger
 
+from ..db import user_records
 from ..utils.checks import is_channel, required_level
 from ..utils.constants import STATS_CHANNEL
+from ..utils.event_bus import event_bus
 from ..utils.lazy_paginator import paginate
 from ..utils.utils import edit_user_reputation, load_commands_from_json
 
@@ -82,13 +81,7 @@ class AchievementSystem(Cog, name='Система достижений'):
         return (await self.user_have_achievement(user_id, achievement))
 
     async def user_have_achievement(self, user_id: int, achievement: str) -> bool:
-        data = await self.bot.pg_pool.fetchval(
-            'SELECT achievements_list FROM users_stats WHERE user_id = $1',
-            user_id)
-        data = ast.literal_eval(data)
-        data = data['user_achievements_list']
-        user_achievements = [key for dic in data for key in dic.keys()]
-        return achievement in user_achievements
+        return await user_records.has_achievement(self.bot.pg_pool, user_id, achievement)
 
     async def edit_rep_for_achievement(self, target_id: int, achievement: str, action: str):
         rep_boost = await self.bot.pg_pool.fetchval(
@@ -98,43 +91,57 @@ class AchievementSystem(Cog, name='Система достижений'):
 
     @logger.catch
     async def give_achievement(self, admin_id: int, target_id: int, achievement: str):
-        if not (await self.user_have_achievement(target_id, achievement)):
-            rec = await self.bot.pg_pool.fetchval(
-                "SELECT id FROM achievements WHERE "
-                "to_tsvector(internal_id) @@ to_tsquery($1)",
-                achievement)
-            if rec is None:
-                return
-            data = await self.bot.pg_pool.fetchval(
-                'SELECT achievements_list FROM users_stats WHERE user_id = $1',
-                target_id)
-            data = ast.literal_eval(data)
-            transaction = {
-                achievement: {
-                    'id': len(data['user_achievements_list'])+1,
-                    'achieved_at': datetime.now().strftime('%d.%m.%Y %H:%M:%S'),
-                    'given_by': admin_id
-                    }
-                }
-            data['user_achievements_list'].append(transaction)
-            await self.bot.pg_pool.execute(
-                'UPDATE users_stats SET achievements_list = $1 WHERE user_id = $2',
-                json.dumps(data, ensure_ascii=False), target_id)
+        rec = await self.bot.pg_pool.fetchval(
+            "SELECT id FROM achievements WHERE "
+            "to_tsvector(internal_id) @@ to_tsquery($1)",
+            achievement)
+        if rec is None:
+            return
+        if await user_records.add_achievement(self.bot.pg_pool, target_id, achievement, admin_id):
+            self.bot.leaderboards.increment('achievements', target_id, 1)
             await self.edit_rep_for_achievement(target_id, achievement, '+')
 
+    @logger.catch
+    async def give_achievements(self, admin_id: int, awards: Dict[int, List[str]]) -> Dict[int, List[str]]:
+        """
+        Gives achievements to many users in one transaction.
+        awards maps a user id to the achievements to give.
+        Returns the achievements that were actually given.
+        """
+        rep_boosts = dict(await self.bot.db.records(
+            'SELECT internal_id, rep_boost FROM achievements WHERE internal_id = ANY($1::text[])',
+            list({achievement for achievements in awards.values() for achievement in achievements})))
+        given = {}
+
+        async with self.bot.pg_pool.acquire() as conn:
+            async with conn.transaction():
+                added = await user_records.add_achievements(
+                    conn,
+                    ((user_id, achievement)
+                     for user_id, achievements in awards.items()
+                     for achievement in dict.fromkeys(achievements)
+                     if achievement in rep_boosts),
+                    admin_id)
+                for user_id, achievement in added:
+                    given.setdefault(user_id, []).append(achievement)
+
+                rep_ranks = await conn.fetch(
+                    'UPDATE users_stats AS s SET rep_rank = s.rep_rank + v.rep_boost '
+                    'FROM unnest($1::bigint[], $2::bigint[]) AS v(user_id, rep_boost) '
+                    'WHERE s.user_id = v.user_id RETURNING s.user_id, s.rep_rank',
+                    list(given),
+                    [sum(rep_boosts[a] or 0 for a in achievements) for achievements in given.values()])
+
+        for user_id, achievements in given.items():
+            self.bot.leaderboards.increment('achievements', user_id, len(achievements))
+        for user_id, rep_rank in rep_ranks:
+            event_bus.publish('counter_changed', user_id, 'reputation', rep_rank)
+        return given
+
     @logger.catch
     async def take_achievement_away(self, target_id: int, achievement: str):
-        if (await self.user_have_achievement(target_id, achievement)):
-            data = await self.bot.pg_pool.fetchval(
-                'SELECT achievements_list FROM users_stats WHERE user_id = $1',
-                target_id)
-            data = ast.literal_eval(data)
-            temp = data['user_achievements_list']
-            new_list = [a for a in temp if achievement not in list(a.keys())]
-            data['user_achievements_list'] = new_list
-            await self.bot.pg_pool.execute(
-                'UPDATE users_stats SET achievements_list = $1 WHERE user_id = $2',
-                json.dumps(data, ensure_ascii=False), target_id)
+        if await user_records.remove_achievement(self.bot.pg_pool, target_id, achievement):
+            self.bot.leaderboards.increment('achievements', target_id, -1)
             await self.edit_rep_for_achievement(target_id, achievement, '-')
 
     @logger.catch
@@ -373,26 +380,15 @@ class AchievementSystem(Cog, name='Система достижений'):
     @required_level(cmd["inventory"]["required_level"])
     @logger.catch
     async def inventory_command(self, ctx):
-        rec = await self.bot.pg_pool.fetchval(
-            'SELECT achievements_list FROM users_stats WHERE user_id = $1',
+        data = await self.bot.pg_pool.fetch(
+            'SELECT a.*, u.achieved_at FROM user_achievements u '
+            'JOIN achievements a ON a.internal_id = u.internal_id '
+            'WHERE u.user_id = $1 ORDER BY u.achieved_at DESC NULLS LAST',
             ctx.author.id)
-        rec = ast.literal_eval(rec)
-        user_data = rec['user_achievements_list']
-        if user_data:
-            user_achievements = tuple(
-                [key for dic in user_data for key in dic.keys()]
-            )
-            achievements_data = await self.bot.pg_pool.fetch(
-                'SELECT * FROM achievements WHERE internal_id = any($1::text[]) ORDER BY id',
-                user_achievements)
-            achievements_data = [list(l) for l in achievements_data]
-
-            for dic in user_data:
-                achievement_id = list(dic.keys())[0]
-                for entry in achievements_data:
-                    if achievement_id in entry:
-                        entry.append(dic[achievement_id]['achieved_at'])
-            data = sorted(achievements_data, key=itemgetter(-1), reverse=True)
+        if data:
+            # Achievements migrated without a date have no achieved_at
+            data = [[*entry[:-1], entry[-1].strftime('%d.%m.%Y %H:%M:%S') if entry[-1] else '—']
+                    for entry in data]
 
             method = await self.display_method(ctx)
             if method == 'detailed':
@@ -518,12 +514,7 @@ class AchievementSystem(Cog, name='Система достижений'):
         if user_id is None:
             return await ctx.message.add_reaction('🟥')
 
-        data = await self.bot.pg_pool.fetchval(
-            'SELECT achievements_list FROM users_stats WHERE user_id = $1',
-            user_id)
-        data = ast.literal_eval(data)
-        data = data['user_achievements_list']
-        user_achievements = [key for dic in data for key in dic.keys()]
+        user_achievements = await user_records.user_achievement_ids(self.bot.pg_pool, user_id)
 
         for achievement in user_achievements:
             await self.take_achievement_away(user_id, achievement)
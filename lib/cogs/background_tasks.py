@@ -1,23 +1,21 @@
-import json
-import os
 from datetime import datetime
 from itertools import cycle
+from typing import Optional
 
-import aiofiles
-from aiohttp import ClientSession
 from discord import Activity, ActivityType
 from discord.ext import tasks
 from discord.ext.commands import Cog
 from discord.utils import get
-from jishaku.functools import executor_function
 from loguru import logger
 
-from ..db import db
+from athena.artifacts import ShopArtifacts
+from athena.renderer import ShopRenderer
+
 from ..utils.constants import (CAPTAIN_ROLE_ID, OLD_ROLE_ID, VETERAN_ROLE_ID,
                                WORKER_ROLE_ID)
+from ..utils.shop_watcher import ShopWatcher
 from ..utils.utils import edit_user_reputation
 
-ITEM_SHOP_ENDPOINT = "https://fortnite-api.com/v2/shop/br/combined"
 ACTIVITIES = cycle([
     '+help | durker.fun',
     '+help | docs.durker.fun',
@@ -32,10 +30,15 @@ class BackgroundTasks(Cog, name='Фоновые процессы'):
         self.change_bot_activity.start()
         self.check_activity_role.start()
         self.update_user_nickname.start()
+        self.shop_renderer = ShopRenderer(bot.http_client)
+        self.shop_watcher = ShopWatcher(bot.http_client, self.shop_renderer.language)
         self.update_fortnite_shop_hash.start()
         if self.bot.ready:
             bot.loop.create_task(self.init_vars())
 
+    def cog_unload(self):
+        self.shop_renderer.close()
+
     @logger.catch
     async def init_vars(self):
         self.mod_cog = self.bot.get_cog('Модерация')
@@ -122,46 +125,30 @@ class BackgroundTasks(Cog, name='Фоновые процессы'):
         await self.bot.wait_until_ready()
 
 
-    @executor_function
-    def create_item_shop_image(self, data: dict):
-        if data['len'] <= 59:
-            os.system("python ./athena/athena.py")
-        else:
-            os.system("python ./athena/athena_monotonic.py")
+    async def create_item_shop_image(self, shop: dict) -> Optional[ShopArtifacts]:
+        return await self.shop_renderer.render(shop)
 
     @tasks.loop(minutes=1.0)
     @logger.catch
     async def update_fortnite_shop_hash(self):
-        """Makes a request to the api and checks if the hash has been updated"""
-        async with ClientSession() as session:
-            async with session.get(url=ITEM_SHOP_ENDPOINT) as r:
-                if r.status != 200:
-                    return
-
-                data = await r.json()
-                new_hash = data['data']['hash']
-                new_len = len(data['data']['featured']['entries']) + len(data['data']['daily']['entries'])
-                async with aiofiles.open('athena/athena_cache.json', mode='r', encoding='utf-8') as f:
-                    cached_data = json.loads(await f.read())
-                    cached_hash = cached_data['hash']
-                    cached_len = cached_data['len']
-
-        if new_hash != cached_hash or new_len != cached_len:
-            date = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-            cache = {"hash": new_hash, "date":date, "len": new_len}
-
-            async with aiofiles.open('athena/athena_cache.json', 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(cache, indent=2, sort_keys=True, ensure_ascii=False))
-
-            await self.create_item_shop_image(data=cache)
-            date = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-            await self.bot.logs_channel.send(
-                f"Shop updated & rendered for `{date}` | `{cache['hash']}` | `{cache['len']}`"
-            )
+        """Polls the api and renders the shop if the hash has been updated"""
+        loop = self.update_fortnite_shop_hash
+        scheduled = loop.seconds + loop.minutes * 60 + loop.hours * 3600
+        loop.change_interval(seconds=self.shop_watcher.next_interval(scheduled))
+        shop = await self.shop_watcher.poll()
+        if shop is None:
+            return
+
+        await self.create_item_shop_image(shop)
+        date = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+        await self.bot.logs_channel.send(
+            f"Shop updated & rendered for `{date}` | `{self.shop_watcher.hash}` | `{self.shop_watcher.len}`"
+        )
 
     @update_fortnite_shop_hash.before_loop
     async def before_update_shop_hash(self):
         await self.bot.wait_until_ready()
+        await self.shop_watcher.load()
 
 def setup(bot):
     bot.add_cog(BackgroundTasks(bot))
@@ -7,7 +7,6 @@ from random import choice, randint
 from time import time
 from typing import Optional
 
-from aiohttp import ClientSession
 from discord import Color, Embed, File, Member
 from discord import __version__ as discord_version
 from discord.ext.commands import (BucketType, Cog, EmojiConverter, Greedy,
@@ -16,7 +15,6 @@ from discord.ext.commands import (BucketType, Cog, EmojiConverter, Greedy,
 from loguru import logger
 from psutil import Process, cpu_percent, virtual_memory
 
-from ..db import db
 from ..utils.checks import is_channel, required_level
 from ..utils.constants import (CHASOVOY_ROLE_ID, CONSOLE_CHANNEL,
                                KAPITALIST_ROLE_ID, MAGNAT_ROLE_ID,
@@ -61,15 +59,15 @@ class Commands(Cog, name='Базовые команды'):
 
         song = song.replace('`', '­')
         date = datetime.now()
-        db.insert("song_suggestions",
+        await self.bot.db.insert("song_suggestions",
                 {"suggestion_author_id": ctx.author.id,
                 "suggestion_type": "add",
                 "suggested_song": song,
                 "created_at": date}
         )
-        cursor = db.get_cursor()
-        cursor.execute("SELECT suggestion_id FROM song_suggestions where suggestion_author_id = %s and suggested_song = %s and created_at = %s", (ctx.author.id,song,date,))
-        rec = cursor.fetchone()
+        rec = await self.bot.db.record(
+            "SELECT suggestion_id FROM song_suggestions where suggestion_author_id = $1 and suggested_song = $2 and created_at = $3",
+            ctx.author.id, song, date)
 
         embed = Embed(
             title = "✅ Выполнено",
@@ -267,18 +265,17 @@ class Commands(Cog, name='Базовые команды'):
             await ctx.reply(embed=embed, mention_author=False)
             return
 
-        async with ClientSession() as session:
-            async with session.get("https://corona.lmao.ninja/v2/countries") as r:
-                if r.status == 200:
-                    data = await r.json()
-                else:
-                    embed = Embed(
-                        title='❗ Внимание!',
-                        description =f"Что-то пошло не так. API вернуло: {r.status}",
-                        color=Color.red()
-                    )
-                    await ctx.reply(embed=embed, mention_author=False)
-                    return
+        async with self.bot.http_client.get("https://corona.lmao.ninja/v2/countries") as r:
+            if r.status == 200:
+                data = await r.json()
+            else:
+                embed = Embed(
+                    title='❗ Внимание!',
+                    description =f"Что-то пошло не так. API вернуло: {r.status}",
+                    color=Color.red()
+                )
+                await ctx.reply(embed=embed, mention_author=False)
+                return
 
         for item in data:
             if item["country"].lower() == country.lower():
@@ -10,11 +10,11 @@ from discord.ext.commands.cooldowns import BucketType
 from discord.utils import get
 from loguru import logger
 
-from ..db import db
 from ..utils.constants import (CACTUS_ROLE_ID, CAPTAIN_ROLE_ID,
                                CHASOVOY_ROLE_ID, CREATOR_ROLE_ID,
                                GVARDIYA_ROLE_ID, JOHN_WICK_ROLE_ID,
                                OLD_ROLE_ID, VETERAN_ROLE_ID)
+from ..utils.event_bus import event_bus
 from ..utils.utils import cooldown_timer_str, load_commands_from_json
 
 cmd = load_commands_from_json("durka")
@@ -27,16 +27,15 @@ class NotEnoughPermsForCalling(CommandError):
     pass
 
 def have_available_durka_calls() -> bool:
-    def predicate(ctx):
+    async def predicate(ctx):
         chasovoy = get(ctx.guild.roles, id=CHASOVOY_ROLE_ID)
         if ctx.author.top_role.position >= chasovoy.position:
             return True
 
-        rec = db.fetchone(["available_durka_calls"], "durka_stats", "user_id", ctx.author.id)[0]
+        rec = (await ctx.bot.profiles.get(ctx.author.id))['available_durka_calls']
         if rec > 0:
             if not ctx.command.is_on_cooldown(ctx):
-                db.execute(f"UPDATE durka_stats SET available_durka_calls = available_durka_calls - 1 WHERE user_id = {ctx.author.id}")
-                db.commit()
+                await ctx.bot.profiles.increment(ctx.author.id, 'durka_stats', available_durka_calls=-1)
             return True
         else:
             raise NoAvaliableDurkaCalls
@@ -79,13 +78,12 @@ class Durka(Cog, name='Родина-Дурка'):
     async def init_vars(self):
         self.chasovoy = self.bot.guild.get_role(CHASOVOY_ROLE_ID)
 
-    def update_available_durka_calls(self):
-        for member in self.bot.guild.members:
-            if member.pending:
-                continue
-
-            db.execute("UPDATE durka_stats SET available_durka_calls = 3 WHERE user_id = %s", member.id)
-            db.commit()
+    async def update_available_durka_calls(self):
+        members = [member.id for member in self.bot.guild.members if not member.pending]
+        await self.bot.db.execute("UPDATE durka_stats SET available_durka_calls = 3 WHERE user_id = ANY($1::bigint[])",
+                                  members)
+        for member_id in members:
+            self.bot.profiles.invalidate(member_id)
 
     def schedule_durka_calls_update(self, sched):
         sched.add_job(self.update_available_durka_calls, CronTrigger(hour=3), misfire_grace_time=300)
@@ -196,8 +194,7 @@ class Durka(Cog, name='Родина-Дурка'):
                 "Также за сутки вы можете вызвать дурку не более 3-х раз.")
             ctx.command.reset_cooldown(ctx)
             if ctx.author.top_role.position < self.chasovoy.position:
-                db.execute("UPDATE durka_stats SET available_durka_calls = available_durka_calls + 1 WHERE user_id = %s", ctx.author.id)
-                db.commit()
+                await self.bot.profiles.increment(ctx.author.id, 'durka_stats', available_durka_calls=1)
             return
 
         if len(targets) > 5:
@@ -211,12 +208,12 @@ class Durka(Cog, name='Родина-Дурка'):
             return
 
         for target in targets:
-            db.execute("UPDATE durka_stats SET received_durka_calls = received_durka_calls + 1 WHERE user_id = %s", target.id)
-            db.commit()
+            await self.bot.profiles.increment(target.id, 'durka_stats', received_durka_calls=1)
             if ctx.author.top_role.position >= self.chasovoy.position:
                 ctx.command.reset_cooldown(ctx)
-                db.execute("UPDATE users_stats SET rep_rank = rep_rank - 50 WHERE user_id = %s", target.id)
-                db.commit()
+                rep_rank = await self.bot.db.field("UPDATE users_stats SET rep_rank = rep_rank - 50 WHERE user_id = $1 "
+                                                   "RETURNING rep_rank", target.id)
+                event_bus.publish('counter_changed', target.id, 'reputation', rep_rank)
 
         if 50 <= randint(1, 100) <= 55:
             if ctx.author != self.bot.owner:
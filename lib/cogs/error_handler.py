@@ -4,7 +4,6 @@ from datetime import datetime
 import discord
 from discord.ext import commands
 
-from ..db import db
 from ..utils.exceptions import (InForbiddenTextChannel, InsufficientLevel,
                                 NotInAllowedTextChannel)
 from ..utils.utils import (cooldown_timer_str, get_command_required_level,
@@ -139,7 +138,7 @@ class CommandErrorHandler(commands.Cog, name='Command error handler'):
 
         elif isinstance(exc, InsufficientLevel):
             level = await get_command_required_level(ctx.command)
-            member_level = db.fetchone(['level'], 'leveling', 'user_id', ctx.author.id)[0]
+            member_level = (await self.bot.profiles.get(ctx.author.id))['level']
             embed = discord.Embed(
                 title='🔒 Недостаточный уровень!',
                 description=f"Команда `{ctx.command.name}` требует наличия **{level}** уровня " \
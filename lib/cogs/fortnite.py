@@ -1,3 +1,4 @@
+import asyncio
 import json
 import shlex
 from argparse import ArgumentParser
@@ -7,10 +8,11 @@ from io import BytesIO
 from os import getenv
 from random import choice
 from typing import Optional
+from urllib.parse import parse_qsl
 
 import aiofiles
-from aiohttp import ClientSession
-from discord import Color, Embed, File, HTTPException
+from discord import Color, Embed, File
+from discord.ext import tasks
 from discord.ext.commands import (BucketType, Cog, command, cooldown, dm_only,
                                   guild_only, is_owner)
 from loguru import logger
@@ -18,6 +20,8 @@ from loguru import logger
 from ..utils.cataba_icon import BaseIcon
 from ..utils.checks import is_channel, required_level
 from ..utils.constants import CONSOLE_CHANNEL, PLACEHOLDER, STATS_CHANNEL
+from ..utils.cosmetics_index import CosmeticsIndex, UnsupportedQuery
+from ..utils.dev_servers import DevServersMonitor, DevServerState
 from ..utils.paginator import Paginator
 from ..utils.utils import load_commands_from_json
 
@@ -35,6 +39,25 @@ class Fortnite(Cog, name='Fortnite'):
         self.trn_headers = {"TRN-Api-Key": getenv("TRN_API_KEY")}
         self.fnapicom_headers = {"x-api-key", getenv("FORTNITEAPICOM_TOKEN")}
         self.fnapiio_headers = {"Authorization": getenv("FORTNITEAPIIO_TOKEN")}
+        self.dev_servers = DevServersMonitor.from_file(bot.http_client, './data/json/fn_dev_servers.json')
+        self.refresh_dev_servers.start()
+        self.cosmetics = CosmeticsIndex(bot.http_client)
+        self.sync_cosmetics.start()
+
+    def cog_unload(self):
+        self.refresh_dev_servers.cancel()
+        self.sync_cosmetics.cancel()
+
+    @tasks.loop(hours=1.0)
+    @logger.catch
+    async def sync_cosmetics(self):
+        if self.cosmetics.catalog is None:
+            await self.cosmetics.load()
+        await self.cosmetics.sync()
+
+    @sync_cosmetics.before_loop
+    async def before_sync_cosmetics(self):
+        await self.bot.wait_until_ready()
 
     @Cog.listener()
     async def on_ready(self):
@@ -263,8 +286,31 @@ class Fortnite(Cog, name='Fortnite'):
             if args.lastAppearance:
                 parameter += f"&lastAppearance={args.lastAppearance[0].lower()}"
 
-            async with ClientSession() as session:
-                async with session.get(url=f"https://fortnite-api.com/v2/cosmetics/br/search{parameter}") as r:
+            # The local index gets exactly the parameters that the API would get
+            options = dict(parse_qsl(parameter[1:]))
+            query = {
+                key: value for key, value in options.items()
+                if key not in ('language', 'searchLanguage', 'matchMethod')
+            }
+            try:
+                data = {"data": self.cosmetics.search(
+                    query,
+                    language=options["language"],
+                    search_language=options["searchLanguage"],
+                    match_method=options["matchMethod"]
+                )}
+            except UnsupportedQuery:
+                data = None
+
+            if data is not None and data["data"] is None:
+                embed = Embed(
+                    title='Предмет не найден.',
+                    color=Color.red(),
+                    timestamp=datetime.utcnow())
+                return await ctx.reply(embed=embed, mention_author=False)
+
+            if data is None:
+                async with self.bot.http_client.get(url=f"https://fortnite-api.com/v2/cosmetics/br/search{parameter}") as r:
                     response_data = await r.json()
                     if r.status == 404:
                         embed = Embed(
@@ -429,41 +475,40 @@ class Fortnite(Cog, name='Fortnite'):
             await ctx.message.reply(embed=embed, mention_author=False)
             return
 
-        async with ClientSession() as session:
-            async with session.get(f"https://fortnite-api.com/v2/news/{mode}", params={"language": language}) as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                    return
-
-                data = await r.json()
-                gif = data.get("data", {}).get("image", PLACEHOLDER)
-                embed=Embed(color=Color.random(), timestamp=datetime.utcnow())
-                embed.set_footer(text=f'{ctx.author.name}', icon_url=ctx.author.avatar_url)
-                if mode == "br":
-                    embed.title = "Новости Королевской Битвы"
-                    embed.set_image(url=gif)
-                elif mode == "creative":
-                    embed.title = "Новости Творческого режима"
-                    embed.set_image(url=gif)
-                elif mode == "stw":
-                    embeds = []
-                    for i in range(len(data["data"]["messages"])):
-                        content = data["data"]["messages"][i]
-                        embed = Embed(
-                            title=content["title"] + " | " + content["adspace"],
-                            description=content["body"],
-                            color=Color.random())
-                        embed.set_image(url=content["image"])
-                        embeds.append(embed)
+        async with self.bot.http_client.get(f"https://fortnite-api.com/v2/news/{mode}", params={"language": language}) as r:
+            if r.status != 200:
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
+                )
+                return
 
-                    message = await ctx.reply(embed=embeds[0], mention_author=False)
-                    page = Paginator(self.bot, message, only=ctx.author, embeds=embeds)
-                    return await page.start()
+            data = await r.json()
+            gif = data.get("data", {}).get("image", PLACEHOLDER)
+            embed=Embed(color=Color.random(), timestamp=datetime.utcnow())
+            embed.set_footer(text=f'{ctx.author.name}', icon_url=ctx.author.avatar_url)
+            if mode == "br":
+                embed.title = "Новости Королевской Битвы"
+                embed.set_image(url=gif)
+            elif mode == "creative":
+                embed.title = "Новости Творческого режима"
+                embed.set_image(url=gif)
+            elif mode == "stw":
+                embeds = []
+                for i in range(len(data["data"]["messages"])):
+                    content = data["data"]["messages"][i]
+                    embed = Embed(
+                        title=content["title"] + " | " + content["adspace"],
+                        description=content["body"],
+                        color=Color.random())
+                    embed.set_image(url=content["image"])
+                    embeds.append(embed)
+
+                message = await ctx.reply(embed=embeds[0], mention_author=False)
+                page = Paginator(self.bot, message, only=ctx.author, embeds=embeds)
+                return await page.start()
 
-                await ctx.reply(embed=embed, mention_author=False)
+            await ctx.reply(embed=embed, mention_author=False)
 
 
     @command(name=cmd["creatorcode"]["name"], aliases=cmd["creatorcode"]["aliases"],
@@ -478,40 +523,39 @@ class Fortnite(Cog, name='Fortnite'):
         if code is None:
             return await ctx.reply('Укажите код автора.', mention_author=False)
 
-        async with ClientSession() as session:
-            async with session.get(f"https://fortnite-api.com/v2/creatorcode/search/all", params={"name": code}) as r:
-                if r.status == 404:
-                    embed = Embed(title='❗ Внимание!', description ="Указанный тег автора не найден.", color= Color.gold())
-                    await ctx.message.reply(embed=embed, mention_author=False)
-                elif r.status == 200:
-                    data = await r.json()
-                    data = data["data"]
-                    code_embeds = []
-
-                    for i in range(0,len(data)):
-                        embed = Embed(
-                            title=f'Код автора: {data[i]["code"]}',
-                            color=Color.green() if data[i]["status"] == 'ACTIVE' else Color.red(),
-                            timestamp=datetime.utcnow()
-                        )
-                        embed.add_field(
-                            name="Account",
-                            value=f'Name: {data[i]["account"]["name"]}\nID: {data[i]["account"]["id"]}',
-                            inline=False
-                        )
-                        embed.add_field(
-                            name="Status",
-                            value=data[i]["status"],
-                            inline=True
-                        )
-                        code_embeds.append(embed)
+        async with self.bot.http_client.get(f"https://fortnite-api.com/v2/creatorcode/search/all", params={"name": code}) as r:
+            if r.status == 404:
+                embed = Embed(title='❗ Внимание!', description ="Указанный тег автора не найден.", color= Color.gold())
+                await ctx.message.reply(embed=embed, mention_author=False)
+            elif r.status == 200:
+                data = await r.json()
+                data = data["data"]
+                code_embeds = []
 
-                    message = await ctx.reply(embed=code_embeds[0], mention_author=False)
-                    page = Paginator(self.bot, message, only=ctx.author, embeds=code_embeds)
-                    await page.start()
+                for i in range(0,len(data)):
+                    embed = Embed(
+                        title=f'Код автора: {data[i]["code"]}',
+                        color=Color.green() if data[i]["status"] == 'ACTIVE' else Color.red(),
+                        timestamp=datetime.utcnow()
+                    )
+                    embed.add_field(
+                        name="Account",
+                        value=f'Name: {data[i]["account"]["name"]}\nID: {data[i]["account"]["id"]}',
+                        inline=False
+                    )
+                    embed.add_field(
+                        name="Status",
+                        value=data[i]["status"],
+                        inline=True
+                    )
+                    code_embeds.append(embed)
+
+                message = await ctx.reply(embed=code_embeds[0], mention_author=False)
+                page = Paginator(self.bot, message, only=ctx.author, embeds=code_embeds)
+                await page.start()
 
-                else:
-                    await ctx.reply(f"```json\n{r.text}```", mention_author=False)
+            else:
+                await ctx.reply(f"```json\n{r.text}```", mention_author=False)
 
 
     @command(name=cmd["shop"]["name"], aliases=cmd["shop"]["aliases"],
@@ -525,26 +569,32 @@ class Fortnite(Cog, name='Fortnite'):
     @guild_only()
     @logger.catch
     async def show_battle_royale_shop_command(self, ctx):
-        # I'm kinda lazy, so i hardcoded path to shop image which is generated by another script
-        try:
-            embed = Embed(
-                title="Магазин Королевской Битвы",
-                color=0x0050BE,
-                timestamp=datetime.utcnow(),
-                description=f"⌛ Дата: {datetime.now().strftime('%d.%m.%Y')}"
-            )
-            shop_img = File("/home/lyndholm/cataba/itemshop.png", filename="itemshop.png")
-            embed.set_image(url="attachment://itemshop.png")
-            try:
-                await ctx.reply(embed=embed, file=shop_img, mention_author=False)
-            except HTTPException:
-                shop_img = File("/home/lyndholm/cataba/itemshop.jpg", filename="itemshop.jpg")
-                embed.set_image(url="attachment://itemshop.jpg")
-                await ctx.reply(embed=embed, file=shop_img, mention_author=False)
-        except FileNotFoundError:
-            shop_img = File("athena/itemshop.jpg", filename="itemshop.jpg")
-            embed.set_image(url="attachment://itemshop.jpg")
-            await ctx.reply(embed=embed, file=shop_img, mention_author=False)
+        tasks_cog = self.bot.get_cog('Фоновые процессы')
+        artifacts = await tasks_cog.shop_renderer.latest() if tasks_cog else None
+        if artifacts is None:
+            await ctx.reply('Изображение магазина ещё не готово, попробуйте позже.', mention_author=False)
+            return
+
+        embed = Embed(
+            title="Магазин Королевской Битвы",
+            color=0x0050BE,
+            timestamp=datetime.utcnow(),
+            description=f"⌛ Дата: {datetime.now().strftime('%d.%m.%Y')}"
+        )
+        # The image of the current shop is uploaded once, later replies link to it
+        if artifacts.url:
+            embed.set_image(url=artifacts.url)
+            await ctx.reply(embed=embed, mention_author=False)
+            return
+
+        artifact = artifacts.Pick(ctx.guild.filesize_limit)
+        embed.set_image(url=f"attachment://{artifact.filename}")
+        message = await ctx.reply(
+            embed=embed, file=File(BytesIO(artifact.data), filename=artifact.filename),
+            mention_author=False
+        )
+        if message.embeds and message.embeds[0].image.url:
+            artifacts.url = message.embeds[0].image.url
 
 
     ### Fortniteapi.io
@@ -584,33 +634,32 @@ class Fortnite(Cog, name='Fortnite'):
         achievement_embeds = []
         divided = []
 
-        async with ClientSession(headers=self.fnapiio_headers) as session:
-            async with session.get("https://fortniteapi.io/v1/achievements", params={"lang":language}) as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                    return
+        async with self.bot.http_client.get("https://fortniteapi.io/v1/achievements", params={"lang":language}, headers=self.fnapiio_headers) as r:
+            if r.status != 200:
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
+                )
+                return
 
-                data = await r.json()
+            data = await r.json()
 
-                for i in range(0, len(data["achievements"]), 10):
-                    for j in range(i, i+10):
-                        try:
-                            embed=Embed(
-                            title=data["achievements"][j]['name'],
-                            description=data["achievements"][j]['description'],
-                            color=Color.purple()
-                            )
-                            embed.set_thumbnail(url=data["achievements"][j]['image'])
-                            divided.append(embed)
+            for i in range(0, len(data["achievements"]), 10):
+                for j in range(i, i+10):
+                    try:
+                        embed=Embed(
+                        title=data["achievements"][j]['name'],
+                        description=data["achievements"][j]['description'],
+                        color=Color.purple()
+                        )
+                        embed.set_thumbnail(url=data["achievements"][j]['image'])
+                        divided.append(embed)
 
-                        except IndexError:
-                            pass
+                    except IndexError:
+                        pass
 
-                    achievement_embeds.append([*divided])
-                    divided.clear()
+                achievement_embeds.append([*divided])
+                divided.clear()
 
         message = await ctx.reply(embed=achievement_embeds[0][0], mention_author=False)
         page = Paginator(self.bot, message, only=ctx.author, use_more=True, embeds=achievement_embeds)
@@ -707,16 +756,15 @@ class Fortnite(Cog, name='Fortnite'):
         QUEST_ID = "Quest_S19_Milestone"
         quest_embeds = []
         xp_total = 0
-        async with ClientSession(headers=self.fnapiio_headers) as session:
-            async with session.get("https://fortniteapi.io/v1/challenges", params={"season":"current", "lang":language}) as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                    return
+        async with self.bot.http_client.get("https://fortniteapi.io/v1/challenges", params={"season":"current", "lang":language}, headers=self.fnapiio_headers) as r:
+            if r.status != 200:
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
+                )
+                return
 
-                data = await r.json()
+            data = await r.json()
 
         for item in data['other']:
             if QUEST_ID in item['challenges'][0]['quest_id']:
@@ -822,35 +870,34 @@ class Fortnite(Cog, name='Fortnite'):
     @is_owner()
     @logger.catch
     async def fetch_benbot_status_command(self, ctx):
-        async with ClientSession() as session:
-            async with session.get('https://benbot.app/api/v1/status') as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                    return
-
-                data = await r.json()
+        async with self.bot.http_client.get('https://benbot.app/api/v1/status') as r:
+            if r.status != 200:
                 await ctx.reply(
-                    embed=Embed(title="BenBot Status", color=Color.random())
-                    .add_field(
-                        name="Version",
-                        value=f"`{data.get('currentFortniteVersion', 'Unknown')}`",
-                        inline=False,
-                    )
-                    .add_field(
-                        name="CDN Version",
-                        value=f"`{data.get('currentCdnVersion', 'Unknown')}`",
-                        inline=False,
-                    )
-                    .add_field(
-                        name="Pak Count",
-                        value=f"`{len(data.get('mountedPaks', []))}/{data.get('totalPakCount', 'Unknown')}`",
-                        inline=False,
-                    ),
+                    f"""```json\n{await r.text()}```""",
                     mention_author=False
                 )
+                return
+
+            data = await r.json()
+            await ctx.reply(
+                embed=Embed(title="BenBot Status", color=Color.random())
+                .add_field(
+                    name="Version",
+                    value=f"`{data.get('currentFortniteVersion', 'Unknown')}`",
+                    inline=False,
+                )
+                .add_field(
+                    name="CDN Version",
+                    value=f"`{data.get('currentCdnVersion', 'Unknown')}`",
+                    inline=False,
+                )
+                .add_field(
+                    name="Pak Count",
+                    value=f"`{len(data.get('mountedPaks', []))}/{data.get('totalPakCount', 'Unknown')}`",
+                    inline=False,
+                ),
+                mention_author=False
+            )
 
 
     @command(name=cmd["aes"]["name"], aliases=cmd["aes"]["aliases"],
@@ -865,29 +912,28 @@ class Fortnite(Cog, name='Fortnite'):
     @cooldown(cmd["aes"]["cooldown_rate"], cmd["aes"]["cooldown_per_second"], BucketType.member)
     @logger.catch
     async def fetch_fortnite_aes_command(self, ctx, version: Optional[str]):
-        async with ClientSession() as session:
-            async with session.get('https://benbot.app/api/v1/aes', params={"version":version} if version else None) as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                    return
+        async with self.bot.http_client.get('https://benbot.app/api/v1/aes', params={"version":version} if version else None) as r:
+            if r.status != 200:
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
+                )
+                return
 
-                data = await r.json()
-                aes_embeds = []
-                embed = Embed(title=data.get("version", "Unknown Version"), color=Color.teal()
-                            ).add_field(name="**Main Key**", value=data.get("mainKey", "Unknown"))
-                aes_embeds.append(embed)
+            data = await r.json()
+            aes_embeds = []
+            embed = Embed(title=data.get("version", "Unknown Version"), color=Color.teal()
+                        ).add_field(name="**Main Key**", value=data.get("mainKey", "Unknown"))
+            aes_embeds.append(embed)
 
-                for pak in data.get("dynamicKeys", {}):
-                    embed = Embed(title=pak.split("/")[-1], description=data.get("dynamicKeys", {}).get(pak, "Unknown"),
-                                color=Color.teal())
-                    aes_embeds.append(embed)
+            for pak in data.get("dynamicKeys", {}):
+                embed = Embed(title=pak.split("/")[-1], description=data.get("dynamicKeys", {}).get(pak, "Unknown"),
+                            color=Color.teal())
+                aes_embeds.append(embed)
 
-                message = await ctx.reply(embed=aes_embeds[0], mention_author=False)
-                page = Paginator(self.bot, message, only=ctx.author, embeds=aes_embeds)
-                await page.start()
+            message = await ctx.reply(embed=aes_embeds[0], mention_author=False)
+            page = Paginator(self.bot, message, only=ctx.author, embeds=aes_embeds)
+            await page.start()
 
 
     @command(name=cmd["cosmeticinfo"]["name"], aliases=cmd["cosmeticinfo"]["aliases"],
@@ -901,44 +947,72 @@ class Fortnite(Cog, name='Fortnite'):
     @guild_only()
     @logger.catch
     async def show_fn_cosmetic_info_command(self, ctx, id: str):
-        async with ClientSession() as session:
-            async with session.get(f"https://benbot.app/api/v1/cosmetics/br/{id}", params={"lang":"ru"}) as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                    return
+        cosmetic = self.cosmetics.get(id)
+        if cosmetic is not None:
+            embed = Embed(
+                title=cosmetic.get("name") or id,
+                description=f"{cosmetic.get('description') or ''}\n{(cosmetic.get('set') or {}).get('text', 'Not part of any set.')}",
+                color=Color.random()
+            ).add_field(name="Редкость", value=(cosmetic.get("rarity") or {}).get("displayValue", "Unknown"), inline=True)
+            if cosmetic.get("series"):
+                embed.add_field(name="Набор", value=cosmetic["series"].get("value", "None"), inline=True)
+            else:
+                embed.add_field(name="Series", value="None", inline=True)
+            embed.add_field(
+                name="Backend Type",
+                value=(cosmetic.get("type") or {}).get("backendValue", "Unknown"),
+                inline=True,
+            ).add_field(
+                name="Gameplay Tags",
+                value="```" + "\n".join(cosmetic.get("gameplayTags") or ["None"]) + "```",
+                inline=False,
+            ).add_field(
+                name="Path", value="`" + (cosmetic.get("path") or "Unknown") + "`", inline=False
+            )
+            images = cosmetic.get("images") or {}
+            if images.get("icon"):
+                embed.set_thumbnail(url=images["icon"])
+            if images.get("featured"):
+                embed.set_image(url=images["featured"])
+            return await ctx.reply(embed=embed, mention_author=False)
+
+        async with self.bot.http_client.get(f"https://benbot.app/api/v1/cosmetics/br/{id}", params={"lang":"ru"}) as r:
+            if r.status != 200:
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
+                )
+                return
 
-                cosmetic = await r.json()
-                embed = Embed(
-                    title=cosmetic.get("name", id),
-                    description=f"{cosmetic.get('description', '')}\n{cosmetic.get('setText', 'Not part of any set.')}",
-                    color=Color.random()
-                ).add_field(name="Редкость", value=cosmetic.get("rarity", "Unknown"), inline=True)
-                if type(cosmetic.get("series", "")) == dict:
-                    embed.add_field(
-                        name="Набор", value=cosmetic["series"].get("name", "None"), inline=True
-                    )
-                else:
-                    embed.add_field(name="Series", value="None", inline=True)
+            cosmetic = await r.json()
+            embed = Embed(
+                title=cosmetic.get("name", id),
+                description=f"{cosmetic.get('description', '')}\n{cosmetic.get('setText', 'Not part of any set.')}",
+                color=Color.random()
+            ).add_field(name="Редкость", value=cosmetic.get("rarity", "Unknown"), inline=True)
+            if type(cosmetic.get("series", "")) == dict:
                 embed.add_field(
-                    name="Backend Type",
-                    value=cosmetic.get("backendType", "Unknown"),
-                    inline=True,
-                ).add_field(
-                    name="Gameplay Tags",
-                    value="```" + "\n".join(cosmetic.get("gameplayTags", "None")) + "```",
-                    inline=False,
-                ).add_field(
-                    name="Path", value="`" + cosmetic.get("path", "Unknown") + "`", inline=False
+                    name="Набор", value=cosmetic["series"].get("name", "None"), inline=True
                 )
-                if type(cosmetic.get("icons", "")) == dict:
-                    if cosmetic["icons"].get("icon", None) is not None:
-                        embed.set_thumbnail(url=cosmetic["icons"]["icon"])
-                    if cosmetic["icons"].get("featured", None) is not None:
-                        embed.set_image(url=cosmetic["icons"]["featured"])
-                await ctx.reply(embed=embed, mention_author=False)
+            else:
+                embed.add_field(name="Series", value="None", inline=True)
+            embed.add_field(
+                name="Backend Type",
+                value=cosmetic.get("backendType", "Unknown"),
+                inline=True,
+            ).add_field(
+                name="Gameplay Tags",
+                value="```" + "\n".join(cosmetic.get("gameplayTags", "None")) + "```",
+                inline=False,
+            ).add_field(
+                name="Path", value="`" + cosmetic.get("path", "Unknown") + "`", inline=False
+            )
+            if type(cosmetic.get("icons", "")) == dict:
+                if cosmetic["icons"].get("icon", None) is not None:
+                    embed.set_thumbnail(url=cosmetic["icons"]["icon"])
+                if cosmetic["icons"].get("featured", None) is not None:
+                    embed.set_image(url=cosmetic["icons"]["featured"])
+            await ctx.reply(embed=embed, mention_author=False)
 
 
     @command(name=cmd["extractasset"]["name"], aliases=cmd["extractasset"]["aliases"],
@@ -989,41 +1063,40 @@ class Fortnite(Cog, name='Fortnite'):
         else:
             parameter = "&lang=ru"
 
-        async with ClientSession() as session:
-            async with session.get(f"https://benbot.app/api/v1/exportAsset?path={path}{parameter}") as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                    return
+        async with self.bot.http_client.get(f"https://benbot.app/api/v1/exportAsset?path={path}{parameter}") as r:
+            if r.status != 200:
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
+                )
+                return
 
-                elif r.headers.get("Content-Type", None) == "audio/ogg":
-                    await ctx.reply(
-                        file=File(
-                            fp=BytesIO(await r.read()),
-                            filename=r.headers.get("filename", "audio.ogg")
-                        ),
-                        mention_author=False
-                    )
-                elif r.headers.get("Content-Type", None) == "image/png":
-                    await ctx.reply(
-                        file=File(
-                            fp=BytesIO(await r.read()),
-                            filename=r.headers.get("filename", "image.png"),
-                        ),
-                        mention_author=False
-                    )
-                elif r.headers.get("Content-Type", None) == "application/json":
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                else:
-                    await ctx.reply(
-                        f"```Unknown Content-Type: {r.headers.get('Content-Type', 'Unknown')}```",
-                        mention_author=False
-                    )
+            elif r.headers.get("Content-Type", None) == "audio/ogg":
+                await ctx.reply(
+                    file=File(
+                        fp=BytesIO(await r.read()),
+                        filename=r.headers.get("filename", "audio.ogg")
+                    ),
+                    mention_author=False
+                )
+            elif r.headers.get("Content-Type", None) == "image/png":
+                await ctx.reply(
+                    file=File(
+                        fp=BytesIO(await r.read()),
+                        filename=r.headers.get("filename", "image.png"),
+                    ),
+                    mention_author=False
+                )
+            elif r.headers.get("Content-Type", None) == "application/json":
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
+                )
+            else:
+                await ctx.reply(
+                    f"```Unknown Content-Type: {r.headers.get('Content-Type', 'Unknown')}```",
+                    mention_author=False
+                )
 
 
     @command(name=cmd["shopsections"]["name"], aliases=cmd["shopsections"]["aliases"],
@@ -1038,15 +1111,14 @@ class Fortnite(Cog, name='Fortnite'):
     @cooldown(cmd["shopsections"]["cooldown_rate"], cmd["shopsections"]["cooldown_per_second"], BucketType.member)
     @logger.catch
     async def display_fortnite_section_store_command(self, ctx, lang: str = 'ru'):
-        async with ClientSession() as session:
-            async with session.get(f'https://fn-api.com/api/shop/sections?lang={lang}') as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-                    return
-                data = await r.json()
+        async with self.bot.http_client.get(f'https://fn-api.com/api/shop/sections?lang={lang}') as r:
+            if r.status != 200:
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
+                )
+                return
+            data = await r.json()
 
         time = ""
         j = data['data']['date'].split("T")
@@ -1086,36 +1158,40 @@ class Fortnite(Cog, name='Fortnite'):
     async def fortnite_dev_servers_state_command(self, ctx, server: str = 'None'):
         servers_embeds = []
         if server.lower() == "stage":
-            async with ClientSession() as session:
-                async with session.get("https://fortnite-public-service-stage.ol.epicgames.com/fortnite/api/version") as r:
-                    if r.status != 200:
-                        await ctx.reply(
-                            f"""```json\n{await r.text()}```""",
-                            mention_author=False
-                        )
-                        return
+            async with self.bot.http_client.get("https://fortnite-public-service-stage.ol.epicgames.com/fortnite/api/version") as r:
+                if r.status != 200:
+                    await ctx.reply(
+                        f"""```json\n{await r.text()}```""",
+                        mention_author=False
+                    )
+                    return
 
-                    data = await r.json()
+                data = await r.json()
 
-                    embed = Embed(
-                        title="FortniteStageMain",
-                        color=Color.orange(),
-                        timestamp=ctx.message.created_at,
-                        )
+                embed = Embed(
+                    title="FortniteStageMain",
+                    color=Color.orange(),
+                    timestamp=ctx.message.created_at,
+                    )
 
-                    embed.add_field(name="Module", value=data["moduleName"], inline=True)
-                    embed.add_field(name="Branch", value=data["branch"], inline=True)
-                    embed.add_field(name="Version", value=data["version"], inline=True)
-                    embed.add_field(name="Build", value=data["build"], inline=True)
-                    embed.add_field(name="Build-Date", value=data["buildDate"], inline=True)
-                    embed.add_field(name="Changelog #", value=data["cln"], inline=True)
+                embed.add_field(name="Module", value=data["moduleName"], inline=True)
+                embed.add_field(name="Branch", value=data["branch"], inline=True)
+                embed.add_field(name="Version", value=data["version"], inline=True)
+                embed.add_field(name="Build", value=data["build"], inline=True)
+                embed.add_field(name="Build-Date", value=data["buildDate"], inline=True)
+                embed.add_field(name="Changelog #", value=data["cln"], inline=True)
 
-                    await ctx.reply(embed=embed, mention_author=False)
-                    return
+                await ctx.reply(embed=embed, mention_author=False)
+                return
         else:
-            async with aiofiles.open('./data/json/fn_dev_servers.json', 'r', encoding='utf-8') as f:
-                data = json.loads(await f.read())
-                servers = data['servers']
+            if self.dev_servers.swept_at is not None:
+                servers_embeds = [embed for embed in map(self.dev_server_embed, self.dev_servers.states()) if embed]
+                if not servers_embeds:
+                    return await ctx.reply('Ни один сервер не ответил.', mention_author=False)
+                msg = await ctx.reply(embed=servers_embeds[0], mention_author=False)
+                page = Paginator(self.bot, msg, only=ctx.author, embeds=servers_embeds)
+                await page.start()
+                return
 
             wait_embed = Embed(
                 title="Fornite Dev Servers",
@@ -1124,40 +1200,55 @@ class Fortnite(Cog, name='Fortnite'):
             )
             wait_msg = await ctx.reply(embed=wait_embed, mention_author=False)
 
+            # The paginator is started with the first answer, the others are
+            # appended to its pages as they arrive.
+            paginator = None
             async with ctx.typing():
-                for url in servers:
-                    try:
-                        async with ClientSession() as session:
-                            server_url = "https://" + url + "/fortnite/api/version"
-                            async with session.get(server_url) as r:
-                                if r.status != 200:
-                                    continue
-
-                                data = await r.json()
-
-                                embed = Embed(
-                                    title="Fortnite Dev Server",
-                                    color=Color.orange(),
-                                    timestamp=ctx.message.created_at,
-                                    description=f"**Server:** `{url}`"
-                                    )
-
-                                embed.add_field(name="Module", value=data["moduleName"], inline=True)
-                                embed.add_field(name="Branch", value=data["branch"], inline=True)
-                                embed.add_field(name="Version", value=data["version"], inline=True)
-                                embed.add_field(name="Build", value=data["build"], inline=True)
-                                embed.add_field(name="Build-Date", value=data["buildDate"], inline=True)
-                                embed.add_field(name="Changelog #", value=data["cln"], inline=True)
-
-                                servers_embeds.append(embed)
-
-                    except:
+                async for state in self.dev_servers.sweep():
+                    embed = self.dev_server_embed(state)
+                    if embed is None:
                         continue
+                    servers_embeds.append(embed)
+                    if paginator is None:
+                        await wait_msg.delete()
+                        msg = await ctx.reply(embed=embed, mention_author=False)
+                        page = Paginator(self.bot, msg, only=ctx.author, embeds=servers_embeds)
+                        paginator = asyncio.ensure_future(page.start())
+
+            if paginator is None:
+                await wait_msg.delete()
+                return await ctx.reply('Ни один сервер не ответил.', mention_author=False)
+            await paginator
+
+    def dev_server_embed(self, state: DevServerState) -> Optional[Embed]:
+        if state.version is None:
+            return None
 
-            await wait_msg.delete()
-            msg = await ctx.reply(embed=servers_embeds[0], mention_author=False)
-            page = Paginator(self.bot, msg, only=ctx.author, embeds=servers_embeds)
-            await page.start()
+        embed = Embed(
+            title="Fortnite Dev Server",
+            color=Color.orange(),
+            timestamp=state.checked_at,
+            description=f"**Server:** `{state.host}`"
+            )
+        try:
+            embed.add_field(name="Module", value=state.version["moduleName"], inline=True)
+            embed.add_field(name="Branch", value=state.version["branch"], inline=True)
+            embed.add_field(name="Version", value=state.version["version"], inline=True)
+            embed.add_field(name="Build", value=state.version["build"], inline=True)
+            embed.add_field(name="Build-Date", value=state.version["buildDate"], inline=True)
+            embed.add_field(name="Changelog #", value=state.version["cln"], inline=True)
+        except (KeyError, TypeError):
+            return None
+        return embed
+
+    @tasks.loop(minutes=15.0)
+    @logger.catch
+    async def refresh_dev_servers(self):
+        await self.dev_servers.refresh()
+
+    @refresh_dev_servers.before_loop
+    async def before_refresh_dev_servers(self):
+        await self.bot.wait_until_ready()
 
 
     ### FortniteTracker.com
@@ -1260,24 +1351,23 @@ class Fortnite(Cog, name='Fortnite'):
                 mode = 'all'
 
             params = {"name": profile, "image": mode}
-            async with ClientSession(headers=self.fnapicom_headers) as session:
-                async with session.get('https://fortnite-api.com/v2/stats/br/v2', params=params) as r:
-                    if r.status != 200:
-                        await main_message.delete()
-                        await ctx.reply(
-                            f"""```json\n{await r.text()}```""",
-                            mention_author=False
-                        )
-                        return
+            async with self.bot.http_client.get('https://fortnite-api.com/v2/stats/br/v2', params=params, headers=self.fnapicom_headers) as r:
+                if r.status != 200:
+                    await main_message.delete()
+                    await ctx.reply(
+                        f"""```json\n{await r.text()}```""",
+                        mention_author=False
+                    )
+                    return
 
-                    data = await r.json()
+                data = await r.json()
 
-                stats_embed= Embed(
-                    title="Статистика игрового профиля Fortnite",
-                    color=Color.blurple()
-                )
-                stats_embed.set_image(url=data["data"]["image"])
-                await main_message.edit(embed=stats_embed)
+            stats_embed= Embed(
+                title="Статистика игрового профиля Fortnite",
+                color=Color.blurple()
+            )
+            stats_embed.set_image(url=data["data"]["image"])
+            await main_message.edit(embed=stats_embed)
 
 
         elif prefered_api == "fortnitetracker":
@@ -1290,17 +1380,16 @@ class Fortnite(Cog, name='Fortnite'):
             elif str(platform_react.emoji) == '💡':
                 mode = 'all'
 
-            async with ClientSession(headers=self.trn_headers) as session:
-                async with session.get(f'https://api.fortnitetracker.com/v1/profile/{mode}/{profile}') as r:
-                    if r.status != 200:
-                        await main_message.delete()
-                        await ctx.reply(
-                            f"""```ini\n{r.status}```""",
-                            mention_author=False
-                        )
-                        return
+            async with self.bot.http_client.get(f'https://api.fortnitetracker.com/v1/profile/{mode}/{profile}', headers=self.trn_headers) as r:
+                if r.status != 200:
+                    await main_message.delete()
+                    await ctx.reply(
+                        f"""```ini\n{r.status}```""",
+                        mention_author=False
+                    )
+                    return
 
-                    data = await r.json()
+                data = await r.json()
 
             embed = Embed(
                 title=f"{data.get('epicUserHandle', profile)} ({data.get('platformNameLong', mode)})",
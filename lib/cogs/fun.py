@@ -4,7 +4,6 @@ from random import choice, randint
 from typing import Optional
 
 import aiofiles
-from aiohttp import ClientSession
 from discord import Color, Embed, Member
 from discord.ext.commands import (BucketType, Cog, Greedy, command, cooldown,
                                   guild_only, max_concurrency)
@@ -50,13 +49,12 @@ class Fun(Cog, name='Развлечения'):
             ctx.command.reset_cooldown(ctx)
             return
 
-        async with ClientSession() as session:
-            async with session.get('https://some-random-api.ml/animu/hug') as r:
-                if r.status == 200:
-                    data = await r.json()
-                    hug_gif_url = data["link"]
-                else:
-                    hug_gif_url = choice(self.hug_gifs)
+        async with self.bot.http_client.get('https://some-random-api.ml/animu/hug') as r:
+            if r.status == 200:
+                data = await r.json()
+                hug_gif_url = data["link"]
+            else:
+                hug_gif_url = choice(self.hug_gifs)
 
         embed = Embed(
             title = f'**Обнимашки!**',
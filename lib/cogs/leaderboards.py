@@ -1,11 +1,8 @@
-from operator import itemgetter
-
 from discord import Embed
 from discord.ext.commands import Cog, command, guild_only
 from discord.ext.menus import ListPageSource, MenuPages
 from loguru import logger
 
-from ..db import db
 from ..utils.checks import is_channel
 from ..utils.constants import STATS_CHANNEL
 from ..utils.utils import load_commands_from_json
@@ -177,9 +174,8 @@ class Leaderboards(Cog, name='Списки лидеров'):
     @guild_only()
     @logger.catch
     async def achievements_leaderboard_command(self, ctx):
-        data = db.records("SELECT user_id, achievements_list FROM users_stats ORDER BY json_array_length(achievements_list->'user_achievements_list')")
-        records = [(user_id, len(achievements['user_achievements_list'])) for user_id, achievements in data]
-        records = sorted(records, key=itemgetter(1), reverse=True)
+        board = await self.bot.leaderboards.get('achievements')
+        records = [(user_id, amount) for user_id, amount, _ in board.page()]
         menu = MenuPages(source=AchievementsLeaderboardMenu(ctx, records), clear_reactions_after=True)
         await menu.start(ctx)
 
@@ -194,7 +190,8 @@ class Leaderboards(Cog, name='Списки лидеров'):
     @guild_only()
     @logger.catch
     async def leveling_leaderboard_command(self, ctx):
-        records = db.records("SELECT user_id, level, xp FROM leveling ORDER BY xp_total DESC")
+        board = await self.bot.leaderboards.get('levels')
+        records = [(user_id, *data) for user_id, _, data in board.page()]
         menu = MenuPages(source=LevelsLeaderboardMenu(ctx, records), clear_reactions_after=True)
         await menu.start(ctx)
 
@@ -209,7 +206,8 @@ class Leaderboards(Cog, name='Списки лидеров'):
     @guild_only()
     @logger.catch
     async def messages_leaderboard_command(self, ctx):
-        records = db.records("SELECT user_id, messages_count FROM users_stats ORDER BY messages_count DESC")
+        board = await self.bot.leaderboards.get('messages')
+        records = [(user_id, messages) for user_id, messages, _ in board.page()]
         menu = MenuPages(source=MessagesLeaderboardMenu(ctx, records), clear_reactions_after=True)
         await menu.start(ctx)
 
@@ -224,7 +222,8 @@ class Leaderboards(Cog, name='Списки лидеров'):
     @guild_only()
     @logger.catch
     async def reputation_leaderboard_command(self, ctx):
-        records = db.records("SELECT user_id, rep_rank FROM users_stats ORDER BY rep_rank DESC")
+        board = await self.bot.leaderboards.get('reputation')
+        records = [(user_id, rep_rank) for user_id, rep_rank, _ in board.page()]
         menu = MenuPages(source=ReputationLeaderboardMenu(ctx, records), clear_reactions_after=True)
         await menu.start(ctx)
 
@@ -5,18 +5,16 @@ from math import floor
 from random import randint
 from typing import Optional, Tuple, Union
 
-from aiohttp import ClientSession
 from discord import Embed, File, Member, Message, Status, TextChannel
 from discord.ext.commands import Cog, group, guild_only
-from discord.utils import remove_markdown
-from jishaku.functools import executor_function
 from loguru import logger
-from PIL import Image, ImageDraw, ImageFont
 
-from ..db import db
 from ..utils.checks import is_any_channel
 from ..utils.constants import CONSOLE_CHANNEL, STATS_CHANNEL
 from ..utils.decorators import listen_for_guilds
+from ..utils.event_bus import event_bus
+from ..utils.message_analysis import MessageAnalysis
+from ..utils.rank_card import RankCard, RankCardRenderer
 from ..utils.utils import (get_context_target, edit_user_reputation,
                            find_n_term_of_arithmetic_progression,
                            load_commands_from_json)
@@ -24,191 +22,6 @@ from ..utils.utils import (get_context_target, edit_user_reputation,
 cmd = load_commands_from_json("leveling")
 
 
-class RankCardImage():
-    """Class for generating rank card image."""
-
-    def __init__(self, member: Member) -> None:
-        self.member = member
-        self.bar_offset_x = 320
-        self.bar_offset_y = 160
-        self.bar_offset_x_1 = 950
-        self.bar_offset_y_1 = 200
-        self.big_font = ImageFont.FreeTypeFont(
-            "./data/fonts/JovannyLemonad-Bender.otf", 75)
-        self.medium_font = ImageFont.FreeTypeFont(
-            "./data/fonts/JovannyLemonad-Bender.otf", 55)
-        self.small_font = ImageFont.FreeTypeFont(
-            "./data/fonts/JovannyLemonad-Bender.otf", 40)
-
-    def get_member_rank_data(self) -> Tuple[int, int, int, int]:
-        xp, level = db.fetchone(
-            ['xp', 'level'], 'leveling', 'user_id', self.member.id)
-        xp_end = floor(5 * (level ^ 2) + 50 * level + 100)
-        rank = self.rank_position()
-        return level, xp, xp_end, rank
-
-    def rank_position(self) -> int:
-        cursor = db.get_cursor()
-        cursor.execute("SELECT user_id FROM leveling ORDER BY xp_total DESC")
-        data = cursor.fetchall()
-        position = [i for sub in data for i in sub].index(self.member.id)+1
-        return position
-
-    def get_status_color(self) -> str:
-        if self.member.status is Status.online:
-            color = "#57F287"
-        elif self.member.status is Status.idle:
-            color = "#FEE75C"
-        elif self.member.status in (Status.dnd, Status.do_not_disturb):
-            color = "#ED4245"
-        elif self.member.status in (Status.offline, Status.invisible):
-            color = "#FFFFFF"
-        else:
-            color = "#57F287"
-        return color
-
-    async def paste_rank_background(self, image: Image, bg_url: str) -> None:
-        async with ClientSession() as session:
-            async with session.get(bg_url) as r:
-                if r.status == 200:
-                    bg = Image.open(BytesIO(await r.read())).convert("RGBA").resize((1000, 240))
-                    image.paste(bg, (0, 0))
-
-    async def paste_member_avatar(self) -> None:
-        async with ClientSession() as session:
-            async with session.get(str(self.member.avatar_url)) as response:
-                avatar = await response.read()
-        icon = Image.open(BytesIO(avatar)).convert("RGBA").resize((200, 200))
-        big_size = (icon.size[0] * 3, icon.size[1] * 3)
-        mask = Image.new("L", big_size, 0)
-        draw = ImageDraw.Draw(mask)
-        draw.ellipse((0, 0) + big_size, 255)
-        draw.ellipse((140 * 3, 140 * 3, 189 * 3, 189 * 3), 0)
-        mask = mask.resize(icon.size, Image.ANTIALIAS)
-        icon.putalpha(mask)
-        self.image.paste(icon, (20, 20), mask=icon)
-
-    @executor_function
-    def draw_progress_bar(self, bar_background: str, bar_color: str, xp: int, xp_end: int) -> None:
-        bar_length = self.bar_offset_x_1 - self.bar_offset_x
-        circle_size = self.bar_offset_y_1 - self.bar_offset_y
-        progress = (xp_end - xp) * 100 / xp_end
-        progress = 100 - progress
-        progress_bar_length = round(bar_length * progress / 100)
-
-        self.draw.rectangle(
-            (self.bar_offset_x, self.bar_offset_y,
-             self.bar_offset_x_1, self.bar_offset_y_1),
-            fill=bar_background
-        )
-        self.draw.ellipse(
-            (self.bar_offset_x - circle_size // 2, self.bar_offset_y,
-             self.bar_offset_x + circle_size // 2, self.bar_offset_y_1),
-            fill=bar_background
-        )
-        self.draw.ellipse(
-            (self.bar_offset_x_1 - circle_size // 2, self.bar_offset_y,
-             self.bar_offset_x_1 + circle_size // 2, self.bar_offset_y_1),
-            fill=bar_background
-        )
-
-        bar_offset_x_1 = self.bar_offset_x + progress_bar_length
-        self.draw.rectangle(
-            (self.bar_offset_x, self.bar_offset_y, bar_offset_x_1, self.bar_offset_y_1), fill=bar_color)
-        self.draw.ellipse(
-            (self.bar_offset_x - circle_size // 2, self.bar_offset_y,
-             self.bar_offset_x + circle_size // 2, self.bar_offset_y_1),
-            fill=bar_color
-        )
-        self.draw.ellipse(
-            (bar_offset_x_1 - circle_size // 2, self.bar_offset_y,
-             bar_offset_x_1 + circle_size // 2, self.bar_offset_y_1),
-            fill=bar_color
-        )
-
-    @executor_function
-    def draw_username(self, name_color: str, discriminator_color: str) -> None:
-        username = self.member.name
-        discriminator = f'#{self.member.discriminator}'
-
-        text_size = self.draw.textsize(username, font=self.medium_font)
-        offset_x = self.bar_offset_x
-        offset_y = 10
-        self.draw.text((offset_x, offset_y), username,
-                       font=self.medium_font, fill=name_color)
-        offset_x += text_size[0] + 5
-        offset_y += 10
-        self.draw.text((offset_x, offset_y), discriminator,
-                       font=self.small_font, fill=discriminator_color)
-
-    @executor_function
-    def draw_level(self, level: int, level_str_color: str, level_int_color: str) -> None:
-        text_size = self.draw.textsize("Уровень", font=self.medium_font)
-        offset_x = self.bar_offset_x
-        offset_y = self.bar_offset_y - text_size[1] - 10
-        self.draw.text((offset_x, offset_y), "Уровень",
-                       font=self.medium_font, fill=level_str_color)
-
-        offset_x += text_size[0] + 5
-        text_size = self.draw.textsize(str(level), font=self.big_font)
-        offset_y = self.bar_offset_y - text_size[1] - 10
-        self.draw.text((offset_x, offset_y), str(level),
-                       font=self.big_font, fill=level_int_color)
-
-    @executor_function
-    def draw_xp(self, xp_start: int, xp_end: int, xp_start_color: str, xp_end_color: str) -> None:
-        text_size = self.draw.textsize(
-            f"/ {xp_end} XP", font=self.small_font)
-        offset_x = self.bar_offset_x_1 - text_size[0]
-        offset_y = self.bar_offset_y - text_size[1] - 9
-        self.draw.text(
-            (offset_x, offset_y), f"/ {xp_end:,} XP", font=self.small_font, fill=xp_end_color)
-        text_size = self.draw.textsize(f"{xp_start:,}", font=self.small_font)
-        offset_x -= text_size[0] + 8
-        self.draw.text((offset_x, offset_y),
-                       f"{xp_start:,}", font=self.small_font, fill=xp_start_color)
-
-    @executor_function
-    def draw_rank(self, rank: int, placement_int_color: str, placement_str_color: str) -> None:
-        text_size = self.draw.textsize(f"#{rank}", font=self.medium_font)
-        offset_x = self.bar_offset_x_1 - text_size[0] + 15
-        offset_y = 10
-        self.draw.text((offset_x, offset_y),
-                       f"#{rank}", font=self.medium_font, fill=placement_int_color)
-        text_size = self.draw.textsize("Ранг", font=self.small_font)
-        offset_x -= text_size[0] + 5
-        self.draw.text((offset_x, offset_y + 15), "Ранг",
-                       font=self.small_font, fill=placement_str_color)
-
-    async def generate_rank_card(self) -> File:
-        level, xp, xp_end, rank = self.get_member_rank_data()
-
-        customization = db.record('SELECT * FROM stats_customization WHERE user_id = %s',
-                                  self.member.id)
-        background_color, background_image, bar_color, bar_background, level_int_color, \
-        level_str_color, username_color, discriminator_color, xp_start_color, xp_end_color, \
-        placement_int_color, placement_str_color = customization[1:]
-
-        self.image = Image.new("RGB", (1000, 240), background_color)
-        if background_image:
-            await self.paste_rank_background(image=self.image, bg_url=background_image)
-
-        self.draw = ImageDraw.Draw(self.image, "RGB")
-        self.draw.ellipse((162, 162, 206, 206), fill=self.get_status_color())
-
-        await self.paste_member_avatar()
-        await self.draw_progress_bar(bar_background, bar_color, xp, xp_end)
-        await self.draw_username(username_color, discriminator_color)
-        await self.draw_level(level, level_str_color, level_int_color)
-        await self.draw_xp(xp, xp_end, xp_start_color, xp_end_color)
-        await self.draw_rank(rank, placement_int_color, placement_str_color)
-
-        byte_io = BytesIO()
-        self.image.save(byte_io, format='PNG')
-        card_file = File(BytesIO(byte_io.getvalue()), filename="rank.png")
-        return card_file
-
-
 class Leveling(Cog, name='Система уровней'):
     def __init__(self, bot):
         self.bot = bot
@@ -228,20 +41,76 @@ class Leveling(Cog, name='Система уровней'):
             777979537795055636,  # testing на dev сервере
         )
         self.HEX_COLOR_REGEX = r"#(?:[0-9a-fA-F]{3}){1,2}"
+        self.xp_locks = {}
+        self.rank_cards = RankCardRenderer(bot.http_client)
+
+    def cog_unload(self):
+        self.bot.loop.create_task(self.rank_cards.close())
+
+    async def get_member_rank_data(self, member: Member) -> Tuple[int, int, int, int]:
+        if (data := self.bot.leaderboards['levels'].data(member.id)) is not None:
+            level, xp = data
+        else:
+            profile = await self.bot.profiles.get(member.id)
+            level, xp = profile['level'], profile['xp']
+        xp_end = floor(5 * (level ^ 2) + 50 * level + 100)
+        rank = await self.rank_position(member)
+        return level, xp, xp_end, rank
+
+    async def rank_position(self, member: Member) -> int:
+        if (position := self.bot.leaderboards['levels'].position(member.id)) is not None:
+            return position
+
+        position = await self.bot.db.field(
+            'SELECT COUNT(*) + 1 FROM leveling WHERE xp_total > '
+            '(SELECT xp_total FROM leveling WHERE user_id = $1)',
+            member.id)
+        return position
+
+    def get_status_color(self, member: Member) -> str:
+        if member.status is Status.online:
+            color = "#57F287"
+        elif member.status is Status.idle:
+            color = "#FEE75C"
+        elif member.status in (Status.dnd, Status.do_not_disturb):
+            color = "#ED4245"
+        elif member.status in (Status.offline, Status.invisible):
+            color = "#FFFFFF"
+        else:
+            color = "#57F287"
+        return color
+
+    async def generate_rank_card(self, member: Member) -> File:
+        level, xp, xp_end, rank = await self.get_member_rank_data(member)
+        customization = await self.bot.db.record('SELECT * FROM stats_customization WHERE user_id = $1',
+                                                 member.id)
+        card = RankCard(
+            user_id=member.id,
+            name=member.name,
+            discriminator=member.discriminator,
+            avatar_url=str(member.avatar_url),
+            status_color=self.get_status_color(member),
+            level=level,
+            xp=xp,
+            xp_end=xp_end,
+            rank=rank,
+            customization=tuple(customization[1:]),
+        )
+        png = await self.rank_cards.render(card)
+        return File(BytesIO(png), filename="rank.png")
 
     @logger.catch
-    async def can_message_be_counted(self, message: Message) -> bool:
-        message_content = remove_markdown(message.clean_content)
-        ctx = await self.bot.get_context(message)
+    def can_message_be_counted(self, analysis: MessageAnalysis) -> bool:
+        message = analysis.message
 
         if not message.author.bot and isinstance(message.channel, TextChannel):
-            if self.bot.profanity.contains_profanity(message_content):
+            if analysis.profanity:
                 if message.author.id not in self.profanity_whitelisted_users:
                     return False
-            if not ctx.command:
+            if not analysis.ctx.command:
                 if message.channel.id in self.channels_with_xp_counting:
-                    if len(message.clean_content) > 2:
-                        if message.clean_content[0] != "<" and message.clean_content[-1] != ">":
+                    if len(analysis.content) > 2:
+                        if analysis.content[0] != "<" and analysis.content[-1] != ">":
                             return True
                     elif message.attachments:
                         return True
@@ -250,8 +119,12 @@ class Leveling(Cog, name='Система уровней'):
 
     @logger.catch
     async def process_xp(self, message: Message):
-        level, xp, xp_total, xp_lock = db.fetchone(
-            ['level', 'xp', 'xp_total', 'xp_lock'], 'leveling', 'user_id', message.author.id)
+        if datetime.now() <= self.xp_locks.get(message.author.id, datetime.min):
+            return
+
+        profile = await self.bot.profiles.get(message.author.id)
+        level, xp, xp_total, xp_lock = profile['level'], profile['xp'], profile['xp_total'], profile['xp_lock']
+        self.xp_locks[message.author.id] = xp_lock
 
         if datetime.now() > xp_lock:
             await self.add_xp(message, xp, xp_total, level)
@@ -260,25 +133,24 @@ class Leveling(Cog, name='Система уровней'):
     async def add_xp(self, message: Message, xp: int, xp_total: int, level: int):
         xp_to_add = randint(5, 15)
         xp_end = floor(5 * (level ^ 2) + 50 * level + 100)
+        xp_lock = datetime.now() + timedelta(seconds=60)
 
-        db.execute("UPDATE leveling SET xp = xp + %s, xp_total = xp_total + %s WHERE user_id = %s",
-                   xp_to_add, xp_to_add, message.author.id)
-        db.commit()
+        self.bot.profiles.add_leveling(message.author.id, xp=xp_to_add, xp_total=xp_to_add, xp_lock=xp_lock)
+        self.xp_locks[message.author.id] = xp_lock
 
         if xp_end < xp + xp_to_add:
             await self.increase_user_level(message, xp, xp_total, xp_to_add, xp_end, level)
-
-        db.execute("UPDATE leveling SET xp_lock = %s WHERE user_id = %s",
-                   datetime.now() + timedelta(seconds=60), message.author.id)
-        db.commit()
+        else:
+            self.bot.leaderboards['levels'].update(message.author.id, xp_total + xp_to_add, (level, xp + xp_to_add))
 
     @logger.catch
     async def increase_user_level(self,  message: Message, xp: int, xp_total: int, xp_to_add: int, xp_end: int, level: int):
-        db.execute(
-            "UPDATE leveling SET level = %s, xp = %s, xp_total = xp_total - %s WHERE user_id = %s",
-            level+1, 0, (xp + xp_to_add) - xp_end, message.author.id
+        self.bot.profiles.add_leveling(
+            message.author.id,
+            level=1, xp=-(xp + xp_to_add), xp_total=-((xp + xp_to_add) - xp_end)
         )
-        db.commit()
+        self.bot.leaderboards['levels'].update(message.author.id, xp_total + xp_end - xp, (level + 1, 0))
+        event_bus.publish('counter_changed', message.author.id, 'level', level + 1)
 
         rep_reward = find_n_term_of_arithmetic_progression(10, 10, level+1)
         await edit_user_reputation(self.bot.pg_pool, message.author.id, '+', rep_reward)
@@ -298,12 +170,12 @@ class Leveling(Cog, name='Система уровней'):
 
     @Cog.listener()
     @listen_for_guilds()
-    async def on_message(self, message):
-        if message.author.id in self.bot.banlist:
+    async def on_message_analyzed(self, analysis: MessageAnalysis):
+        if analysis.author.id in self.bot.banlist:
             return
 
-        if await self.can_message_be_counted(message):
-            await self.process_xp(message)
+        if self.can_message_be_counted(analysis):
+            await self.process_xp(analysis.message)
 
     @group(name=cmd["rank"]["name"], aliases=cmd["rank"]["aliases"],
            brief=cmd["rank"]["brief"],
@@ -321,8 +193,7 @@ class Leveling(Cog, name='Система уровней'):
             return
 
         async with ctx.typing():
-            rank_card = RankCardImage(target)
-            card = await rank_card.generate_rank_card()
+            card = await self.generate_rank_card(target)
             await ctx.send(file=card)
 
     def get_hex_color(self, hex_value: str) -> Union[str, bool]:
@@ -334,10 +205,9 @@ class Leveling(Cog, name='Система уровней'):
         else:
             return False
 
-    def update_rank_customization(self, element: str, color: str, user_id: int) -> None:
-        db.execute(f'UPDATE stats_customization SET {element} = %s WHERE user_id = %s',
-                    color, user_id)
-        db.commit()
+    async def update_rank_customization(self, element: str, color: str, user_id: int) -> None:
+        await self.bot.db.execute(f'UPDATE stats_customization SET {element} = $1 WHERE user_id = $2',
+                                  color, user_id)
 
     @rank.command(
         name=cmd["background"]["name"], aliases=cmd["background"]["aliases"],
@@ -352,7 +222,7 @@ class Leveling(Cog, name='Система уровней'):
         if hex_value is None or not self.get_hex_color(hex_value):
             await ctx.send('Укажите цвет в HEX формате. Пример: #FF25AB')
             return
-        self.update_rank_customization('rank_background_color', hex_value, ctx.author.id)
+        await self.update_rank_customization('rank_background_color', hex_value, ctx.author.id)
         await ctx.reply(f'Цвет фона `rank` изменён: `{hex_value}`', mention_author=False)
 
     @rank.command(
@@ -367,9 +237,8 @@ class Leveling(Cog, name='Система уровней'):
     async def rank_background_image_color(self, ctx, mode: Optional[str]):
         if mode is not None:
             if mode.lower() in ('reset', 'remove', 'delete'):
-                db.execute('UPDATE stats_customization SET rank_background_image = %s WHERE user_id = %s',
-                            None, ctx.author.id)
-                db.commit()
+                await self.bot.db.execute('UPDATE stats_customization SET rank_background_image = $1 WHERE user_id = $2',
+                                          None, ctx.author.id)
                 await ctx.reply(f'Фоновое изображение `rank` удалено.', mention_author=False)
             return
 
@@ -380,7 +249,7 @@ class Leveling(Cog, name='Система уровней'):
 
         f = ctx.message.attachments[0]
         if f.content_type in ('image/png', 'image/jpeg'):
-            self.update_rank_customization('rank_background_image', f.proxy_url, ctx.author.id)
+            await self.update_rank_customization('rank_background_image', f.proxy_url, ctx.author.id)
             await ctx.reply(f'Фоновое изображение `rank` изменено.', mention_author=False)
         else:
             await ctx.reply(f'Допустимые расширения файлов: `.png`, `.jpg`')
@@ -398,7 +267,7 @@ class Leveling(Cog, name='Система уровней'):
         if hex_value is None or not self.get_hex_color(hex_value):
             await ctx.send('Укажите цвет в HEX формате. Пример: #FF25AB')
             return
-        self.update_rank_customization('rank_bar_color', hex_value, ctx.author.id)
+        await self.update_rank_customization('rank_bar_color', hex_value, ctx.author.id)
         await ctx.send(f'Цвет прогресс бара `rank` изменён: `{hex_value}`', mention_author=False)
 
     @rank.command(
@@ -414,7 +283,7 @@ class Leveling(Cog, name='Система уровней'):
         if hex_value is None or not self.get_hex_color(hex_value):
             await ctx.send('Укажите цвет в HEX формате. Пример: #FF25AB')
             return
-        self.update_rank_customization('rank_level_int_color', hex_value, ctx.author.id)
+        await self.update_rank_customization('rank_level_int_color', hex_value, ctx.author.id)
         await ctx.send(f'Цвет цифры уровня `rank` изменён: `{hex_value}`', mention_author=False)
 
 
@@ -1,21 +1,21 @@
+from copy import copy
 from datetime import datetime
-from difflib import get_close_matches
 
 import aiofiles
-from discord import Message, TextChannel, NotFound
+from discord import TextChannel, NotFound
 from discord.ext.commands import Cog
-from discord.utils import remove_markdown
 from loguru import logger
 
-from ..db import db
 from ..utils.decorators import listen_for_guilds
+from ..utils.fuzzy_matcher import FuzzyMatcher
+from ..utils.message_analysis import MessageAnalysis
 
 
 class MessagesHandler(Cog, name='Messages handler'):
     def __init__(self, bot):
         self.bot = bot
-        self.rep_filter = []
-        self.question_filter = []
+        self.rep_filter = FuzzyMatcher([], cutoff=0.75)
+        self.question_filter = FuzzyMatcher([], cutoff=0.85)
         self.profanity_whitelisted_users = (
             384728793895665675, #tvoya_pechal
             342783617983840257, #lexenus
@@ -43,32 +43,33 @@ class MessagesHandler(Cog, name='Messages handler'):
     async def parse_questions_from_txt(self):
         async with aiofiles.open(f'data/txt/question_filter.txt', mode='r', encoding='utf-8') as f:
             lines = await f.readlines()
-            self.question_filter = [line.strip() for line in lines if line != '']
+            self.question_filter = FuzzyMatcher(
+                [line.strip() for line in lines if line != ''], cutoff=0.85)
 
         async with aiofiles.open(f'data/txt/rep_filter.txt', mode='r', encoding='utf-8') as f:
             lines = await f.readlines()
-            self.rep_filter = [line.strip() for line in lines if line != '']
+            self.rep_filter = FuzzyMatcher(
+                [line.strip() for line in lines if line != ''], cutoff=0.75)
 
     @logger.catch
-    async def invoke_command(self, message: Message, cmd: str):
-        ctx = await self.bot.get_context(message)
-        command = self.bot.get_command(cmd)
-        ctx.command = command
+    async def invoke_command(self, analysis: MessageAnalysis, cmd: str):
+        # The context is shared by all listeners, so the command is set on a copy
+        ctx = copy(analysis.ctx)
+        ctx.command = self.bot.get_command(cmd)
         await self.bot.invoke(ctx)
 
     @logger.catch
-    async def can_message_be_counted(self, message: Message) -> bool:
-        message_content = remove_markdown(message.clean_content)
-        ctx = await self.bot.get_context(message)
+    def can_message_be_counted(self, analysis: MessageAnalysis) -> bool:
+        message = analysis.message
 
         if not message.author.bot and isinstance(message.channel, TextChannel):
-            if self.bot.profanity.contains_profanity(message_content):
+            if analysis.profanity:
                 if message.author.id not in self.profanity_whitelisted_users:
                     return False
-            if not ctx.command:
+            if not analysis.ctx.command:
                 if message.channel.id in self.channels_with_message_counting:
-                    if len(message.clean_content) > 2:
-                        if message.clean_content[0] != "<" and message.clean_content[-1] != ">":
+                    if len(analysis.content) > 2:
+                        if analysis.content[0] != "<" and analysis.content[-1] != ">":
                             return True
                     elif message.attachments:
                         return True
@@ -77,17 +78,13 @@ class MessagesHandler(Cog, name='Messages handler'):
 
     @logger.catch
     def increase_user_messages_counter(self, user_id: int):
-        db.execute("UPDATE users_stats SET messages_count = messages_count + 1 WHERE user_id = %s",
-                    user_id)
-        db.execute("UPDATE users_stats SET last_message_date = %s WHERE user_id = %s",
-                    datetime.now(), user_id)
-        db.commit()
+        self.bot.users_stats_buffer.add(user_id, messages_count=1, last_message_date=datetime.now())
+        self.bot.leaderboards.increment('messages', user_id, 1)
 
     @logger.catch
     def decrease_user_messages_counter(self, user_id: int):
-        db.execute("UPDATE users_stats SET messages_count = messages_count - 1 WHERE user_id = %s",
-                    user_id)
-        db.commit()
+        self.bot.users_stats_buffer.add(user_id, messages_count=-1)
+        self.bot.leaderboards.increment('messages', user_id, -1)
 
     @Cog.listener()
     async def on_ready(self):
@@ -96,19 +93,20 @@ class MessagesHandler(Cog, name='Messages handler'):
 
     @Cog.listener()
     @listen_for_guilds()
-    async def on_message(self, message):
-        if await self.can_message_be_counted(message):
+    async def on_message_analyzed(self, analysis: MessageAnalysis):
+        message = analysis.message
+        if self.can_message_be_counted(analysis):
             if message.author.id not in self.bot.banlist:
                 self.increase_user_messages_counter(message.author.id)
 
-        rep = get_close_matches(message.clean_content.lower(), self.rep_filter, cutoff=0.75)
+        rep = self.rep_filter.get_close_matches(analysis.lowered)
         if rep:
-            await self.invoke_command(message, 'repinfo')
+            await self.invoke_command(analysis, 'repinfo')
 
-        question = get_close_matches(message.clean_content.lower(), self.question_filter, cutoff=0.85)
+        question = self.question_filter.get_close_matches(analysis.lowered)
         if question:
             if message.channel.id != 546700132390010882:
-                await self.invoke_command(message, 'question')
+                await self.invoke_command(analysis, 'question')
 
         if message.channel.id == 639925210849476608 and message.author.id != 479499525921308703:
             try:
@@ -120,7 +118,7 @@ class MessagesHandler(Cog, name='Messages handler'):
     @Cog.listener()
     @listen_for_guilds()
     async def on_message_delete(self, message):
-        if await self.can_message_be_counted(message):
+        if self.can_message_be_counted(await self.bot.analyze_message(message)):
             self.decrease_user_messages_counter(message.author.id)
 
 
@@ -1,14 +1,12 @@
 import enum
 import json
-import re
 from asyncio import sleep
 from datetime import datetime, timedelta
 from os import getenv
 from random import choice, randint
 from typing import Optional
 
-import aiohttp
-from discord import Color, Embed, Invite, Member, Message, PartialInviteGuild
+from discord import Color, Embed, Member, Message
 from discord.errors import NotFound
 from discord.ext import tasks
 from discord.ext.commands import (BadArgument, Cog, Converter, Greedy,
@@ -17,11 +15,13 @@ from discord.ext.commands import (BadArgument, Cog, Converter, Greedy,
 from discord.utils import find
 from loguru import logger
 
-from ..db import db
+from ..utils.automod import AutoModDetector
 from ..utils.constants import (AUDIT_LOG_CHANNEL, CHASOVIE_CHANNEL,
                                CHASOVOY_ROLE_ID, MODERATION_PUBLIC_CHANNEL,
                                MUTE_ROLE_ID, READ_ROLE_ID)
 from ..utils.decorators import listen_for_guilds
+from ..utils.invite_cache import InviteCache
+from ..utils.message_analysis import MessageAnalysis
 from ..utils.utils import (edit_user_reputation, load_commands_from_json,
                            russian_plural)
 
@@ -53,10 +53,9 @@ class Moderation(Cog, name='Модерация'):
     def __init__(self, bot):
         self.bot = bot
         self.reading_members = {}
-        self.URL_REGEX = r'(https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|www\.[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9]+\.[^\s]{2,}|www\.[a-zA-Z0-9]+\.[^\s]{2,})'
-        self.DISCORD_INVITE_REGEX = r'discord(?:\.com|app\.com|\.gg)[\/invite\/]?(?:[a-zA-Z0-9\-]{2,32})'
-        self.EMOJI_REGEX = r'<(?P<animated>a?):(?P<name>[a-zA-Z0-9_]{2,32}):(?P<id>[0-9]{18,22})>'
-        self.UNICODE_EMOJI_REGEX = r'[\U00010000-\U0010ffff]'
+        self.invites = InviteCache(bot)
+        # Reloading the cog picks up the edited rules
+        self.bot.automod = AutoModDetector.from_file('./data/json/automod_rules.json')
         if self.bot.ready:
             bot.loop.create_task(self.init_vars())
 
@@ -243,10 +242,9 @@ class Moderation(Cog, name='Модерация'):
             "communication_disabled_until": (datetime.utcnow() + timedelta(seconds=seconds)).isoformat() if seconds else None
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.patch(url, headers=headers, json=data) as r:
-                if not 200 <= r.status <= 299:
-                    await ctx.send('Что-то пошло не так, действие отменено.', delete_after=60)
+        async with self.bot.http_client.patch(url, headers=headers, json=data) as r:
+            if not 200 <= r.status <= 299:
+                await ctx.send('Что-то пошло не так, действие отменено.', delete_after=60)
 
 
     @logger.catch
@@ -279,8 +277,8 @@ class Moderation(Cog, name='Модерация'):
 
             return embed
 
-        def _extend_mute_story(message: Message, target: Member, seconds: int, reason: str):
-            rec = db.fetchone(["mutes_story"], "users_stats", "user_id", target.id)[0]
+        async def _extend_mute_story(message: Message, target: Member, seconds: int, reason: str):
+            rec = json.loads((await self.bot.profiles.get(target.id))['mutes_story'])
             rec['user_mute_story'].append(
                 {
                     "id": len(rec['user_mute_story']) + 1,
@@ -291,9 +289,7 @@ class Moderation(Cog, name='Модерация'):
                     "moderator": f"{message.author.name} | {message.author.id}"
                 }
             )
-            db.execute("UPDATE users_stats SET mutes_story = %s WHERE user_id = %s",
-                        json.dumps(rec, ensure_ascii=False), target.id)
-            db.commit()
+            await self.bot.profiles.update(target.id, 'users_stats', mutes_story=json.dumps(rec, ensure_ascii=False))
 
         for target in targets:
             if ctx.guild.me.top_role.position < target.top_role.position or target.id == ctx.author.id:
@@ -338,7 +334,7 @@ class Moderation(Cog, name='Модерация'):
                 )
 
             await self.put_in_timeout(ctx, target, seconds)
-            _extend_mute_story(ctx.message, target, seconds, reason)
+            await _extend_mute_story(ctx.message, target, seconds, reason)
             await edit_user_reputation(self.bot.pg_pool, target.id, '-', MINUS_REP)
             await self.moderation_channel.send(embed=embed)
 
@@ -525,7 +521,7 @@ class Moderation(Cog, name='Модерация'):
 
             if target.id not in self.bot.banlist:
                 self.bot.banlist.append(target.id)
-                db.insert('blacklist', {'user_id':target.id,'reason':'Получил 3 варна'})
+                await self.bot.db.insert('blacklist', {'user_id':target.id,'reason':'Получил 3 варна'})
 
         if len(warns) > 3:
             await self.ban_members(ctx.message, [target], 1, "Максимум варнов | " + reason)
@@ -574,7 +570,7 @@ class Moderation(Cog, name='Модерация'):
             await ctx.send(f"{ctx.author.mention}, укажите пользователя, которому необходимо выдать варн.", delete_after=10)
             return
 
-        rec = db.fetchone(["warns_story"], "users_stats", "user_id", target.id)[0]
+        rec = json.loads((await self.bot.profiles.get(target.id))['warns_story'])
         rec['user_warn_story'].append(
             {
                 "id": len(rec['user_warn_story']) + 1,
@@ -584,9 +580,7 @@ class Moderation(Cog, name='Модерация'):
                 "moderator": f"{ctx.author.name} | {ctx.author.id}"
             }
         )
-        db.execute("UPDATE users_stats SET warns_story = %s WHERE user_id = %s",
-                    json.dumps(rec, ensure_ascii=False), target.id)
-        db.commit()
+        await self.bot.profiles.update(target.id, 'users_stats', warns_story=json.dumps(rec, ensure_ascii=False))
         await self.warn_member(ctx, target, rec['user_warn_story'], reason)
 
 
@@ -742,12 +736,12 @@ class Moderation(Cog, name='Модерация'):
         def _check(message):
             return not len(targets) or message.author in targets
 
-        def decrease_message_counter(users: dict):
+        async def decrease_message_counter(users: dict):
+            await self.bot.pg_pool.executemany(
+                "UPDATE users_stats SET messages_count = messages_count - $1 WHERE user_id = $2",
+                [(value, key) for key, value in users.items()])
             for key, value in users.items():
-                rec = db.fetchone(["messages_count"], "users_stats", "user_id", key)[0]
-                db.execute("UPDATE users_stats SET messages_count = %s WHERE user_id = %s",
-                            rec - value, key)
-                db.commit()
+                self.bot.leaderboards.increment('messages', key, -value)
 
         users = {}
 
@@ -761,7 +755,7 @@ class Moderation(Cog, name='Модерация'):
 
             deleted = await ctx.channel.purge(limit=limit+1)
             if ctx.channel.id in self.bot.channels_with_message_counting:
-                decrease_message_counter(users)
+                await decrease_message_counter(users)
 
             embed = Embed(
                 title='purge command invoked',
@@ -778,7 +772,7 @@ class Moderation(Cog, name='Модерация'):
                 users[entry] = msg_author_ids.count(entry)
 
             if ctx.channel.id in self.bot.channels_with_message_counting:
-                decrease_message_counter(users)
+                await decrease_message_counter(users)
 
             embed = Embed(
                 title='purge (with targets) command invoked',
@@ -824,41 +818,29 @@ class Moderation(Cog, name='Модерация'):
             await self.hat_replies(ctx, target, lost_rep)
 
 
-    def find_discord_invites(self, message: Message) -> bool:
-        regex = re.compile(self.DISCORD_INVITE_REGEX)
-        invites = regex.findall(message.clean_content)
+    def find_discord_invites(self, analysis: MessageAnalysis) -> bool:
+        return bool(analysis.invites)
 
-        return True if invites else False
-
-    @Cog.listener('on_message')
+    @Cog.listener('on_message_analyzed')
     @listen_for_guilds()
-    async def moderation_on_message_event(self, message):
+    async def moderation_on_message_event(self, analysis: MessageAnalysis):
+        message = analysis.message
         ### Find discord invites in message content
-        if self.find_discord_invites(message):
-            regex = re.compile(self.DISCORD_INVITE_REGEX)
-            try:
-                guild_invite = await self.bot.fetch_invite(url=regex.search(message.clean_content).group(0))
-            except NotFound:
-                return
-
+        if self.find_discord_invites(analysis):
             if message.author.guild_permissions.administrator or self.helper_role in message.author.roles:
                 pass
             else:
-                if isinstance(guild_invite, Invite):
-                    if guild_invite.guild.id != self.bot.guild.id:
-                        await message.delete()
-                        return await message.author.ban(reason="Автомодерация: Ссылки и приглашения")
+                guild_id = await self.invites.guild_id(analysis.invites[0])
+                if guild_id is None:
+                    return
 
-                elif isinstance(guild_invite, PartialInviteGuild):
-                    if guild_invite.id != self.bot.guild.id:
-                        await message.delete()
-                        return await message.author.ban(reason="Автомодерация: Ссылки и приглашения")
+                if guild_id != self.bot.guild.id:
+                    await message.delete()
+                    return await message.author.ban(reason="Автомодерация: Ссылки и приглашения")
 
         ### Emoji anti-spam
         if message.content and not message.author.bot:
-            emoji = re.findall(self.EMOJI_REGEX, message.content)
-            unicode_emoji = re.findall(self.UNICODE_EMOJI_REGEX, message.content)
-            if (len(emoji) + len(unicode_emoji)) > 7:
+            if analysis.emoji_count > 7:
                 try:
                     if message.author.guild_permissions.administrator or self.helper_role in message.author.roles:
                         return
@@ -892,29 +874,19 @@ class Moderation(Cog, name='Модерация'):
         embed = self.scam_notifier(message)
         await self.chasovie_channel.send(embed=embed)
 
-    @Cog.listener('on_message')
+    @Cog.listener('on_message_analyzed')
     @listen_for_guilds()
-    async def anti_scam_on_message_event(self, message):
+    async def anti_scam_on_message_event(self, analysis: MessageAnalysis):
+        message = analysis.message
         try:
             if message.author.guild_permissions.administrator or self.helper_role in message.author.roles:
                 return
         except AttributeError:
             return
 
-        if not (re.compile(self.URL_REGEX).search(message.clean_content)):
-            return
-
-        if 'steamcommunity.com' not in message.clean_content:
-            words = ('partner=', 'token=', 'tradeoffer=')
-            if any(word in message.clean_content for word in words):
-                await self.delete_scam_message(message)
-                return
-
-        if 'discord.com' and 'steamcommunity.com' not in message.clean_content:
-            words = ('gift', 'nitro', 'steam')
-            if any(word in message.clean_content for word in words):
-                await self.delete_scam_message(message)
-                return
+        # The rules are in data/json/automod_rules.json
+        if analysis.scam:
+            await self.delete_scam_message(message)
 
     ### Tasks
     @tasks.loop(hours=6)
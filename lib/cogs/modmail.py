@@ -3,6 +3,7 @@ from discord.ext.commands import Cog
 
 from ..utils.constants import HIDEOUT_MODMAIL_CHANNEL
 from ..utils.decorators import listen_for_dms
+from ..utils.message_analysis import MessageAnalysis
 
 
 class ModMail(Cog, name='ModMail'):
@@ -16,15 +17,15 @@ class ModMail(Cog, name='ModMail'):
 
     @Cog.listener()
     @listen_for_dms()
-    async def on_message(self, message):
+    async def on_message_analyzed(self, analysis: MessageAnalysis):
+        message = analysis.message
         if message.author.id in self.bot.banlist:
             return
 
         if message.type != MessageType.default:
             return
 
-        ctx = await self.bot.get_context(message)
-        if not message.author.bot and not ctx.command:
+        if not message.author.bot and not analysis.ctx.command:
             member = self.bot.guild.get_member(message.author.id)
             embed = Embed(
                 title="ModMail",
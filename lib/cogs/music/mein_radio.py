@@ -13,7 +13,6 @@ from discord.ext import commands, menus
 from discord.ext.commands.errors import CheckFailure
 from loguru import logger
 
-from ...db import db
 from ...utils.checks import (can_manage_radio, is_channel,
                              radio_whitelisted_users)
 from ...utils.constants import MUSIC_COMMANDS_CHANNEL
@@ -650,16 +649,16 @@ class MeinRadio(commands.Cog, wavelink.WavelinkMixin, name='Mein Radio'):
         reason = reason.replace('`', '­')
         date = datetime.datetime.now()
         song = f"{player.current.author} — {player.current.title} | {player.current.uri}"
-        db.insert("song_suggestions",
+        await self.bot.db.insert("song_suggestions",
                 {"suggestion_author_id": ctx.author.id,
                 "suggestion_type": "delete",
                 "suggested_song": song,
                 "suggestion_comment": reason,
                 "created_at": date})
 
-        cursor = db.get_cursor()
-        cursor.execute("SELECT suggestion_id FROM song_suggestions where suggestion_author_id = %s and suggested_song = %s and created_at = %s", (ctx.author.id,song,date,))
-        rec = cursor.fetchone()
+        rec = await self.bot.db.record(
+            "SELECT suggestion_id FROM song_suggestions where suggestion_author_id = $1 and suggested_song = $2 and created_at = $3",
+            ctx.author.id, song, date)
 
         embed = discord.Embed(
             title = "✅ Выполнено",
@@ -5,7 +5,6 @@ from random import choice
 from typing import Optional
 
 import aiofiles
-from aiohttp import ClientSession
 from discord import Color, Embed, File
 from discord.ext import tasks
 from discord.ext.commands import BucketType, Cog, command, cooldown, guild_only
@@ -33,12 +32,11 @@ class Nekos(Cog, name='Аниме'):
     @tasks.loop(hours=3.0)
     @logger.catch
     async def parse_anime_images(self):
-        async with ClientSession() as session:
-            for category in IMAGE_CATEGORIES:
-                async with session.get(f'{self.ANIME_ENDPOINT}{category}.json') as r:
-                    if r.status == 200:
-                        data = json.loads(await r.read())
-                        self.anime_images[category] = data['anime']
+        for category in IMAGE_CATEGORIES:
+            async with self.bot.http_client.get(f'{self.ANIME_ENDPOINT}{category}.json') as r:
+                if r.status == 200:
+                    data = json.loads(await r.read())
+                    self.anime_images[category] = data['anime']
 
     @parse_anime_images.before_loop
     async def before_parse_anime_images(self):
@@ -4,15 +4,14 @@ import time
 from datetime import datetime
 from typing import Optional
 
-from aiohttp import ClientSession
 from discord import Color, Embed, File
 from discord.ext.commands import Cog, command, dm_only, is_owner
 from discord.ext.menus import ListPageSource, MenuPages
 from discord.utils import get
 from loguru import logger
 
-from ..db import db
 from ..utils.checks import can_manage_radio_suggestions
+from ..utils.event_bus import event_bus
 from ..utils.utils import (edit_user_messages_count, edit_user_reputation,
                            load_commands_from_json)
 
@@ -222,30 +221,30 @@ class Owner(Cog, name='Команды разработчика'):
     async def ping_fortnite_apis_command(self, ctx):
         """Get the response time for APIs."""
         message = await ctx.reply("Response time for APIs:", mention_author=False)
-        async with ClientSession() as session:
-            now = time.monotonic()
-            async with session.get('https://benbot.app/api/v1/status') as r:
-                benbot_ping = time.monotonic() - now if r.status == 200 else 0
+        # Without retries, a repeated request would hide the real response time
+        now = time.monotonic()
+        async with self.bot.http_client.get('https://benbot.app/api/v1/status', retries=0) as r:
+            benbot_ping = time.monotonic() - now if r.status == 200 else 0
 
-            now = time.monotonic()
-            async with session.get('https://fortnite-api.com') as r:
-                fnapicom_ping = time.monotonic() - now if r.status == 200 else 0
+        now = time.monotonic()
+        async with self.bot.http_client.get('https://fortnite-api.com', retries=0) as r:
+            fnapicom_ping = time.monotonic() - now if r.status == 200 else 0
 
-            now = time.monotonic()
-            async with session.get('https://fortniteapi.io') as r:
-                fnapiio_ping = time.monotonic() - now if r.status == 200 else 0
+        now = time.monotonic()
+        async with self.bot.http_client.get('https://fortniteapi.io', retries=0) as r:
+            fnapiio_ping = time.monotonic() - now if r.status == 200 else 0
 
-            now = time.monotonic()
-            async with session.get('https://fortnitetracker.com') as r:
-                fntracker_ping = time.monotonic() - now if r.status == 200 else 0
+        now = time.monotonic()
+        async with self.bot.http_client.get('https://fortnitetracker.com', retries=0) as r:
+            fntracker_ping = time.monotonic() - now if r.status == 200 else 0
 
-            now = time.monotonic()
-            async with session.get('https://api.nitestats.com') as r:
-                ninestats_ping = time.monotonic() - now if r.status == 200 else 0
+        now = time.monotonic()
+        async with self.bot.http_client.get('https://api.nitestats.com', retries=0) as r:
+            ninestats_ping = time.monotonic() - now if r.status == 200 else 0
 
-            now = time.monotonic()
-            async with session.get('https://api.peely.de') as r:
-                peelyde_ping = time.monotonic() - now if r.status == 200 else 0
+        now = time.monotonic()
+        async with self.bot.http_client.get('https://api.peely.de', retries=0) as r:
+            peelyde_ping = time.monotonic() - now if r.status == 200 else 0
 
         await message.edit(
             embed=Embed(color=Color.random())
@@ -287,23 +286,22 @@ class Owner(Cog, name='Команды разработчика'):
     @is_owner()
     @logger.catch
     async def fetch_bearer_token_command(self, ctx):
-        async with ClientSession() as session:
-            async with session.get('https://api.nitestats.com/v1/epic/bearer') as r:
-                if r.status != 200:
-                    await ctx.reply(
-                        f"""```json\n{await r.text()}```""",
-                        mention_author=False
-                    )
-
-                data = await r.json()
-                embed = Embed(
-                    title="Bearer token",
-                    color=Color.random(),
-                    timestamp=ctx.message.created_at,
-                    description=f'**Token:** {data.get("accessToken", "Unknown")}\n'
-                                f'**Updated:** {datetime.fromtimestamp(data.get("lastUpdated", 0)).strftime("%d.%m.%Y %H:%M:%S")}'
+        async with self.bot.http_client.get('https://api.nitestats.com/v1/epic/bearer') as r:
+            if r.status != 200:
+                await ctx.reply(
+                    f"""```json\n{await r.text()}```""",
+                    mention_author=False
                 )
-                await ctx.reply(embed=embed, mention_author=False)
+
+            data = await r.json()
+            embed = Embed(
+                title="Bearer token",
+                color=Color.random(),
+                timestamp=ctx.message.created_at,
+                description=f'**Token:** {data.get("accessToken", "Unknown")}\n'
+                            f'**Updated:** {datetime.fromtimestamp(data.get("lastUpdated", 0)).strftime("%d.%m.%Y %H:%M:%S")}'
+            )
+            await ctx.reply(embed=embed, mention_author=False)
 
 
     @command(name=cmd["suggestions"]["name"], aliases=cmd["suggestions"]["aliases"],
@@ -316,8 +314,8 @@ class Owner(Cog, name='Команды разработчика'):
     @can_manage_radio_suggestions()
     @logger.catch
     async def radio_suggestions_command(self, ctx):
-        records = db.records("SELECT suggestion_id, suggestion_type, suggested_song, suggestion_comment "
-                            "FROM song_suggestions WHERE curator_id IS NULL")
+        records = await self.bot.db.records("SELECT suggestion_id, suggestion_type, suggested_song, suggestion_comment "
+                                            "FROM song_suggestions WHERE curator_id IS NULL")
         if records:
             menu = MenuPages(source=SuggestionsMenu(ctx, records))
             await menu.start(ctx)
@@ -334,14 +332,15 @@ class Owner(Cog, name='Команды разработчика'):
             attachments_url = [attachment for attachment in ctx.message.attachments]
             attachments += f"\n{nl.join([url.proxy_url for url in attachments_url])}"
 
-        rec = db.fetchone(["curator_id", "curator_decision", "closed_at"], "song_suggestions", "suggestion_id", suggestion_id)
+        rec = await self.bot.db.fetchone(["curator_id", "curator_decision", "closed_at"], "song_suggestions", "suggestion_id", suggestion_id)
         try:
             if rec[0] is None:
-                data =  db.fetchone(["suggestion_author_id", "suggestion_type", "suggested_song"], "song_suggestions", "suggestion_id", suggestion_id)
+                data = await self.bot.db.fetchone(["suggestion_author_id", "suggestion_type", "suggested_song"], "song_suggestions", "suggestion_id", suggestion_id)
                 date = datetime.now()
-                db.execute("UPDATE song_suggestions SET curator_id = %s, curator_decision = %s, curator_comment = %s, closed_at = %s  WHERE suggestion_id = %s",
-                            ctx.author.id, True if decision else False, comment+attachments, date, suggestion_id)
-                db.commit()
+                await self.bot.db.execute("UPDATE song_suggestions SET curator_id = $1, curator_decision = $2, curator_comment = $3, closed_at = $4  WHERE suggestion_id = $5",
+                                          ctx.author.id, True if decision else False, comment+attachments, date, suggestion_id)
+                if decision and data[1] == 'add':
+                    event_bus.publish('counter_changed', data[0], 'approved_songs', None)
 
                 embed = Embed(
                     title = "Ответ на заявку",
@@ -410,7 +409,7 @@ class Owner(Cog, name='Команды разработчика'):
             return await ctx.message.add_reaction('❌')
 
         self.bot.banlist.append(target_id)
-        db.insert('blacklist', {'user_id':target_id,'reason':reason})
+        await self.bot.db.insert('blacklist', {'user_id':target_id,'reason':reason})
 
         await ctx.message.add_reaction('✅')
 
@@ -428,8 +427,7 @@ class Owner(Cog, name='Команды разработчика'):
         if target_id is None:
             return await ctx.message.add_reaction('❌')
 
-        db.execute('DELETE FROM blacklist WHERE user_id = %s', target_id)
-        db.commit()
+        await self.bot.db.execute('DELETE FROM blacklist WHERE user_id = $1', target_id)
         try:
             self.bot.banlist.remove(target_id)
         except ValueError:
@@ -516,7 +514,13 @@ class Owner(Cog, name='Команды разработчика'):
     @is_owner()
     @logger.catch
     async def set_amount_command(self, ctx, user_id: int, action: str, value: int):
-        edit_user_messages_count(user_id, action, value)
+        # Buffered messages are written first, so they are not added on top of the new value
+        await self.bot.users_stats_buffer.flush()
+        await edit_user_messages_count(self.bot.pg_pool, user_id, action, value)
+        if action == '=':
+            self.bot.leaderboards['messages'].update(user_id, value)
+        elif action in ('+', '-'):
+            self.bot.leaderboards.increment('messages', user_id, value if action == '+' else -value)
         await ctx.reply(embed=Embed(
             title='Сообщения обновлены',
             color=Color.green(),
@@ -579,9 +583,9 @@ class Owner(Cog, name='Команды разработчика'):
     @is_owner()
     @logger.catch
     async def shutdown_command(self, ctx):
-        db.commit()
         self.bot.scheduler.shutdown()
         await self.bot.close()
+        await self.bot.pg_pool.close()
 
 def setup(bot):
     bot.add_cog(Owner(bot))
@@ -1,16 +1,15 @@
 from os import listdir
 from random import choice, randint
 
-import aiofiles
 from discord import File, Member, NotFound, RawMessageUpdateEvent, TextChannel
 from discord.ext.commands import (Cog, check_any, command, dm_only, guild_only,
                                   has_any_role, has_permissions, is_owner)
 from discord.utils import remove_markdown
 from loguru import logger
 
-from ..db import db
 from ..utils.constants import CHASOVOY_ROLE_ID
 from ..utils.decorators import listen_for_guilds
+from ..utils.message_analysis import MessageAnalysis
 from ..utils.utils import (edit_user_reputation,
                            find_n_term_of_arithmetic_progression,
                            load_commands_from_json, russian_plural)
@@ -31,14 +30,9 @@ class Profanity(Cog, name='Мат-фильтр'):
             686499834949140506, #гвардия
         )
 
-    def increase_user_profanity_counter(self, user_id: int):
-        db.execute("UPDATE users_stats SET profanity_triggers = profanity_triggers + 1 WHERE user_id = %s",
-                    user_id)
-        db.commit()
-
-    def fetch_user_profanity_counter(self, user_id: int) -> int:
-        rec = db.fetchone(["profanity_triggers"], "users_stats", "user_id", user_id)
-        return rec[0] if rec is not None else 0
+    async def increase_user_profanity_counter(self, user_id: int) -> int:
+        stats = await self.bot.profiles.increment(user_id, 'users_stats', profanity_triggers=1)
+        return stats['profanity_triggers'] if stats is not None else 0
 
     async def reply_profanity(self, channel: TextChannel, member: Member, lost_rep: int):
         profanity_replies = (
@@ -64,8 +58,7 @@ class Profanity(Cog, name='Мат-фильтр'):
             await channel.send(reply)
 
     async def process_profanity(self, channel: TextChannel, member: Member):
-        self.increase_user_profanity_counter(member.id)
-        profanity_counter = self.fetch_user_profanity_counter(member.id)
+        profanity_counter = await self.increase_user_profanity_counter(member.id)
         minus_rep = find_n_term_of_arithmetic_progression(5, 3, profanity_counter)
         await edit_user_reputation(self.bot.pg_pool, member.id, '-', minus_rep)
         await self.reply_profanity(channel, member, minus_rep)
@@ -73,10 +66,10 @@ class Profanity(Cog, name='Мат-фильтр'):
     @Cog.listener()
     @listen_for_guilds()
     @logger.catch
-    async def on_message(self, message):
-        content = remove_markdown(message.clean_content)
+    async def on_message_analyzed(self, analysis: MessageAnalysis):
+        message = analysis.message
         if isinstance(message.channel, TextChannel) and not message.author.bot:
-            if self.bot.profanity.contains_profanity(content):
+            if analysis.profanity:
                 if message.author.id not in self.whitelisted_users:
                     if message.channel.id not in self.whitelisted_channels:
                         await self.process_profanity(message.channel, message.author)
@@ -127,10 +120,7 @@ class Profanity(Cog, name='Мат-фильтр'):
     @is_owner()
     @logger.catch
     async def addprofanity_command(self, ctx, *words):
-        async with aiofiles.open(f'./data/txt/profanity.txt', mode='a', encoding='utf-8') as f:
-            await f.write("".join([f"{w}\n" for w in words]))
-
-        self.bot.profanity.load_censor_words_from_file("./data/txt/profanity.txt")
+        await self.bot.profanity.add_censor_words(words)
         await ctx.reply("Словарь обновлён!", mention_author=False)
 
 
@@ -144,14 +134,7 @@ class Profanity(Cog, name='Мат-фильтр'):
     @is_owner()
     @logger.catch
     async def delprofanity_command(self, ctx, *words):
-        async with aiofiles.open(f'./data/txt/profanity.txt', mode='r', encoding='utf-8') as f:
-            lines = await f.readlines()
-            stored = [w.strip() for w in lines]
-
-        async with aiofiles.open(f'./data/txt/profanity.txt', mode='w', encoding='utf-8') as f:
-            await f.write("".join([f"{w}\n" for w in stored if w not in words]))
-
-        self.bot.profanity.load_censor_words_from_file("./data/txt/profanity.txt")
+        await self.bot.profanity.remove_censor_words(words)
         await ctx.reply("Словарь обновлён!", mention_author=False)
 
 
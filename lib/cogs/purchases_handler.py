@@ -1,4 +1,3 @@
-import ast
 import json
 import os
 from asyncio import TimeoutError
@@ -11,14 +10,16 @@ from discord.ext.commands import Cog, command, dm_only, guild_only, is_owner
 from discord.ext.menus import ListPageSource, MenuPages
 from loguru import logger
 
-from ..db import db
+from ..db import user_records
 from ..utils.checks import is_any_channel, is_channel
 from ..utils.constants import (CONSOLE_CHANNEL, KAPITALIST_ROLE_ID,
                                MAGNAT_ROLE_ID, MECENAT_ROLE_ID,
                                SAC_SCREENSHOTS_CHANNEL, STATS_CHANNEL)
 from ..utils.decorators import listen_for_guilds
+from ..utils.event_bus import event_bus
 from ..utils.paginator import Paginator
-from ..utils.utils import edit_user_reputation, load_commands_from_json
+from ..utils.utils import (edit_user_reputation, load_commands_from_json,
+                           type_converter)
 
 cmd = load_commands_from_json('purchases_handler')
 
@@ -109,17 +110,12 @@ class PurchasesHandler(Cog, name='Покупки и не только'):
             if self.mod_cog.is_member_muted(member) or member.pending:
                 continue
 
-            try:
-                data = await self.bot.db.fetchone(
-                    ['purchases'], 'users_stats', 'user_id', member.id)
-                purchases = ast.literal_eval(data[0])['vbucks_purchases']
-            except TypeError:
-                continue
+            _, lpd = await user_records.purchases_summary(
+                self.bot.pg_pool, member.id, user_records.VBUCKS)
 
-            if purchases:
-                lpd = purchases[-1]['date']
+            if lpd is not None:
                 if self.mecenat in member.roles and self.kapitalist not in member.roles:
-                    if (datetime.now() - datetime.strptime(lpd, '%d.%m.%Y %H:%M:%S')).days > 90:
+                    if (datetime.now() - lpd).days > 90:
                         await member.remove_roles(self.mecenat, reason='С момента последней покупки прошло более 3 месяцев')
 
     @check_mecenat_role.before_loop
@@ -141,14 +137,11 @@ class PurchasesHandler(Cog, name='Покупки и не только'):
         if self.mod_cog.is_member_muted(member) or member.pending:
             return
 
-        data = await self.bot.db.fetchone(
-            ['purchases'], 'users_stats', 'user_id', member.id)
-        purchases = ast.literal_eval(data[0])['vbucks_purchases']
-        vbucks_count = sum(purchases[i]['price'] for i in range(len(purchases)))
+        vbucks_count, lpd = await user_records.purchases_summary(
+            self.bot.pg_pool, member.id, user_records.VBUCKS)
 
         if self.mecenat not in member.roles and vbucks_count > 0:
-            lpd = purchases[-1]['date']
-            if (datetime.now() - datetime.strptime(lpd, '%d.%m.%Y %H:%M:%S')).days < 90:
+            if (datetime.now() - lpd).days < 90:
                 await member.add_roles(self.mecenat)
                 await edit_user_reputation(self.bot.pg_pool, member.id, '+', 100)
         if self.kapitalist not in member.roles and vbucks_count >= 10_000:
@@ -169,17 +162,9 @@ class PurchasesHandler(Cog, name='Покупки и не только'):
     @logger.catch
     async def addvbucks_command(self, ctx, user_id: int, amount: int, *, item: Optional[str] = 'Не указано'):
         member = self.bot.guild.get_member(user_id)
-        purchases = db.fetchone(['purchases'], 'users_stats', 'user_id', user_id)[0]
-        transaction = {
-            'id': len(purchases['vbucks_purchases'])+1,
-            'item': item,
-            'price': amount,
-            'date': datetime.now().strftime('%d.%m.%Y %H:%M:%S')
-        }
-        purchases['vbucks_purchases'].append(transaction)
-        db.execute("UPDATE users_stats SET purchases = %s WHERE user_id = %s",
-                   json.dumps(purchases, ensure_ascii=False), user_id)
-        db.commit()
+        vbucks_count = await user_records.add_purchase(
+            self.bot.pg_pool, user_id, user_records.VBUCKS, item, amount)
+        event_bus.publish('counter_changed', user_id, 'vbucks', vbucks_count)
         await self.check_support_roles(member)
         await ctx.reply(embed=Embed(
             title='В-баксы добавлены',
@@ -201,17 +186,8 @@ class PurchasesHandler(Cog, name='Покупки и не только'):
     @logger.catch
     async def addrubles_command(self, ctx, user_id: int, amount: int, *, item: Optional[str] = 'Не указано'):
         member = self.bot.guild.get_member(user_id)
-        purchases = db.fetchone(['purchases'], 'users_stats', 'user_id', user_id)[0]
-        transaction = {
-            'id': len(purchases['realMoney_purchases'])+1,
-            'item': item,
-            'price': amount,
-            'date': datetime.now().strftime('%d.%m.%Y %H:%M:%S')
-        }
-        purchases['realMoney_purchases'].append(transaction)
-        db.execute("UPDATE users_stats SET purchases = %s WHERE user_id = %s",
-                   json.dumps(purchases, ensure_ascii=False), user_id)
-        db.commit()
+        await user_records.add_purchase(
+            self.bot.pg_pool, user_id, user_records.RUBLES, item, amount)
         await ctx.reply(embed=Embed(
             title='Рубли добавлены',
             color=member.color,
@@ -231,16 +207,16 @@ class PurchasesHandler(Cog, name='Покупки и не только'):
     @is_owner()
     @logger.catch
     async def reset_user_purchases_command(self, ctx, user_id: int, *, reason: Optional[str] = 'Не указана'):
-        data = db.fetchone(['purchases'], 'users_stats', 'user_id', user_id)[0]
-        data['reason'] = reason
-        time_now = datetime.now().strftime("%d.%m.%Y %H.%M.%S")
-        with open(f"./data/purchases_backup/{user_id} [{time_now}].json", "w", encoding='utf-8') as f:
-            json.dump(data, f, indent=2, sort_keys=True, ensure_ascii=False)
-
-        purchases = {"vbucks_purchases":[],"realMoney_purchases":[]}
-        db.execute("UPDATE users_stats SET purchases = %s WHERE user_id = %s",
-                   json.dumps(purchases, ensure_ascii=False), user_id)
-        db.commit()
+        # The purchases are deleted only if the backup was written
+        async with self.bot.pg_pool.acquire() as connection:
+            async with connection.transaction():
+                purchases = await user_records.delete_purchases(connection, user_id)
+                data = {'purchases': [dict(purchase) for purchase in purchases], 'reason': reason}
+                time_now = datetime.now().strftime("%d.%m.%Y %H.%M.%S")
+                os.makedirs("./data/purchases_backup", exist_ok=True)
+                with open(f"./data/purchases_backup/{user_id} [{time_now}].json", "w", encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, sort_keys=True, ensure_ascii=False, default=type_converter)
+
         await ctx.message.add_reaction('✅')
 
 
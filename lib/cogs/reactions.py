@@ -5,7 +5,6 @@ from discord.ext.commands import Cog, command, guild_only, has_permissions
 from discord.utils import get
 from loguru import logger
 
-from ..db import db
 from ..utils.utils import load_commands_from_json
 
 cmd = load_commands_from_json('reactions')
@@ -41,31 +40,33 @@ class ReactionRole(Cog, name='Роли за реакции'):
 
     @Cog.listener()
     async def on_raw_reaction_add(self, reaction):
-        cursor = db.get_cursor()
         if '<:' in str(reaction.emoji):
-            cursor.execute(f"SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = '{reaction.guild_id}' and message_id = '{reaction.message_id}' and emoji = '{reaction.emoji.id}'")
-            record = cursor.fetchone()
+            record = await self.bot.db.record(
+                "SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = $1 and message_id = $2 and emoji = $3",
+                str(reaction.guild_id), str(reaction.message_id), str(reaction.emoji.id))
             if record is not None:
                 if str(reaction.emoji.id) in str(record[0]):
                     await self.edit_member_roles(reaction.guild_id, int(record[1]), reaction.user_id, '+')
         elif '<:' not in str(reaction.emoji):
-            cursor.execute(f"SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = '{reaction.guild_id}' and message_id = '{reaction.message_id}' and emoji = '{reaction.emoji}'")
-            record = cursor.fetchone()
+            record = await self.bot.db.record(
+                "SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = $1 and message_id = $2 and emoji = $3",
+                str(reaction.guild_id), str(reaction.message_id), str(reaction.emoji))
             if record is not None:
                 await self.edit_member_roles(reaction.guild_id, int(record[1]), reaction.user_id, '+')
 
     @Cog.listener()
     async def on_raw_reaction_remove(self, reaction):
-        cursor = db.get_cursor()
         if '<:' in str(reaction.emoji):
-            cursor.execute(f"SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = '{reaction.guild_id}' and message_id = '{reaction.message_id}' and emoji = '{reaction.emoji.id}'")
-            record = cursor.fetchone()
+            record = await self.bot.db.record(
+                "SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = $1 and message_id = $2 and emoji = $3",
+                str(reaction.guild_id), str(reaction.message_id), str(reaction.emoji.id))
             if record is not None:
                 if str(reaction.emoji.id) in str(record[0]):
                     await self.edit_member_roles(reaction.guild_id, int(record[1]), reaction.user_id, '-')
         elif '<:' not in str(reaction.emoji):
-            cursor.execute(f"SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = '{reaction.guild_id}' and message_id = '{reaction.message_id}' and emoji = '{reaction.emoji}'")
-            record = cursor.fetchone()
+            record = await self.bot.db.record(
+                "SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = $1 and message_id = $2 and emoji = $3",
+                str(reaction.guild_id), str(reaction.message_id), str(reaction.emoji))
             if record is not None:
                 await self.edit_member_roles(reaction.guild_id, int(record[1]), reaction.user_id, '-')
 
@@ -80,14 +81,14 @@ class ReactionRole(Cog, name='Роли за реакции'):
     @guild_only()
     @logger.catch
     async def add_reaction_role_command(self, ctx, channel: TextChannel, message_id: int, emoji: str, role: Role):
-        cursor = db.get_cursor()
-        cursor.execute(f"SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = '{ctx.guild.id}' and message_id = '{message_id}'")
-        record = cursor.fetchone()
+        record = await self.bot.db.record(
+            "SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = $1 and message_id = $2",
+            str(ctx.guild.id), str(message_id))
         data = {
-            "role": role.id,
-            "message_id": message_id,
-            "channel_id": channel.id,
-            "guild_id": ctx.guild.id
+            "role": str(role.id),
+            "message_id": str(message_id),
+            "channel_id": str(channel.id),
+            "guild_id": str(ctx.guild.id)
         }
         if '<:' in emoji:
             emn = re.sub(':.*?:', '', emoji).strip('<>')
@@ -101,7 +102,7 @@ class ReactionRole(Cog, name='Роли за реакции'):
                 data["emoji"] = emoji
                 msg = await channel.fetch_message(message_id)
                 await msg.add_reaction(emoji)
-        db.insert("reactions", data)
+        await self.bot.db.insert("reactions", data)
 
     @command(name=cmd["removereactionrole"]["name"], aliases=cmd["removereactionrole"]["aliases"],
             brief=cmd["removereactionrole"]["brief"],
@@ -113,16 +114,17 @@ class ReactionRole(Cog, name='Роли за реакции'):
     @guild_only()
     @logger.catch
     async def remove_reaction_role_command(self, ctx, message_id: int, emoji: str):
-        cursor = db.get_cursor()
-        cursor.execute(f"SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = '{ctx.guild.id}' and message_id = '{message_id}'")
-        record = cursor.fetchone()
+        record = await self.bot.db.record(
+            "SELECT emoji, role, message_id, channel_id FROM reactions WHERE guild_id = $1 and message_id = $2",
+            str(ctx.guild.id), str(message_id))
 
         if '<:' in emoji:
             emm = re.sub(':.*?:', '', emoji).strip('<>')
             if record is None:
                 await ctx.send('Реакция не найдена в базе данных.', delete_after=5)
             elif str(message_id) in str(record[2]):
-                cursor.execute(f"DELETE FROM reactions WHERE guild_id = '{ctx.guild.id}' and message_id = '{message_id}' and emoji = '{emm}'")
+                await self.bot.db.execute("DELETE FROM reactions WHERE guild_id = $1 and message_id = $2 and emoji = $3",
+                                          str(ctx.guild.id), str(message_id), emm)
                 msg = await ctx.fetch_message(message_id)
                 await msg.remove_reaction(emoji, ctx.guild.me)
                 await ctx.send('Реакция удалена.', delete_after=5)
@@ -132,13 +134,13 @@ class ReactionRole(Cog, name='Роли за реакции'):
             if record is None:
                 await ctx.send('Реакция не найдена в базе данных.', delete_after=5)
             elif str(message_id) in str(record[2]):
-                cursor.execute(f"DELETE FROM reactions WHERE guild_id = '{ctx.guild.id}' and message_id = '{message_id}' and emoji = '{emoji}'")
+                await self.bot.db.execute("DELETE FROM reactions WHERE guild_id = $1 and message_id = $2 and emoji = $3",
+                                          str(ctx.guild.id), str(message_id), emoji)
                 msg = await ctx.fetch_message(message_id)
                 await msg.remove_reaction(emoji, ctx.guild.me)
                 await ctx.send('Реакция удалена.', delete_after=5)
             else:
                 await ctx.send('Реакция не найдена.', delete_after=5)
-        db.commit()
 
 
 def setup(bot):
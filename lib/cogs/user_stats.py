@@ -8,7 +8,7 @@ from discord.ext.commands import BucketType, Cog, command, cooldown, guild_only
 from discord.utils import get
 from loguru import logger
 
-from ..db import db
+from ..db import user_records
 from ..utils.checks import is_channel
 from ..utils.constants import STATS_CHANNEL
 from ..utils.utils import (get_context_target, joined_date,
@@ -40,38 +40,24 @@ class UserStats(Cog, name='Статистика'):
         if not target:
             return
 
-        biography = await self.bot.pg_pool.fetchval(
-            'SELECT brief_biography FROM users_info WHERE user_id = $1', target.id)
+        profile = await self.bot.profiles.get(target.id)
+        biography = profile['brief_biography']
+        achievements_count = await user_records.count_achievements(self.bot.pg_pool, target.id)
 
-        user_stats = await self.bot.db.fetchone(
-            ['achievements_list', 'invoice_time'],
-            'users_stats', 'user_id',
-            target.id)
-
-        durka_stats = await self.bot.db.fetchone(
-            ['received_durka_calls'],
-            'durka_stats', 'user_id',
-            target.id)
-
-        moderation_stats = await self.bot.db.fetchone(
-            ['mutes_story', 'warns_story', 'profanity_triggers'],
-            'users_stats', 'user_id',
-            target.id)
-
-        mutes = ast.literal_eval(moderation_stats[0])
+        mutes = ast.literal_eval(profile['mutes_story'])
         mutes = mutes['user_mute_story']
         mute_time = sum(
             mutes[i]['mute_time']
             for i in range(len(mutes))
         )
-        warns = ast.literal_eval(moderation_stats[1])
+        warns = ast.literal_eval(profile['warns_story'])
         warns = warns['user_warn_story']
         warn_time = sum(
             warns[i]['mute_time']
             for i in range(len(warns))
         )
         total_mute_time = mute_time + warn_time
-        joined = await joined_date(self.bot.pg_pool, target)
+        joined = profile['joined_at']
         embed = Embed(color=target.color)
         embed.set_author(name=target.display_name, icon_url=target.avatar_url)
         embed.set_thumbnail(url=target.avatar_url)
@@ -119,8 +105,7 @@ class UserStats(Cog, name='Статистика'):
                         inline=True)
 
         embed.add_field(name='🎖️ Количество достижений:',
-                        value=len(
-                            ast.literal_eval(user_stats[0])["user_achievements_list"]),
+                        value=achievements_count,
                         inline=True)
 
         embed.add_field(name="⚡ Бустер сервера:",
@@ -128,15 +113,15 @@ class UserStats(Cog, name='Статистика'):
                         inline=True)
 
         embed.add_field(name="<:durka:684794973358522426>  Получено путёвок в дурку:",
-                        value=durka_stats[0],
+                        value=profile['received_durka_calls'],
                         inline=True)
 
         embed.add_field(name="🤬 Количество триггеров мат-фильтра:",
-                        value=moderation_stats[2],
+                        value=profile['profanity_triggers'],
                         inline=True)
 
         embed.add_field(name="🔈 Время, проведённое в голосовых каналах:",
-                        value=timedelta(seconds=user_stats[1]),
+                        value=timedelta(seconds=profile['invoice_time']),
                         inline=True)
 
         embed.add_field(name="⚠️ Количество предупреждений:",
@@ -173,7 +158,7 @@ class UserStats(Cog, name='Статистика'):
     @logger.catch
     async def setbio_command(self, ctx, *, bio: str = None):
         if bio is None:
-            db_bio = db.fetchone(["brief_biography"], "users_info", "user_id", ctx.author.id)[0]
+            db_bio = (await self.bot.profiles.get(ctx.author.id))['brief_biography']
 
             if db_bio is not None:
                     r_list = ['🟩', '🟥']
@@ -208,9 +193,7 @@ class UserStats(Cog, name='Статистика'):
                             return
 
                         if str(react.emoji) == r_list[1]:
-                            db.execute("UPDATE users_info SET brief_biography = %s WHERE user_id = %s",
-                            None, ctx.author.id)
-                            db.commit()
+                            await self.bot.profiles.update(ctx.author.id, 'users_info', brief_biography=None)
 
                             embed = Embed(title=':white_check_mark: Выполнено!', color = Color.green(), timestamp = datetime.utcnow(),
                                         description = f"Биография пользователя **{ctx.author.display_name}** сброшена.")
@@ -231,9 +214,7 @@ class UserStats(Cog, name='Статистика'):
         else:
             bio = bio.replace('`', '`­')
             try:
-                db.execute("UPDATE users_info SET brief_biography = %s WHERE user_id = %s",
-                            bio.strip(), ctx.author.id)
-                db.commit()
+                await self.bot.profiles.update(ctx.author.id, 'users_info', brief_biography=bio.strip())
 
                 embed = Embed(title=':white_check_mark: Выполнено!', color = Color.green(), timestamp = datetime.utcnow(),
                             description = f"Поздравляем, **{ctx.author.display_name}**! Ваша биография обновлена:\n```{bio}```")
@@ -290,9 +271,7 @@ class UserStats(Cog, name='Статистика'):
         if str(react.emoji) == r_list[0]:
             await msg.clear_reactions()
 
-            db.execute("UPDATE users_info SET is_profile_public = %s WHERE user_id = %s",
-                    True, ctx.author.id)
-            db.commit()
+            await self.bot.profiles.update(ctx.author.id, 'users_info', is_profile_public=True)
 
             embed = Embed(
                 title=':white_check_mark: Выполнено!',
@@ -306,9 +285,7 @@ class UserStats(Cog, name='Статистика'):
         elif str(react.emoji) == r_list[1]:
             await msg.clear_reactions()
 
-            db.execute("UPDATE users_info SET is_profile_public = %s WHERE user_id = %s",
-                    False, ctx.author.id)
-            db.commit()
+            await self.bot.profiles.update(ctx.author.id, 'users_info', is_profile_public=False)
 
             embed = Embed(
                 title=':white_check_mark: Выполнено!',
@@ -386,7 +363,7 @@ class UserStats(Cog, name='Статистика'):
         if not target:
             return
 
-        rep_rank, lost_rep = db.fetchone(['rep_rank', 'lost_reputation'], 'users_stats', 'user_id', target.id)
+        rep_rank, lost_rep = await self.bot.db.fetchone(['rep_rank', 'lost_reputation'], 'users_stats', 'user_id', target.id)
         desc = f'Количество очков репутации: **{rep_rank}**\n' \
                f'Потеряно очков репутации: **{lost_rep}**'
 
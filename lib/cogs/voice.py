@@ -7,10 +7,10 @@ from discord.ext.commands import Cog
 from discord.utils import get
 from loguru import logger
 
-from ..db import db
 from ..utils.constants import (AFK_VOICE_ROOM, CHASOVOY_ROLE_ID,
                                PRIVATE_CHANNEL_GENERATOR,
                                PRIVATE_CHANNELS_CATEGORY)
+from ..utils.event_bus import event_bus
 
 
 class Voice(Cog, name='VoiceChannels Management'):
@@ -65,15 +65,13 @@ class Voice(Cog, name='VoiceChannels Management'):
             return
 
     @logger.catch
-    def update_member_invoce_time(self, member_id: int):
-        rec = db.fetchone(["entered_at"], "voice_activity", "user_id", member_id)
+    async def update_member_invoce_time(self, member_id: int):
+        rec = await self.bot.db.fetchone(["entered_at"], "voice_activity", "user_id", member_id)
         time_diff = (datetime.now() - rec[0]).seconds
-        time = db.fetchone(["invoice_time"], "users_stats", "user_id", member_id)[0]
-        db.execute("UPDATE users_stats SET invoice_time = %s WHERE user_id = %s",
-                    time + time_diff, member_id)
-        db.commit()
-        db.execute("DELETE FROM voice_activity WHERE user_id = %s", member_id)
-        db.commit()
+        stats = await self.bot.profiles.increment(member_id, 'users_stats', invoice_time=time_diff)
+        await self.bot.db.execute("DELETE FROM voice_activity WHERE user_id = $1", member_id)
+        if stats is not None:
+            event_bus.publish('counter_changed', member_id, 'voice_hours', stats['invoice_time'] // 3600)
 
     @Cog.listener()
     async def on_voice_state_update(self, member: Member, before: VoiceState, after: VoiceState):
@@ -126,17 +124,17 @@ class Voice(Cog, name='VoiceChannels Management'):
                 members = [m for m in after.channel.members if not m.bot]
                 if len(members) > 1:
                     for member in members:
-                        rec = db.fetchone(["entered_at"], "voice_activity", "user_id", member.id)
+                        rec = await self.bot.db.fetchone(["entered_at"], "voice_activity", "user_id", member.id)
                         if rec is None:
-                            db.insert("voice_activity",
+                            await self.bot.db.insert("voice_activity",
                             {"user_id": member.id,
                             "entered_at": datetime.now()}
                         )
 
         if after.channel is None:
-            rec = db.fetchone(["entered_at"], "voice_activity", "user_id", member.id)
+            rec = await self.bot.db.fetchone(["entered_at"], "voice_activity", "user_id", member.id)
             if rec is not None:
-                self.update_member_invoce_time(member.id)
+                await self.update_member_invoce_time(member.id)
 
             try:
                 members = [m for m in before.channel.members if not m.bot]
@@ -144,15 +142,15 @@ class Voice(Cog, name='VoiceChannels Management'):
                 return
             if len(members) < 2:
                 for member in members:
-                    rec = db.fetchone(["entered_at"], "voice_activity", "user_id", member.id)
+                    rec = await self.bot.db.fetchone(["entered_at"], "voice_activity", "user_id", member.id)
                     if rec is not None:
-                        self.update_member_invoce_time(member.id)
+                        await self.update_member_invoce_time(member.id)
 
         if before.channel is not None and after.channel is not None:
             if after.channel.id == AFK_VOICE_ROOM:
-                rec = db.fetchone(["entered_at"], "voice_activity", "user_id", member.id)
+                rec = await self.bot.db.fetchone(["entered_at"], "voice_activity", "user_id", member.id)
                 if rec is not None:
-                    self.update_member_invoce_time(member.id)
+                    await self.update_member_invoce_time(member.id)
 
 def setup(bot):
     bot.add_cog(Voice(bot))
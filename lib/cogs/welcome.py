@@ -5,7 +5,6 @@ from discord.ext.commands import Cog
 from discord.utils import get
 from loguru import logger
 
-from ..db import db
 from ..utils.constants import (AUDIT_LOG_CHANNEL, GOODBYE_CHANNEL,
                                MUTE_ROLE_ID, WELCOME_CHANNEL)
 from ..utils.utils import (delete_user_from_db, dump_user_data_in_json,
@@ -33,7 +32,7 @@ class Welcome(Cog, name='Greetings'):
     @logger.catch
     async def on_member_update(self, before: Member, after: Member):
         if before.pending is True and after.pending is False:
-            rec = db.fetchone(["user_id"], "mutes", "user_id", after.id)
+            rec = await self.bot.db.fetchone(["user_id"], "mutes", "user_id", after.id)
             try:
                 if rec is not None:
                     embed = Embed(
@@ -76,10 +75,15 @@ class Welcome(Cog, name='Greetings'):
     @logger.catch
     async def on_member_join(self, member):
         await insert_new_user_in_db(self.bot.db, self.bot.pg_pool, member)
+        # The stats may have been restored from a backup
+        self.bot.profiles.invalidate(member.id)
+        self.bot.leaderboards.add_user(member.id)
 
     @Cog.listener()
     @logger.catch
     async def on_member_remove(self, member):
+        self.bot.leaderboards.remove_user(member.id)
+        self.bot.profiles.invalidate(member.id)
         if member.pending is True:
             await delete_user_from_db(self.bot.pg_pool, member.id)
             embed = Embed(
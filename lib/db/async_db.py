@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import asyncpg
 
@@ -21,7 +21,7 @@ class DatabaseWrapper():
             f'VALUES ({placeholders})',
             values)
 
-    async def fetchall(self, columns: List[str], table: str) -> Dict[Any, Any]:
+    async def fetchall(self, columns: List[str], table: str) -> List[Dict[Any, Any]]:
         """
         Returns a list of dicts with fetched data
         """
@@ -30,16 +30,9 @@ class DatabaseWrapper():
             f'SELECT {columns_joined} '
             f'FROM {table}')
 
-        result = []
-        for i in data:
-            dict_row = {}
-            for key, value in i.values():
-                dict_row[key] = value
-            result.append(dict_row)
+        return [dict(record) for record in data]
 
-        return result
-
-    async def fetchone(self, columns: List[str], table: str, param: str, param_value: Any) -> Tuple[Any]:
+    async def fetchone(self, columns: List[str], table: str, param: str, param_value: Any) -> Optional[Tuple[Any]]:
         """
         Returns a tuple with fetched data
         """
@@ -47,28 +40,29 @@ class DatabaseWrapper():
         data = await self.pool.fetchrow(
             f'SELECT {columns_joined} '
             f'FROM {table} '
-            f'WHERE {param} = {param_value}')
-        result = tuple(data)
+            f'WHERE {param} = $1',
+            param_value)
 
-        return result
+        if data is not None:
+            return tuple(data)
 
     async def field(self, query: str, *values) -> Any:
         """
         Returns the first element from fetchone() method
         """
         data = await self.pool.fetchrow(query, *tuple(values))
-        data = tuple(data)
 
-        return data[0]
+        if data is not None:
+            return data[0]
 
-    async def record(self, query: str, *values) -> Tuple:
+    async def record(self, query: str, *values) -> Optional[Tuple]:
         """
         Returns record from fetchone() method
         """
         data = await self.pool.fetchrow(query, *tuple(values))
-        data = tuple(data)
 
-        return data
+        if data is not None:
+            return tuple(data)
 
     async def records(self, query: str, *values) -> List:
         """
@@ -78,3 +72,17 @@ class DatabaseWrapper():
         data = [tuple(record) for record in data]
 
         return data
+
+    async def column(self, query: str, *values) -> List:
+        """
+        Returns the first element of every record from fetchall() method
+        """
+        data = await self.pool.fetch(query, *tuple(values))
+
+        return [record[0] for record in data]
+
+    async def execute(self, query: str, *values) -> str:
+        """
+        Executes a SQL query
+        """
+        return await self.pool.execute(query, *tuple(values))
@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple, Union
+
+import asyncpg
+
+Executor = Union[asyncpg.Pool, asyncpg.Connection]
+
+VBUCKS = 'vbucks'
+RUBLES = 'rubles'
+
+
+async def user_achievement_ids(db: Executor, user_id: int) -> Set[str]:
+    records = await db.fetch(
+        'SELECT internal_id FROM user_achievements WHERE user_id = $1', user_id)
+    return {record['internal_id'] for record in records}
+
+
+async def has_achievement(db: Executor, user_id: int, internal_id: str) -> bool:
+    return await db.fetchval(
+        'SELECT EXISTS(SELECT 1 FROM user_achievements WHERE user_id = $1 AND internal_id = $2)',
+        user_id, internal_id)
+
+
+async def count_achievements(db: Executor, user_id: int) -> int:
+    return await db.fetchval(
+        'SELECT count(*) FROM user_achievements WHERE user_id = $1', user_id)
+
+
+async def add_achievement(db: Executor, user_id: int, internal_id: str, given_by: int) -> bool:
+    """
+    Gives the achievement to the user. Returns False if the user already has it
+    """
+    added = await db.fetchval(
+        'INSERT INTO user_achievements (user_id, internal_id, achieved_at, given_by) '
+        'VALUES ($1, $2, $3, $4) ON CONFLICT DO NOTHING RETURNING true',
+        user_id, internal_id, datetime.now(), given_by)
+    return bool(added)
+
+
+async def add_achievements(db: Executor, awards: Iterable[Tuple[int, str]], given_by: int) -> List[Tuple[int, str]]:
+    """
+    Gives many (user_id, internal_id) achievements in one query.
+    Returns the pairs that were actually added.
+    """
+    awards = list(awards)
+    if not awards:
+        return []
+    records = await db.fetch(
+        'INSERT INTO user_achievements (user_id, internal_id, achieved_at, given_by) '
+        'SELECT user_id, internal_id, $3, $4 FROM unnest($1::bigint[], $2::text[]) AS a(user_id, internal_id) '
+        'ON CONFLICT DO NOTHING RETURNING user_id, internal_id',
+        [user_id for user_id, _ in awards], [internal_id for _, internal_id in awards],
+        datetime.now(), given_by)
+    return [tuple(record) for record in records]
+
+
+async def remove_achievement(db: Executor, user_id: int, internal_id: str) -> bool:
+    """
+    Takes the achievement away. Returns False if the user did not have it
+    """
+    removed = await db.fetchval(
+        'DELETE FROM user_achievements WHERE user_id = $1 AND internal_id = $2 RETURNING true',
+        user_id, internal_id)
+    return bool(removed)
+
+
+async def add_purchase(db: Executor, user_id: int, currency: str, item: str, price: int) -> int:
+    """
+    Records a purchase and returns the new total of the user in this currency
+    """
+    return await db.fetchval(
+        'WITH inserted AS ('
+        '    INSERT INTO purchases (user_id, currency, item, price, purchased_at) '
+        '    VALUES ($1, $2, $3, $4, $5) RETURNING price) '
+        'SELECT COALESCE(sum(price), 0) + (SELECT price FROM inserted) FROM purchases '
+        'WHERE user_id = $1 AND currency = $2',
+        user_id, currency, item, price, datetime.now())
+
+
+async def purchases_summary(db: Executor, user_id: int, currency: str) -> Tuple[int, Optional[datetime]]:
+    """
+    Returns the total spent by the user and the date of the last purchase
+    """
+    total, last_purchase = await db.fetchrow(
+        'SELECT COALESCE(sum(price), 0), max(purchased_at) FROM purchases '
+        'WHERE user_id = $1 AND currency = $2',
+        user_id, currency)
+    return total, last_purchase
+
+
+async def delete_purchases(db: Executor, user_id: int) -> List[asyncpg.Record]:
+    """
+    Deletes all purchases of the user and returns them
+    """
+    return await db.fetch(
+        'DELETE FROM purchases WHERE user_id = $1 '
+        'RETURNING currency, item, price, purchased_at',
+        user_id)
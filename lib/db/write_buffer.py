@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import asyncpg
+from loguru import logger
+
+
+class WriteBehindBuffer():
+    """
+    Accumulates per-user counter deltas in memory and writes them to the database
+    in one multi-row UPDATE.
+
+    ``increments`` are columns that are summed (``messages_count + 1``),
+    ``latest`` are columns that keep the most recent value (``last_message_date``).
+    Both map a column name to its PostgreSQL type. Every delta is appended to
+    a journal file before it is acknowledged, so pending writes survive a crash
+    and are replayed on the next start.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, table: str, increments: Dict[str, str],
+                 latest: Dict[str, str], journal: str, max_size: int = 500) -> None:
+        self.pool = pool
+        self.table = table
+        self.increments = increments
+        self.latest = latest
+        self.journal = journal
+        self.max_size = max_size
+        self.lock = asyncio.Lock()
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+        os.makedirs(os.path.dirname(journal), exist_ok=True)
+        self._journal_file = open(self.journal, 'a', encoding='utf-8')
+
+    @property
+    def _flushing_journal(self) -> str:
+        return f'{self.journal}.flushing'
+
+    def _merge(self, user_id: int, values: Dict[str, Any]) -> None:
+        delta = self._pending.setdefault(user_id, {})
+        for column, value in values.items():
+            if column in self.increments:
+                delta[column] = delta.get(column, 0) + value
+            elif column in self.latest:
+                delta[column] = max(delta[column], value) if column in delta else value
+            else:
+                raise KeyError(f'Column {column} is not buffered for {self.table}')
+
+    def _write_journal(self, user_id: int, values: Dict[str, Any]) -> None:
+        entry = {'user_id': user_id}
+        for column, value in values.items():
+            entry[column] = value.isoformat() if isinstance(value, datetime) else value
+        self._journal_file.write(json.dumps(entry) + '\n')
+        self._journal_file.flush()
+
+    def _read_journal(self, path: str) -> None:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash may leave the last line half-written.
+                    continue
+                user_id = entry.pop('user_id')
+                for column, value in entry.items():
+                    if self.latest.get(column, '').startswith('timestamp'):
+                        entry[column] = datetime.fromisoformat(value)
+                self._merge(user_id, entry)
+
+    def add(self, user_id: int, **values) -> None:
+        """
+        Buffers a delta for the user, e.g. ``add(user_id, messages_count=1)``
+        """
+        self._merge(user_id, values)
+        self._write_journal(user_id, values)
+
+        if len(self._pending) >= self.max_size:
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.get_event_loop().create_task(self.flush())
+
+    def pending(self, user_id: int) -> Dict[str, Any]:
+        """
+        Returns the deltas of the user that are not written to the database yet
+        """
+        return dict(self._pending.get(user_id, {}))
+
+    async def _write(self, pending: Dict[int, Dict[str, Any]]) -> None:
+        columns = [*self.increments, *self.latest]
+        types = {**self.increments, **self.latest}
+        arrays = [list(pending.keys())]
+        for column in columns:
+            default = 0 if column in self.increments else None
+            arrays.append([delta.get(column, default) for delta in pending.values()])
+
+        assignments = [f'{c} = t.{c} + v.{c}' for c in self.increments]
+        assignments += [f'{c} = COALESCE(v.{c}, t.{c})' for c in self.latest]
+        unnest_args = ', '.join(
+            f'${i}::{t}[]' for i, t in enumerate(['bigint', *[types[c] for c in columns]], 1))
+
+        await self.pool.execute(
+            f'UPDATE {self.table} AS t '
+            f'SET {", ".join(assignments)} '
+            f'FROM unnest({unnest_args}) AS v(user_id, {", ".join(columns)}) '
+            f'WHERE t.user_id = v.user_id',
+            *arrays)
+
+    async def flush(self) -> None:
+        """
+        Writes all buffered deltas to the database in a single query
+        """
+        async with self.lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, {}
+            self._journal_file.close()
+            if os.path.exists(self._flushing_journal):
+                os.remove(self._flushing_journal)
+            os.replace(self.journal, self._flushing_journal)
+            self._journal_file = open(self.journal, 'a', encoding='utf-8')
+
+            try:
+                await self._write(pending)
+            except Exception as e:
+                logger.error(f'Failed to flush {len(pending)} {self.table} deltas: {e}')
+                for user_id, values in pending.items():
+                    self._merge(user_id, values)
+                    self._write_journal(user_id, values)
+            finally:
+                os.remove(self._flushing_journal)
+
+    async def replay(self) -> None:
+        """
+        Restores deltas left in the journal by an unclean shutdown and flushes them
+        """
+        for path in (self._flushing_journal, self.journal):
+            if os.path.exists(path):
+                self._read_journal(path)
+
+        if self._pending:
+            logger.info(f'Replaying {len(self._pending)} {self.table} deltas from the journal')
+            await self.flush()
+
+    async def close(self) -> None:
+        """
+        Flushes the buffer and closes the journal
+        """
+        await self.flush()
+        self._journal_file.close()
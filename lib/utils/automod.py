@@ -0,0 +1,108 @@
+import json
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Tuple
+
+URL_PATTERN = r'(?:https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|www\.[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9]+\.[^\s]{2,}|www\.[a-zA-Z0-9]+\.[^\s]{2,})'
+DISCORD_INVITE_PATTERN = r'discord(?:\.com|app\.com|\.gg)[\/invite\/]?(?:[a-zA-Z0-9\-]{2,32})'
+EMOJI_PATTERN = r'<a?:[a-zA-Z0-9_]{2,32}:[0-9]{18,22}>'
+UNICODE_EMOJI_PATTERN = r'[\U00010000-\U0010ffff]'
+
+URL_REGEX = re.compile(URL_PATTERN)
+DISCORD_INVITE_REGEX = re.compile(DISCORD_INVITE_PATTERN)
+EMOJI_REGEX = re.compile(EMOJI_PATTERN)
+UNICODE_EMOJI_REGEX = re.compile(UNICODE_EMOJI_PATTERN)
+
+
+class ScamRule(NamedTuple):
+    """
+    The message is a scam if it contains any of the keywords and none of the exceptions.
+    """
+    name: str
+    keywords: FrozenSet[str]
+    exceptions: FrozenSet[str] = frozenset()
+    requires_url: bool = True
+
+
+class Detection(NamedTuple):
+    urls: Tuple[str, ...]
+    invites: Tuple[str, ...]
+    emoji_count: int
+    # rule words found, only of the rules that can trigger without a URL if there is none
+    keywords: FrozenSet[str]
+    # names of the scam rules the message triggered
+    scam: Tuple[str, ...]
+
+
+class AutoModDetector():
+    """
+    Auto-moderation rules indexed by their keywords.
+
+    ``detect`` looks for every distinct keyword of the rules once, and for
+    URLs, Discord invites and emoji with precompiled expressions, each only
+    if the text those matches start with is present. Every kind of hit is
+    reported the way a separate ``findall``/``in`` check would report it,
+    including a keyword inside a link. Only the rules whose keywords were
+    found are evaluated.
+    """
+
+    def __init__(self, rules: Iterable[ScamRule] = ()) -> None:
+        self.rules = tuple(rules)
+        # word: indexes of the rules that mention it
+        self._rules_by_word: Dict[str, List[int]] = defaultdict(list)
+        for i, rule in enumerate(self.rules):
+            for word in rule.keywords | rule.exceptions:
+                if word:
+                    self._rules_by_word[word].append(i)
+        # A substring search per word is faster than one alternation of
+        # all of them, even with a hundred rules
+        self._words = tuple(self._rules_by_word)
+        self._words_without_url = tuple(
+            word for word, indexes in self._rules_by_word.items()
+            if any(not self.rules[i].requires_url for i in indexes)
+        )
+
+    @classmethod
+    def from_file(cls, filename: str) -> 'AutoModDetector':
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(
+            ScamRule(
+                name=rule['name'],
+                keywords=frozenset(rule['keywords']),
+                exceptions=frozenset(rule.get('exceptions', ())),
+                requires_url=rule.get('requires_url', True),
+            )
+            for rule in data['scam']
+        )
+
+    def detect(self, content: str, raw_content: str = None) -> Detection:
+        """
+        Scans the clean content of a message. Emoji are counted
+        in ``raw_content`` if it is given
+        """
+        # Every URL starts with http or www., every invite with discord
+        urls = URL_REGEX.findall(content) if 'http' in content or 'www.' in content else []
+        invites = DISCORD_INVITE_REGEX.findall(content) if 'discord' in content else []
+
+        # Most rules need a URL, their words are not looked for in a message without one
+        words = self._words if urls else self._words_without_url
+        keywords = {word for word in words if word in content}
+
+        raw_content = content if raw_content is None else raw_content
+        # A character class is scanned much faster than an alternation,
+        # and custom emoji are looked for only if the message can contain one
+        emoji_count = len(UNICODE_EMOJI_REGEX.findall(raw_content))
+        if '<' in raw_content:
+            emoji_count += len(EMOJI_REGEX.findall(raw_content))
+
+        scam = []
+        if keywords:
+            for i in sorted({i for word in keywords for i in self._rules_by_word[word]}):
+                rule = self.rules[i]
+                if rule.requires_url and not urls:
+                    continue
+                if rule.keywords & keywords and not rule.exceptions & keywords:
+                    scam.append(rule.name)
+
+        return Detection(tuple(urls), tuple(invites), emoji_count, frozenset(keywords), tuple(scam))
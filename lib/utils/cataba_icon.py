@@ -6,6 +6,8 @@ import requests
 from jishaku.functools import executor_function
 from PIL import Image, ImageDraw, ImageFilter, ImageFont
 
+from .image_assets import assets
+
 
 class BaseIcon:
     def __init__(self):
@@ -14,17 +16,16 @@ class BaseIcon:
 
     def draw_card_background(self, canvas: Image.Image, icon) -> None:
         try:
-            background = Image.open(f'data/images/cataba_cards/card_background_{icon["rarity"]["value"]}.png')
+            background = assets.resized(f'data/images/cataba_cards/card_background_{icon["rarity"]["value"]}.png', (512, 512))
         except FileNotFoundError:
-            background = Image.open(f'data/images/cataba_cards/card_background_common.png')
-        background = background.resize((512, 512), Image.ANTIALIAS)
+            background = assets.resized(f'data/images/cataba_cards/card_background_common.png', (512, 512))
         canvas.paste(background)
 
     def draw_card_faceplate(self, canvas: Image.Image, icon) -> None:
         try:
-            faceplate = Image.open(f'data/images/cataba_cards/card_faceplate_{icon["rarity"]["value"]}.png')
+            faceplate = assets.image(f'data/images/cataba_cards/card_faceplate_{icon["rarity"]["value"]}.png')
         except FileNotFoundError:
-            faceplate = Image.open(f'data/images/cataba_cards/card_faceplate_common.png')
+            faceplate = assets.image(f'data/images/cataba_cards/card_faceplate_common.png')
         canvas.paste(faceplate, faceplate)
 
     def draw_text_background(
@@ -54,7 +55,7 @@ class BaseIcon:
             image = icon['images']['smallIcon']
 
         if not image and os.path.isfile('data/images/cataba_cards/placeholder.png'):
-            image = Image.open('data/images/cataba_cards/placeholder.png')
+            image = assets.image('data/images/cataba_cards/placeholder.png')
         else:
             image = ImageUtils.download_image(image)
             if not image:
@@ -178,7 +179,7 @@ class BaseIcon:
             )
 
     def draw_user_flacing(self, canvas: Image.Image) -> Image.Image:
-        cb = Image.open('data/images/cataba_cards/plus_sign.png')
+        cb = assets.image('data/images/cataba_cards/plus_sign.png')
         canvas.paste(cb, cb)
 
     @executor_function
@@ -254,9 +255,9 @@ class ImageUtils:
         """Open and return font located in provided directory."""
 
         try:
-            return ImageFont.truetype(f'{directory}{font}', size)
+            return assets.font(f'{directory}{font}', size)
         except OSError as e:
             print(f'{font} not found, defaulted font to BurbankBigRegular-Black.ttf')
-            return ImageFont.truetype(f'{directory}BurbankBigRegular-Black.ttf', size)
+            return assets.font(f'{directory}BurbankBigRegular-Black.ttf', size)
         except Exception as e:
             print(f'Failed to load font, {e}')
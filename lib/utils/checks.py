@@ -2,7 +2,6 @@ from typing import List
 
 from discord.ext import commands
 
-from ..db import db
 from . import exceptions
 
 radio_whitelisted_users = [
@@ -66,9 +65,9 @@ def required_level(level:int):
     """
     A check() that checks if member has minimal required level to run a command.
     """
-    def predicate(ctx):
-        rec = db.fetchone(["level"], "leveling", 'user_id', ctx.author.id)
-        if int(rec[0]) >= level:
+    async def predicate(ctx):
+        profile = await ctx.bot.profiles.get(ctx.author.id)
+        if int(profile['level']) >= level:
             return True
         else:
             raise exceptions.InsufficientLevel
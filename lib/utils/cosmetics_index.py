@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import re
+from hashlib import sha1
+from typing import Any, Dict, FrozenSet, List, Optional, Set
+
+from loguru import logger
+
+from .http_client import HTTPClient
+
+COSMETICS_ENDPOINT = 'https://fortnite-api.com/v2/cosmetics/br'
+
+# Search parameters of fortnite-api.com/v2/cosmetics/br/search that are answered locally.
+# parameter: path of the value in the cosmetic, compared case-insensitively
+EXACT_PARAMETERS = {
+    'id': ('id',),
+    'type': ('type', 'value'),
+    'displayType': ('type', 'displayValue'),
+    'backendType': ('type', 'backendValue'),
+    'rarity': ('rarity', 'value'),
+    'displayRarity': ('rarity', 'displayValue'),
+    'backendRarity': ('rarity', 'backendValue'),
+    'series': ('series', 'value'),
+    'backendSeries': ('series', 'backendValue'),
+    'set': ('set', 'value'),
+    'setText': ('set', 'text'),
+    'backendSet': ('set', 'backendValue'),
+    'backendIntroduction': ('introduction', 'backendValue'),
+    'introductionChapter': ('introduction', 'chapter'),
+    'introductionSeason': ('introduction', 'season'),
+    'dynamicPakId': ('dynamicPakId',),
+}
+# parameter: path of the value that must be present (true) or missing (false)
+FLAG_PARAMETERS = {
+    'hasSeries': ('series',),
+    'hasSet': ('set',),
+    'hasIntroduction': ('introduction',),
+    'hasFeaturedImage': ('images', 'featured'),
+    'hasVariants': ('variants',),
+    'hasGameplayTags': ('gameplayTags',),
+    'hasMetaTags': ('metaTags',),
+    'hasDynamicPakId': ('dynamicPakId',),
+}
+# parameter: list of the cosmetic that must contain the value
+TAG_PARAMETERS = {
+    'gameplayTag': 'gameplayTags',
+    'metaTag': 'metaTags',
+}
+# parameter: text of the cosmetic that is matched with the matchMethod
+TEXT_PARAMETERS = ('name', 'description')
+
+MATCH_METHODS = {
+    'full': lambda text, value: text == value,
+    'contains': lambda text, value: value in text,
+    'starts': lambda text, value: text.startswith(value),
+    'ends': lambda text, value: text.endswith(value),
+}
+
+TOKEN_REGEX = re.compile(r'\w+')
+
+
+class UnsupportedQuery(Exception):
+    """
+    The search can not be answered by the local index and has to be sent to the API
+    """
+
+
+def _value(cosmetic: Dict[str, Any], path) -> Any:
+    for key in path:
+        if not isinstance(cosmetic, dict):
+            return None
+        cosmetic = cosmetic.get(key)
+    return cosmetic
+
+
+def _key(value: Any) -> str:
+    return str(value).lower()
+
+
+class CosmeticsCatalog():
+    """
+    Search indexes over one list of cosmetics (fortnite-api.com v2 format).
+    The catalog is immutable, a sync builds a new one.
+    """
+
+    def __init__(self, cosmetics: List[Dict[str, Any]]) -> None:
+        self.cosmetics = cosmetics
+        self.all: FrozenSet[int] = frozenset(range(len(cosmetics)))
+        self._exact: Dict[str, Dict[str, Set[int]]] = {parameter: {} for parameter in EXACT_PARAMETERS}
+        self._flags: Dict[str, Set[int]] = {parameter: set() for parameter in FLAG_PARAMETERS}
+        self._tags: Dict[str, Dict[str, Set[int]]] = {parameter: {} for parameter in TAG_PARAMETERS}
+        # lower case name / description of every cosmetic and their words
+        self._texts: Dict[str, List[str]] = {parameter: [] for parameter in TEXT_PARAMETERS}
+        self._tokens: Dict[str, Dict[str, Set[int]]] = {parameter: {} for parameter in TEXT_PARAMETERS}
+
+        for position, cosmetic in enumerate(cosmetics):
+            for parameter, path in EXACT_PARAMETERS.items():
+                value = _value(cosmetic, path)
+                if value is not None:
+                    self._exact[parameter].setdefault(_key(value), set()).add(position)
+            for parameter, path in FLAG_PARAMETERS.items():
+                if _value(cosmetic, path):
+                    self._flags[parameter].add(position)
+            for parameter, field in TAG_PARAMETERS.items():
+                for tag in cosmetic.get(field) or ():
+                    self._tags[parameter].setdefault(_key(tag), set()).add(position)
+            for parameter in TEXT_PARAMETERS:
+                text = _key(cosmetic.get(parameter) or '')
+                self._texts[parameter].append(text)
+                for token in TOKEN_REGEX.findall(text):
+                    self._tokens[parameter].setdefault(token, set()).add(position)
+
+        self._ids = {cosmetic['id'].lower(): position for position, cosmetic in enumerate(cosmetics)}
+
+    def __len__(self) -> int:
+        return len(self.cosmetics)
+
+    def get(self, cosmetic_id: str) -> Optional[Dict[str, Any]]:
+        position = self._ids.get(cosmetic_id.lower())
+        return self.cosmetics[position] if position is not None else None
+
+    def _text_candidates(self, parameter: str, value: str) -> FrozenSet[int]:
+        # Every word of the query is a part of a word of the text,
+        # whatever the matchMethod is
+        candidates = self.all
+        for word in TOKEN_REGEX.findall(value):
+            positions = set()
+            for token, token_positions in self._tokens[parameter].items():
+                if word in token:
+                    positions |= token_positions
+            candidates = candidates & positions
+        return candidates
+
+    def _candidates(self, parameter: str, value: str) -> FrozenSet[int]:
+        if parameter in EXACT_PARAMETERS:
+            return frozenset(self._exact[parameter].get(value, ()))
+        if parameter in FLAG_PARAMETERS:
+            if value not in ('true', 'false'):
+                raise UnsupportedQuery(f'{parameter}={value}')
+            flagged = self._flags[parameter]
+            return frozenset(flagged) if value == 'true' else self.all - flagged
+        if parameter in TAG_PARAMETERS:
+            return frozenset(self._tags[parameter].get(value, ()))
+        if parameter in TEXT_PARAMETERS:
+            return self._text_candidates(parameter, value)
+        raise UnsupportedQuery(parameter)
+
+    def search(self, query: Dict[str, str], match_method: str = 'contains') -> List[Dict[str, Any]]:
+        """
+        Returns the cosmetics that match all the parameters of the query, in the catalog order
+        """
+        matches = MATCH_METHODS.get(match_method)
+        if matches is None:
+            raise UnsupportedQuery(f'matchMethod={match_method}')
+        if not query:
+            raise UnsupportedQuery('empty query')
+
+        query = {parameter: _key(value) for parameter, value in query.items()}
+        candidates = self.all
+        for parameter, value in query.items():
+            candidates = candidates & self._candidates(parameter, value)
+            if not candidates:
+                return []
+
+        return [
+            self.cosmetics[position] for position in sorted(candidates)
+            if all(matches(self._texts[parameter][position], query[parameter])
+                   for parameter in TEXT_PARAMETERS if parameter in query)
+        ]
+
+
+class CosmeticsIndex():
+    """
+    Local copy of the fortnite-api.com cosmetics list in one language.
+
+    ``sync`` downloads the list with the ETag of the previous download,
+    so an unchanged list costs a 304. A changed body is compared by hash,
+    and only a different list rebuilds the catalog. The last list is kept
+    in ``path`` and ``load`` reads it on start, so searches work before the
+    first sync and while the API is down.
+    """
+
+    def __init__(self, http_client: HTTPClient, language: str = 'ru',
+                 path: str = './data/cache/cosmetics_{language}.json') -> None:
+        self.http_client = http_client
+        self.language = language
+        self.path = path.format(language=language)
+        self.etag: Optional[str] = None
+        self.hash: Optional[str] = None
+        self.catalog: Optional[CosmeticsCatalog] = None
+
+    @property
+    def _meta_path(self) -> str:
+        return f'{self.path}.meta'
+
+    def _run(self, func, *args):
+        return asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    def get(self, cosmetic_id: str) -> Optional[Dict[str, Any]]:
+        return self.catalog.get(cosmetic_id) if self.catalog is not None else None
+
+    def search(self, query: Dict[str, str], language: str = 'ru', search_language: str = 'ru',
+               match_method: str = 'contains') -> Optional[Dict[str, Any]]:
+        """
+        Returns the first cosmetic that matches the query, like the search endpoint of the API.
+        Raises UnsupportedQuery if the query has to be sent to the API.
+        """
+        if self.catalog is None:
+            raise UnsupportedQuery('the index is not loaded')
+        if language != self.language or search_language != self.language:
+            raise UnsupportedQuery(f'language={language}, searchLanguage={search_language}')
+        found = self.catalog.search(query, match_method)
+        return found[0] if found else None
+
+    def _read(self) -> Optional[tuple]:
+        if not os.path.exists(self.path) or not os.path.exists(self._meta_path):
+            return None
+        with open(self._meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(self.path, 'rb') as f:
+            body = f.read()
+        return meta, CosmeticsCatalog(json.loads(body)['data'])
+
+    def _write(self, body: bytes) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'wb') as f:
+            f.write(body)
+        with open(self._meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'etag': self.etag, 'hash': self.hash}, f)
+
+    async def load(self) -> None:
+        try:
+            saved = await self._run(self._read)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f'Saved cosmetics list {self.path} is unreadable: {e!r}')
+            return
+        if saved is not None:
+            meta, self.catalog = saved
+            self.etag, self.hash = meta.get('etag'), meta.get('hash')
+
+    async def sync(self) -> bool:
+        """
+        Returns True if the catalog was rebuilt
+        """
+        headers = {'If-None-Match': self.etag} if self.etag and self.catalog is not None else {}
+        async with self.http_client.get(COSMETICS_ENDPOINT, params={'language': self.language},
+                                        headers=headers) as r:
+            if r.status == 304:
+                return False
+            if r.status != 200:
+                logger.warning(f'Cosmetics list was not downloaded: {r.status}')
+                return False
+            body = await r.read()
+            etag = r.headers.get('ETag')
+
+        digest = sha1(body).hexdigest()
+        self.etag = etag
+        if digest == self.hash and self.catalog is not None:
+            return False
+
+        catalog = await self._run(lambda: CosmeticsCatalog(json.loads(body)['data']))
+        if self.catalog is not None:
+            old_ids = {cosmetic['id'] for cosmetic in self.catalog.cosmetics}
+            new_ids = {cosmetic['id'] for cosmetic in catalog.cosmetics}
+            logger.info(f'Cosmetics index: {len(new_ids - old_ids)} added, {len(old_ids - new_ids)} removed')
+        self.catalog, self.hash = catalog, digest
+        await self._run(self._write, body)
+        return True
@@ -0,0 +1,81 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Sequence
+
+from aiohttp import ClientError, ClientTimeout
+
+from .http_client import HTTPClient
+
+
+class DevServerState(NamedTuple):
+    host: str
+    # /fortnite/api/version of the server, None if it did not answer
+    version: Optional[dict]
+    checked_at: datetime
+
+
+class DevServersMonitor():
+    """
+    Versions of the Fortnite dev servers.
+
+    ``sweep`` probes all servers concurrently, at most ``concurrency`` at
+    once and every one of them for at most ``timeout`` seconds, and yields
+    the states in the order the servers answer. The states of the last
+    sweep are kept, so ``states`` can be shown without waiting for the
+    servers.
+    """
+
+    def __init__(self, http_client: HTTPClient, hosts: Sequence[str],
+                 concurrency: int = 12, timeout: float = 5) -> None:
+        self.http_client = http_client
+        self.hosts = tuple(hosts)
+        self.concurrency = concurrency
+        self.timeout = ClientTimeout(total=timeout)
+        self.swept_at: Optional[datetime] = None
+        self._states: Dict[str, DevServerState] = {}
+
+    @classmethod
+    def from_file(cls, http_client: HTTPClient, path: str, **kwargs) -> 'DevServersMonitor':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(http_client, json.load(f)['servers'], **kwargs)
+
+    def states(self) -> List[DevServerState]:
+        """
+        Returns the states of the servers that answered, in the order of the hosts
+        """
+        return [self._states[host] for host in self.hosts
+                if host in self._states and self._states[host].version is not None]
+
+    async def probe(self, host: str) -> DevServerState:
+        try:
+            # A server that is down is checked again by the next sweep, not retried
+            async with self.http_client.get(f'https://{host}/fortnite/api/version',
+                                            timeout=self.timeout, retries=0) as r:
+                version = await r.json() if r.status == 200 else None
+        except (ClientError, asyncio.TimeoutError, ValueError):
+            version = None
+        return DevServerState(host, version, datetime.utcnow())
+
+    async def sweep(self) -> AsyncIterator[DevServerState]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded_probe(host: str) -> DevServerState:
+            async with semaphore:
+                return await self.probe(host)
+
+        probes = [asyncio.ensure_future(bounded_probe(host)) for host in self.hosts]
+        try:
+            for probe in asyncio.as_completed(probes):
+                state = await probe
+                self._states[state.host] = state
+                yield state
+            self.swept_at = datetime.utcnow()
+        finally:
+            # The caller stopped reading the results
+            for probe in probes:
+                probe.cancel()
+
+    async def refresh(self) -> None:
+        async for _ in self.sweep():
+            pass
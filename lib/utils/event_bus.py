@@ -0,0 +1,46 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Callable, Coroutine, DefaultDict, List
+
+from loguru import logger
+
+Subscriber = Callable[..., Coroutine[Any, Any, None]]
+
+
+class EventBus():
+    """
+    In-process publish/subscribe bus.
+
+    Subscribers are coroutine functions. ``publish`` schedules them as tasks
+    and returns at once, so the write paths that publish events never wait for
+    the subscribers or fail because of them.
+
+    Events:
+        ``counter_changed(user_id, counter, value)`` - a user counter was changed.
+        ``counter`` is the name of the metric from ``ACHIEVEMENT_RULES``,
+        ``value`` is the new value of the counter or None if it is unknown.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: DefaultDict[str, List[Subscriber]] = defaultdict(list)
+
+    def subscribe(self, event: str, callback: Subscriber) -> None:
+        if callback not in self._subscribers[event]:
+            self._subscribers[event].append(callback)
+
+    def unsubscribe(self, event: str, callback: Subscriber) -> None:
+        if callback in self._subscribers[event]:
+            self._subscribers[event].remove(callback)
+
+    def publish(self, event: str, *args, **kwargs) -> None:
+        for callback in self._subscribers[event]:
+            asyncio.get_event_loop().create_task(self._run(event, callback, *args, **kwargs))
+
+    async def _run(self, event: str, callback: Subscriber, *args, **kwargs) -> None:
+        try:
+            await callback(*args, **kwargs)
+        except Exception:
+            logger.exception(f'{callback.__qualname__} failed to handle {event}')
+
+
+event_bus = EventBus()
@@ -0,0 +1,80 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
+from heapq import nlargest
+from itertools import repeat
+from math import ceil, floor
+from typing import Iterable, List
+
+
+def _ratio(matches: int, length: int) -> float:
+    # difflib._calculate_ratio
+    return 2.0 * matches / length if length else 1.0
+
+
+class FuzzyMatcher():
+    """
+    Precomputed index over a list of phrases that returns exactly what
+    ``difflib.get_close_matches(word, phrases, n, cutoff)`` returns.
+
+    Phrases are sorted by length, so a binary search keeps only those whose
+    length can reach the cutoff (difflib's real_quick_ratio). The character
+    counts of every phrase are computed once for the quick_ratio bound, and
+    the full SequenceMatcher ratio is computed only for the phrases that pass
+    both bounds. Messages of an unsuitable length are rejected without
+    building a SequenceMatcher at all.
+    """
+
+    def __init__(self, phrases: Iterable[str], cutoff: float, n: int = 3) -> None:
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError(f'cutoff must be in [0.0, 1.0]: {cutoff!r}')
+        if n <= 0:
+            raise ValueError(f'n must be > 0: {n!r}')
+        self.cutoff = cutoff
+        self.n = n
+        # (length, phrase, character counts) sorted by length
+        self.index = sorted(
+            ((len(phrase), phrase, Counter(phrase)) for phrase in phrases),
+            key=lambda entry: entry[0]
+        )
+        self.lengths = [length for length, *_ in self.index]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _length_window(self, length: int) -> List[tuple]:
+        if self.cutoff == 0.0:
+            return self.index
+        lo = floor(self.cutoff * length / (2 - self.cutoff)) - 1
+        hi = ceil(length * (2 - self.cutoff) / self.cutoff) + 1
+        return self.index[bisect_left(self.lengths, lo):bisect_right(self.lengths, hi)]
+
+    def get_close_matches(self, word: str) -> List[str]:
+        lb = len(word)
+        candidates = self._length_window(lb)
+        if not candidates:
+            return []
+
+        cutoff = self.cutoff
+        word_count = None
+        s = None
+        result = []
+        for la, phrase, phrase_counts in candidates:
+            # Same bounds as SequenceMatcher.real_quick_ratio() and quick_ratio()
+            if _ratio(min(la, lb), la + lb) < cutoff:
+                continue
+            if word_count is None:
+                word_count = Counter(word).get
+            matches = sum(map(min, phrase_counts.values(), map(word_count, phrase_counts, repeat(0))))
+            if _ratio(matches, la + lb) < cutoff:
+                continue
+
+            if s is None:
+                s = SequenceMatcher()
+                s.set_seq2(word)
+            s.set_seq1(phrase)
+            score = s.ratio()
+            if score >= cutoff:
+                result.append((score, phrase))
+
+        return [phrase for score, phrase in nlargest(self.n, result)]
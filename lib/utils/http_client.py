@@ -0,0 +1,114 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from aiohttp import (ClientConnectionError, ClientResponse, ClientSession,
+                     ClientTimeout, TCPConnector)
+from loguru import logger
+
+# Statuses after which the request is worth repeating
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+DEFAULT_TIMEOUT = ClientTimeout(total=30, connect=10, sock_read=20)
+
+
+class HTTPClient():
+    """
+    Outbound HTTP of the bot.
+
+    All requests go through one ClientSession whose connector keeps up to
+    ``limit_per_host`` keep-alive connections per upstream host (``limit``
+    in total) and caches DNS for ``dns_ttl`` seconds, so repeated requests
+    to an API reuse open TLS connections instead of setting up new ones.
+    Idle connections are closed after ``keepalive_timeout`` seconds, so the
+    hosts that were contacted once do not keep anything open.
+
+    Idempotent requests that failed to connect, timed out or got one of
+    RETRY_STATUSES are repeated up to ``retries`` times with an exponential
+    backoff starting at ``backoff`` seconds. Other methods are not retried
+    unless ``retries`` is passed explicitly.
+
+    Usage::
+
+        async with bot.http_client.get(url, headers=headers) as r:
+            if r.status == 200:
+                data = await r.json()
+    """
+
+    def __init__(self, timeout: ClientTimeout = DEFAULT_TIMEOUT, limit_per_host: int = 10,
+                 limit: int = 100, retries: int = 2, backoff: float = 0.5, dns_ttl: int = 300,
+                 keepalive_timeout: float = 60) -> None:
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.limit = limit
+        self.retries = retries
+        self.backoff = backoff
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[ClientSession] = None
+
+    @property
+    def session(self) -> ClientSession:
+        """
+        The session is created on first use, inside the running event loop
+        """
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def _send(self, method: str, url, retries: int, **kwargs) -> ClientResponse:
+        session = self.session
+        for attempt in range(retries + 1):
+            try:
+                response = await session.request(method, url, **kwargs)
+            except (ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == retries:
+                    raise
+                logger.debug(f'{method} {url} failed ({e!r}), retrying')
+            else:
+                if response.status not in RETRY_STATUSES or attempt == retries:
+                    return response
+                logger.debug(f'{method} {url} returned {response.status}, retrying')
+                retry_after = response.headers.get('Retry-After', '')
+                response.release()
+                if retry_after.isdigit():
+                    await asyncio.sleep(min(int(retry_after), 60))
+                    continue
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    @asynccontextmanager
+    async def request(self, method: str, url, *, retries: Optional[int] = None,
+                      **kwargs) -> AsyncIterator[ClientResponse]:
+        """
+        Sends the request and yields the response.
+        Keyword arguments are passed to ``ClientSession.request``.
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        response = await self._send(method, url, retries, **kwargs)
+        try:
+            yield response
+        finally:
+            response.release()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    async def close(self) -> None:
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
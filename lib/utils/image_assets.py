@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from PIL import Image, ImageFont
+
+
+class ImageAssets():
+    """
+    Templates and fonts of the image generators (athena shop cards and
+    cataba cosmetic icons), loaded once per process.
+
+    ``image`` decodes a file on the first request and returns the same
+    image afterwards, ``resized`` keeps resized variants per target size,
+    the least recently used variants are dropped once they take more than
+    ``max_resized_bytes``. The returned images are shared: paste them,
+    never draw on them.
+
+    Fonts are memoized per (file, size) and per thread, because a FreeType
+    font must not be used by several threads at once.
+    """
+
+    def __init__(self, max_resized_bytes: int = 128 * 1024 * 1024) -> None:
+        self.max_resized_bytes = max_resized_bytes
+        self._lock = threading.Lock()
+        self._images: Dict[str, Image.Image] = {}
+        self._resized: 'OrderedDict[Tuple[str, Tuple[int, int]], Image.Image]' = OrderedDict()
+        self._resized_bytes = 0
+        self._fonts = threading.local()
+
+    @staticmethod
+    def _bytes(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+    def image(self, path: str) -> Image.Image:
+        """
+        Raises FileNotFoundError if there is no such file, missing files are not cached
+        """
+        image = self._images.get(path)
+        if image is None:
+            image = Image.open(path)
+            image.load()
+            with self._lock:
+                image = self._images.setdefault(path, image)
+        return image
+
+    def resized(self, path: str, size: Tuple[int, int]) -> Image.Image:
+        key = (path, size)
+        with self._lock:
+            image = self._resized.get(key)
+            if image is not None:
+                self._resized.move_to_end(key)
+                return image
+
+        image = self.image(path).resize(size, Image.ANTIALIAS)
+        if self._bytes(image) > self.max_resized_bytes // 2:
+            return image
+
+        with self._lock:
+            if key not in self._resized:
+                self._resized[key] = image
+                self._resized_bytes += self._bytes(image)
+            while self._resized_bytes > self.max_resized_bytes:
+                _, dropped = self._resized.popitem(last=False)
+                self._resized_bytes -= self._bytes(dropped)
+        return image
+
+    def ratio_resized(self, path: str, max_width: int, max_height: int) -> Image.Image:
+        """
+        Resized so that it covers max_width x max_height, keeping the aspect ratio
+        """
+        width, height = self.image(path).size
+        ratio = max(max_width / width, max_height / height)
+        return self.resized(path, (int(width * ratio), int(height * ratio)))
+
+    def font(self, path: str, size: int) -> ImageFont.FreeTypeFont:
+        """
+        Raises OSError if the font can not be opened, failures are not cached
+        """
+        fonts = getattr(self._fonts, 'fonts', None)
+        if fonts is None:
+            fonts = self._fonts.fonts = {}
+        font = fonts.get((path, size))
+        if font is None:
+            font = fonts[(path, size)] = ImageFont.truetype(path, size)
+        return font
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._resized.clear()
+            self._resized_bytes = 0
+        self._fonts = threading.local()
+
+
+assets = ImageAssets()
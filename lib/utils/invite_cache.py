@@ -0,0 +1,73 @@
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+from discord.errors import NotFound
+from discord.utils import resolve_invite
+
+
+class InviteCache():
+    """
+    Invite code: id of the guild the invite leads to.
+
+    Resolved codes are kept for ``ttl`` seconds, codes that Discord does not
+    know (NotFound) are kept for ``negative_ttl`` seconds, the least recently
+    used codes are evicted after ``maxsize``. Concurrent lookups of the same
+    code share one ``fetch_invite`` request, so spam of one invite costs a
+    single REST call.
+    """
+
+    def __init__(self, bot, ttl: float = 3600, negative_ttl: float = 600, maxsize: int = 1024) -> None:
+        self.bot = bot
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        # code: (guild id or None, expiration time)
+        self._entries: 'OrderedDict[str, Tuple[Optional[int], float]]' = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, url: str) -> None:
+        self._entries.pop(resolve_invite(url), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def guild_id(self, url: str) -> Optional[int]:
+        """
+        Returns the id of the guild the invite leads to,
+        None if the invite does not exist or does not lead to a guild
+        """
+        code = resolve_invite(url)
+        entry = self._entries.get(code)
+        if entry is not None:
+            guild_id, expires_at = entry
+            if expires_at > monotonic():
+                self._entries.move_to_end(code)
+                return guild_id
+            del self._entries[code]
+
+        request = self._pending.get(code)
+        if request is None:
+            request = self._pending[code] = asyncio.ensure_future(self._fetch(code))
+            request.add_done_callback(lambda _: self._pending.pop(code, None))
+        # A cancelled listener must not cancel the request the others wait for
+        return await asyncio.shield(request)
+
+    async def _fetch(self, code: str) -> Optional[int]:
+        try:
+            invite = await self.bot.fetch_invite(code, with_counts=False)
+        except NotFound:
+            guild_id, ttl = None, self.negative_ttl
+        else:
+            guild_id = invite.guild.id if invite.guild is not None else None
+            ttl = self.ttl
+
+        self._entries[code] = (guild_id, monotonic() + ttl)
+        self._entries.move_to_end(code)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return guild_id
@@ -0,0 +1,90 @@
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+from ..db.async_db import DatabaseWrapper
+from .rank_index import RankIndex
+
+# board name: (query returning user_id, score and extra columns, max age in seconds)
+# Boards with max age None are kept up to date by the cogs that change them.
+BOARDS: Dict[str, Tuple[str, Optional[int]]] = {
+    'levels': (
+        'SELECT user_id, xp_total, level, xp FROM leveling', None),
+    'messages': (
+        'SELECT user_id, messages_count FROM users_stats', None),
+    'achievements': (
+        'SELECT s.user_id, count(a.internal_id) FROM users_stats s '
+        'LEFT JOIN user_achievements a ON a.user_id = s.user_id GROUP BY s.user_id', None),
+    'reputation': (
+        'SELECT user_id, rep_rank FROM users_stats', None),
+}
+
+# counter: board that is updated from the counter_changed events of the counter
+COUNTER_BOARDS: Dict[str, str] = {
+    'reputation': 'reputation',
+}
+
+
+class LeaderboardCache():
+    """
+    Materialized leaderboards kept in memory.
+
+    Every board is loaded with one query at startup and then updated in place
+    as the counters change. Boards that have a max age are reloaded when they
+    are requested after it has passed.
+    """
+
+    def __init__(self, db: DatabaseWrapper) -> None:
+        self.db = db
+        self.boards = {name: RankIndex() for name in BOARDS}
+        self.loaded_at = {name: 0.0 for name in BOARDS}
+
+    def __getitem__(self, board: str) -> RankIndex:
+        return self.boards[board]
+
+    async def refresh(self, board: str) -> None:
+        """
+        Reloads the board from the database
+        """
+        query, _ = BOARDS[board]
+        records = await self.db.records(query)
+        self.boards[board].load(
+            (user_id, score, tuple(data) or None) for user_id, score, *data in records
+        )
+        self.loaded_at[board] = monotonic()
+
+    async def load(self) -> None:
+        for board in BOARDS:
+            await self.refresh(board)
+
+    async def get(self, board: str) -> RankIndex:
+        """
+        Returns the board, reloading it first if it is older than its max age
+        """
+        _, max_age = BOARDS[board]
+        if max_age is not None and monotonic() - self.loaded_at[board] > max_age:
+            await self.refresh(board)
+        return self.boards[board]
+
+    def increment(self, board: str, user_id: int, delta: int) -> None:
+        index = self.boards[board]
+        if user_id in index:
+            index.update(user_id, index.score(user_id) + delta, index.data(user_id))
+
+    async def on_counter_changed(self, user_id: int, counter: str, value: Optional[int]) -> None:
+        """
+        Moves the user on the board that follows the counter
+        """
+        if counter in COUNTER_BOARDS and value is not None:
+            self.boards[COUNTER_BOARDS[counter]].update(user_id, value)
+
+    def add_user(self, user_id: int) -> None:
+        """
+        Adds a new user with zero scores to every board they are not on yet
+        """
+        for name, index in self.boards.items():
+            if user_id not in index:
+                index.update(user_id, 0, (0, 0) if name == 'levels' else None)
+
+    def remove_user(self, user_id: int) -> None:
+        for index in self.boards.values():
+            index.remove(user_id)
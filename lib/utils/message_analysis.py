@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from discord import Guild, Message
+from discord.ext.commands import Context
+from discord.utils import remove_markdown
+
+from .automod import AutoModDetector
+
+
+@dataclass(frozen=True)
+class MessageAnalysis():
+    """
+    Everything the message listeners need to know about a message,
+    computed once per message by ``Bot.analyze_message``.
+
+    ``content`` is ``message.clean_content``, ``text`` is the content without
+    markdown (what the profanity filter checks) and ``lowered`` is the lower
+    case content (what the auto-reply filters check).
+    ``scam`` holds the names of the auto-moderation scam rules the message triggered.
+    """
+    message: Message
+    ctx: Context
+    content: str
+    text: str
+    lowered: str
+    urls: Tuple[str, ...]
+    invites: Tuple[str, ...]
+    emoji_count: int
+    scam: Tuple[str, ...]
+    profanity: bool
+
+    @property
+    def guild(self) -> Optional[Guild]:
+        # Lets the listen_for_guilds / listen_for_dms checks accept the analysis
+        return self.message.guild
+
+    @property
+    def author(self):
+        return self.message.author
+
+    @property
+    def channel(self):
+        return self.message.channel
+
+    @classmethod
+    def build(cls, message: Message, ctx: Context,
+              profanity_filter, automod: AutoModDetector) -> 'MessageAnalysis':
+        content = message.clean_content
+        text = remove_markdown(content)
+        detection = automod.detect(content, message.content)
+
+        return cls(
+            message=message,
+            ctx=ctx,
+            content=content,
+            text=text,
+            lowered=content.lower(),
+            urls=detection.urls,
+            invites=detection.invites,
+            emoji_count=detection.emoji_count,
+            scam=detection.scam,
+            profanity=profanity_filter.contains_profanity(text),
+        )
@@ -0,0 +1,247 @@
+import asyncio
+import os
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+import aiofiles
+
+# Canonical form of a dictionary character: lower case, Latin letters and digits
+# transliterated to the Cyrillic letters they usually stand for.
+CANONICAL: Dict[str, str] = {
+    'ё': 'е',
+    'a': 'а', 'b': 'б', 'c': 'с', 'd': 'д', 'e': 'е', 'f': 'ф', 'g': 'г',
+    'h': 'х', 'i': 'и', 'j': 'й', 'k': 'к', 'l': 'л', 'm': 'м', 'n': 'н',
+    'o': 'о', 'p': 'п', 'q': 'к', 'r': 'р', 's': 'с', 't': 'т', 'u': 'у',
+    'v': 'в', 'w': 'в', 'x': 'х', 'y': 'у', 'z': 'з',
+    '0': 'о', '3': 'з', '6': 'б', '8': 'в',
+}
+
+VOWELS = 'аеиоуыэюя'
+
+# Characters of a message that may stand for several canonical characters
+# (homoglyphs and leetspeak). Every other character stands for its canonical form only.
+VARIANTS: Dict[str, str] = {
+    'b': 'бвь', 'c': 'ск', 'e': 'еэ', 'h': 'хн', 'l': 'ли', 'm': 'мт',
+    'n': 'нп', 'p': 'пр', 'u': 'уив', 'v': 'ву', 'y': 'уйы',
+    '1': 'ил', '3': 'зе', '4': 'ач', '5': 'с', '7': 'т',
+    '@': 'ао', '$': 'с', '*': VOWELS,
+}
+
+WORD_REGEX = re.compile(r'(?:[^\W_]|[@$*"\'])+')
+# Characters that are a part of a word but are not matched
+IGNORED = str.maketrans('', '', '"\'')
+
+END = ''
+
+
+def canonical(word: str) -> str:
+    return ''.join(CANONICAL.get(char, char) for char in word.lower())
+
+
+def split_words(text: str) -> List[str]:
+    """
+    Splits the text into lower case words the same way better_profanity does:
+    letters, digits and @$*"' are word characters, everything else separates words
+    """
+    return [word.translate(IGNORED) for word in WORD_REGEX.findall(text.lower())]
+
+
+class ProfanityMatcher():
+    """
+    Profanity filter compiled into a trie of canonical word forms.
+
+    A message is split into words once and every word is walked through the
+    trie, following all canonical readings of its characters at the same
+    time, so a check costs O(message length) no matter how large the word
+    list is. A swear word split by separators ("х_у_й") is found by continuing
+    the walk into the following words while the trie still has a path.
+    Results are cached, because the same message is checked by several cogs.
+    """
+
+    def __init__(self, cache_size: int = 1024, words_cache_size: int = 10_000) -> None:
+        self.trie: Dict[str, dict] = {}
+        # canonical form: number of dictionary words with this form
+        self.words: Counter = Counter()
+        # dictionary words as they are written in the file, in file order
+        self.source_words: Dict[str, None] = {}
+        self.filename: Optional[str] = None
+        self.cache_size = cache_size
+        self.words_cache_size = words_cache_size
+        self._cache: 'OrderedDict[str, bool]' = OrderedDict()
+        # word: trie nodes reached by walking it from the root
+        self._words_cache: Dict[str, List[dict]] = {}
+        self._variants: Dict[str, FrozenSet[str]] = {
+            char: frozenset(chars) | {CANONICAL.get(char, char)} for char, chars in VARIANTS.items()
+        }
+        self._file_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return canonical(word) in self.words
+
+    @property
+    def changelog(self) -> str:
+        return f'{self.filename}.log'
+
+    def load_censor_words(self, words: Iterable[str]) -> None:
+        """
+        Replaces the word list
+        """
+        self.trie = {}
+        self.words = Counter()
+        self.source_words = {}
+        for word in words:
+            self._add(word)
+        self._clear_caches()
+
+    def load_censor_words_from_file(self, filename: str) -> None:
+        """
+        Loads the word list and applies the changes logged since the last compaction
+        """
+        self.filename = filename
+        with open(filename, 'r', encoding='utf-8') as f:
+            self.load_censor_words(f)
+
+        if os.path.exists(self.changelog):
+            with open(self.changelog, 'r', encoding='utf-8') as f:
+                for line in f:
+                    action, word = line[:1], line[1:]
+                    if action == '+':
+                        self._add(word)
+                    elif action == '-':
+                        self._remove(word)
+            self._clear_caches()
+
+    def _clear_caches(self) -> None:
+        self._cache.clear()
+        self._words_cache.clear()
+
+    def _add(self, word: str) -> bool:
+        word = word.strip().lower()
+        if not word or word in self.source_words:
+            return False
+        self.source_words[word] = None
+
+        form = canonical(word)
+        self.words[form] += 1
+        node = self.trie
+        for char in form:
+            node = node.setdefault(char, {})
+        node[END] = True
+        return True
+
+    def _remove(self, word: str) -> bool:
+        word = word.strip().lower()
+        if word not in self.source_words:
+            return False
+        del self.source_words[word]
+
+        form = canonical(word)
+        self.words[form] -= 1
+        if self.words[form] > 0:
+            return True
+        del self.words[form]
+
+        path = [self.trie]
+        for char in form:
+            path.append(path[-1][char])
+        del path[-1][END]
+        # Drop the nodes that no other word passes through
+        for depth in range(len(form), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][form[depth - 1]]
+        return True
+
+    async def _log_changes(self, action: str, words: List[str]) -> None:
+        if self.filename is None or not words:
+            return
+        async with self._file_lock:
+            async with aiofiles.open(self.changelog, mode='a', encoding='utf-8') as f:
+                await f.write(''.join(f'{action}{word}\n' for word in words))
+
+    async def add_censor_words(self, words: Iterable[str]) -> List[str]:
+        """
+        Adds the words to the compiled dictionary at once and logs the change.
+        Returns the words that were not in the dictionary
+        """
+        added = [word for word in words if self._add(word)]
+        if added:
+            self._clear_caches()
+        await self._log_changes('+', added)
+        return added
+
+    async def remove_censor_words(self, words: Iterable[str]) -> List[str]:
+        """
+        Removes the words from the compiled dictionary at once and logs the change.
+        Returns the words that were in the dictionary
+        """
+        removed = [word for word in words if self._remove(word)]
+        if removed:
+            self._clear_caches()
+        await self._log_changes('-', removed)
+        return removed
+
+    async def compact(self) -> None:
+        """
+        Rewrites the word list file with the current words and empties the change log
+        """
+        if self.filename is None or not os.path.exists(self.changelog):
+            return
+        async with self._file_lock:
+            async with aiofiles.open(f'{self.filename}.tmp', mode='w', encoding='utf-8') as f:
+                await f.write(''.join(f'{word}\n' for word in self.source_words))
+            os.replace(f'{self.filename}.tmp', self.filename)
+            os.remove(self.changelog)
+
+    def _walk(self, nodes: List[dict], word: str) -> List[dict]:
+        for char in word:
+            readings = self._variants.get(char)
+            if readings is None:
+                char = CANONICAL.get(char, char)
+                nodes = [node[char] for node in nodes if char in node]
+            else:
+                nodes = [node[c] for node in nodes for c in readings if c in node]
+            if not nodes:
+                break
+        return nodes
+
+    def _walk_from_root(self, word: str) -> List[dict]:
+        nodes = self._words_cache.get(word)
+        if nodes is None:
+            if len(self._words_cache) >= self.words_cache_size:
+                self._words_cache.clear()
+            nodes = self._words_cache[word] = self._walk([self.trie], word)
+        return nodes
+
+    def _matches(self, words: List[str]) -> Iterator[Tuple[str, ...]]:
+        for i in range(len(words)):
+            nodes = self._walk_from_root(words[i])
+            for j in range(i, len(words)):
+                if j > i:
+                    nodes = self._walk(nodes, words[j])
+                if not nodes:
+                    break
+                if any(END in node for node in nodes):
+                    yield tuple(words[i:j + 1])
+                    break
+
+    def contains_profanity(self, text: str) -> bool:
+        if text in self._cache:
+            self._cache.move_to_end(text)
+            return self._cache[text]
+
+        result = next(self._matches(split_words(text)), None) is not None
+        self._cache[text] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def find_profanity(self, text: str) -> List[Tuple[str, ...]]:
+        """
+        Returns the words (or runs of words) of the text that are profanity
+        """
+        return list(self._matches(split_words(text)))
@@ -0,0 +1,161 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+import asyncpg
+
+from ..db.write_buffer import WriteBehindBuffer
+
+# table: columns of the table that are kept in the profile
+PROFILE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'leveling': ('level', 'xp', 'xp_total', 'xp_lock'),
+    'users_info': ('is_profile_public', 'brief_biography', 'joined_at'),
+    'users_stats': ('invoice_time', 'mutes_story', 'warns_story', 'profanity_triggers'),
+    'durka_stats': ('available_durka_calls', 'received_durka_calls'),
+}
+
+ALIASES = {'leveling': 'l', 'users_info': 'i', 'users_stats': 's', 'durka_stats': 'd'}
+
+PROFILE_QUERY = (
+    'SELECT ' + ', '.join(f'{ALIASES[table]}.{column}'
+                          for table, columns in PROFILE_COLUMNS.items() for column in columns) + ' '
+    'FROM users_info i '
+    'LEFT JOIN leveling l USING (user_id) '
+    'LEFT JOIN users_stats s USING (user_id) '
+    'LEFT JOIN durka_stats d USING (user_id) '
+    'WHERE i.user_id = $1'
+)
+
+
+class ProfileCache():
+    """
+    Per-user profile rows (PROFILE_COLUMNS) kept in memory.
+
+    A profile is loaded with one query on the first request and the least
+    recently used profiles are evicted after ``maxsize``. Writes go through
+    ``update``, ``increment`` and ``add_leveling``, which change the database
+    and the cached profile together. Code that writes these columns directly
+    must call ``invalidate``.
+
+    The leveling columns include the deltas that are still in the leveling
+    write buffer, so they are the values the user actually has.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, leveling_buffer: WriteBehindBuffer, maxsize: int = 2048) -> None:
+        self.pool = pool
+        self.leveling_buffer = leveling_buffer
+        self.maxsize = maxsize
+        self._profiles: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._loading: Dict[int, asyncio.Future] = {}
+        # users that were written while their profile was being loaded
+        self._stale: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._profiles
+
+    async def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of the profile, None if the user is not in the database
+        """
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            self._profiles.move_to_end(user_id)
+            return dict(profile)
+
+        request = self._loading.get(user_id)
+        if request is None:
+            request = self._loading[user_id] = asyncio.ensure_future(self._load(user_id))
+            request.add_done_callback(lambda _: self._loading.pop(user_id, None))
+        profile = await asyncio.shield(request)
+        return dict(profile) if profile is not None else None
+
+    async def _load(self, user_id: int) -> Optional[Dict[str, Any]]:
+        while True:
+            self._stale.discard(user_id)
+            # The lock guarantees the row is not read in the middle of a flush,
+            # so the buffered deltas are applied exactly once.
+            async with self.leveling_buffer.lock:
+                record = await self.pool.fetchrow(PROFILE_QUERY, user_id)
+                pending = self.leveling_buffer.pending(user_id)
+            # A write that was made during the query may be missing from the record
+            if user_id not in self._stale:
+                break
+
+        if record is None:
+            return None
+
+        profile = dict(record)
+        self._merge_leveling(profile, pending)
+        self._profiles[user_id] = profile
+        while len(self._profiles) > self.maxsize:
+            self._profiles.popitem(last=False)
+        return profile
+
+    def _merge_leveling(self, profile: Dict[str, Any], values: Dict[str, Any]) -> None:
+        # Same rules as WriteBehindBuffer: increments are summed, latest keep the maximum
+        for column, value in values.items():
+            if column in self.leveling_buffer.increments:
+                profile[column] = (profile[column] or 0) + value
+            elif profile[column] is None or value > profile[column]:
+                profile[column] = value
+
+    def _apply(self, user_id: int, values: Dict[str, Any]) -> None:
+        if user_id in self._loading:
+            self._stale.add(user_id)
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            profile.update(values)
+
+    def invalidate(self, user_id: int) -> None:
+        if user_id in self._loading:
+            self._stale.add(user_id)
+        self._profiles.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._stale.update(self._loading)
+        self._profiles.clear()
+
+    @staticmethod
+    def _check_columns(table: str, columns) -> None:
+        unknown = set(columns) - set(PROFILE_COLUMNS.get(table, ()))
+        if unknown:
+            raise KeyError(f'Columns {", ".join(sorted(unknown))} of {table} are not in the profile')
+
+    async def update(self, user_id: int, table: str, **values) -> None:
+        """
+        Sets the columns of the user, e.g. ``update(user_id, 'users_info', is_profile_public=False)``
+        """
+        self._check_columns(table, values)
+        assignments = ', '.join(f'{column} = ${i}' for i, column in enumerate(values, start=2))
+        await self.pool.execute(f'UPDATE {table} SET {assignments} WHERE user_id = $1',
+                                user_id, *values.values())
+        self._apply(user_id, values)
+
+    async def increment(self, user_id: int, table: str, **deltas) -> Optional[Dict[str, Any]]:
+        """
+        Adds the deltas to the columns of the user and returns the new values,
+        e.g. ``increment(user_id, 'durka_stats', received_durka_calls=1)``
+        """
+        self._check_columns(table, deltas)
+        assignments = ', '.join(f'{column} = {column} + ${i}' for i, column in enumerate(deltas, start=2))
+        record = await self.pool.fetchrow(
+            f'UPDATE {table} SET {assignments} WHERE user_id = $1 RETURNING {", ".join(deltas)}',
+            user_id, *deltas.values())
+        if record is None:
+            return None
+        values = dict(record)
+        self._apply(user_id, values)
+        return values
+
+    def add_leveling(self, user_id: int, **values) -> None:
+        """
+        Adds the deltas to the leveling write buffer and to the cached profile
+        """
+        # A profile that is being loaded reads the buffer after the row, so it gets the deltas too
+        self.leveling_buffer.add(user_id, **values)
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            self._merge_leveling(profile, values)
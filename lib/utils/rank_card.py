@@ -0,0 +1,226 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from io import BytesIO
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .http_client import HTTPClient
+
+FONT = "./data/fonts/JovannyLemonad-Bender.otf"
+CARD_SIZE = (1000, 240)
+BAR_OFFSET_X, BAR_OFFSET_Y = 320, 160
+BAR_OFFSET_X_1, BAR_OFFSET_Y_1 = 950, 200
+
+
+class RankCard(NamedTuple):
+    """
+    Everything that is drawn on a rank card. Equal cards render to the same image.
+    """
+    user_id: int
+    name: str
+    discriminator: str
+    avatar_url: str
+    status_color: str
+    level: int
+    xp: int
+    xp_end: int
+    rank: int
+    # the stats_customization row without user_id
+    customization: Tuple
+
+
+def prepare_background(data: bytes) -> Image.Image:
+    return Image.open(BytesIO(data)).convert("RGBA").resize(CARD_SIZE)
+
+
+def prepare_avatar(data: bytes) -> Image.Image:
+    icon = Image.open(BytesIO(data)).convert("RGBA").resize((200, 200))
+    big_size = (icon.size[0] * 3, icon.size[1] * 3)
+    mask = Image.new("L", big_size, 0)
+    draw = ImageDraw.Draw(mask)
+    draw.ellipse((0, 0) + big_size, 255)
+    draw.ellipse((140 * 3, 140 * 3, 189 * 3, 189 * 3), 0)
+    mask = mask.resize(icon.size, Image.ANTIALIAS)
+    icon.putalpha(mask)
+    return icon
+
+
+class RankCardRenderer():
+    """
+    Renders rank cards off the event loop.
+
+    Fonts are loaded once. Backgrounds and avatars are downloaded, decoded and
+    resized once per URL and kept (by URL hash) until ``images_cache_size``
+    newer ones push them out. Finished cards are kept by their RankCard, so
+    a repeated ``rank`` of an unchanged user is answered from memory.
+
+    All drawing happens in one worker thread: FreeType fonts must not be
+    used by several threads at once.
+    """
+
+    def __init__(self, http_client: HTTPClient, cache_size: int = 128, images_cache_size: int = 256) -> None:
+        self.http_client = http_client
+        self.big_font = ImageFont.FreeTypeFont(FONT, 75)
+        self.medium_font = ImageFont.FreeTypeFont(FONT, 55)
+        self.small_font = ImageFont.FreeTypeFont(FONT, 40)
+        self.cache_size = cache_size
+        self.images_cache_size = images_cache_size
+        self._cards: 'OrderedDict[RankCard, bytes]' = OrderedDict()
+        self._images: 'OrderedDict[str, Image.Image]' = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rank-card')
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _run(self, func: Callable, *args):
+        return asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    async def _image(self, url: str, prepare: Callable[[bytes], Image.Image]) -> Optional[Image.Image]:
+        key = sha1(url.encode()).hexdigest()
+        if key in self._images:
+            self._images.move_to_end(key)
+            return self._images[key]
+
+        async with self.http_client.get(url) as r:
+            if r.status != 200:
+                return None
+            image = await self._run(prepare, await r.read())
+
+        self._images[key] = image
+        while len(self._images) > self.images_cache_size:
+            self._images.popitem(last=False)
+        return image
+
+    async def render(self, card: RankCard) -> bytes:
+        """
+        Returns the PNG of the card
+        """
+        if card in self._cards:
+            self._cards.move_to_end(card)
+            return self._cards[card]
+
+        background_image = card.customization[1]
+        background = await self._image(background_image, prepare_background) if background_image else None
+        avatar = await self._image(card.avatar_url, prepare_avatar)
+        png = await self._run(self._draw, card, background, avatar)
+
+        self._cards[card] = png
+        while len(self._cards) > self.cache_size:
+            self._cards.popitem(last=False)
+        return png
+
+    def _draw(self, card: RankCard, background: Optional[Image.Image], avatar: Optional[Image.Image]) -> bytes:
+        background_color, _, bar_color, bar_background, level_int_color, \
+        level_str_color, username_color, discriminator_color, xp_start_color, xp_end_color, \
+        placement_int_color, placement_str_color = card.customization
+
+        image = Image.new("RGB", CARD_SIZE, background_color)
+        if background is not None:
+            image.paste(background, (0, 0))
+
+        draw = ImageDraw.Draw(image, "RGB")
+        draw.ellipse((162, 162, 206, 206), fill=card.status_color)
+        if avatar is not None:
+            image.paste(avatar, (20, 20), mask=avatar)
+
+        self.draw_progress_bar(draw, bar_background, bar_color, card.xp, card.xp_end)
+        self.draw_username(draw, card.name, card.discriminator, username_color, discriminator_color)
+        self.draw_level(draw, card.level, level_str_color, level_int_color)
+        self.draw_xp(draw, card.xp, card.xp_end, xp_start_color, xp_end_color)
+        self.draw_rank(draw, card.rank, placement_int_color, placement_str_color)
+
+        byte_io = BytesIO()
+        image.save(byte_io, format='PNG')
+        return byte_io.getvalue()
+
+    def draw_progress_bar(self, draw: ImageDraw.ImageDraw, bar_background: str, bar_color: str,
+                          xp: int, xp_end: int) -> None:
+        bar_length = BAR_OFFSET_X_1 - BAR_OFFSET_X
+        circle_size = BAR_OFFSET_Y_1 - BAR_OFFSET_Y
+        progress = (xp_end - xp) * 100 / xp_end
+        progress = 100 - progress
+        progress_bar_length = round(bar_length * progress / 100)
+
+        draw.rectangle(
+            (BAR_OFFSET_X, BAR_OFFSET_Y, BAR_OFFSET_X_1, BAR_OFFSET_Y_1),
+            fill=bar_background
+        )
+        draw.ellipse(
+            (BAR_OFFSET_X - circle_size // 2, BAR_OFFSET_Y,
+             BAR_OFFSET_X + circle_size // 2, BAR_OFFSET_Y_1),
+            fill=bar_background
+        )
+        draw.ellipse(
+            (BAR_OFFSET_X_1 - circle_size // 2, BAR_OFFSET_Y,
+             BAR_OFFSET_X_1 + circle_size // 2, BAR_OFFSET_Y_1),
+            fill=bar_background
+        )
+
+        bar_offset_x_1 = BAR_OFFSET_X + progress_bar_length
+        draw.rectangle(
+            (BAR_OFFSET_X, BAR_OFFSET_Y, bar_offset_x_1, BAR_OFFSET_Y_1), fill=bar_color)
+        draw.ellipse(
+            (BAR_OFFSET_X - circle_size // 2, BAR_OFFSET_Y,
+             BAR_OFFSET_X + circle_size // 2, BAR_OFFSET_Y_1),
+            fill=bar_color
+        )
+        draw.ellipse(
+            (bar_offset_x_1 - circle_size // 2, BAR_OFFSET_Y,
+             bar_offset_x_1 + circle_size // 2, BAR_OFFSET_Y_1),
+            fill=bar_color
+        )
+
+    def draw_username(self, draw: ImageDraw.ImageDraw, username: str, discriminator: str,
+                      name_color: str, discriminator_color: str) -> None:
+        discriminator = f'#{discriminator}'
+
+        text_size = draw.textsize(username, font=self.medium_font)
+        offset_x = BAR_OFFSET_X
+        offset_y = 10
+        draw.text((offset_x, offset_y), username,
+                  font=self.medium_font, fill=name_color)
+        offset_x += text_size[0] + 5
+        offset_y += 10
+        draw.text((offset_x, offset_y), discriminator,
+                  font=self.small_font, fill=discriminator_color)
+
+    def draw_level(self, draw: ImageDraw.ImageDraw, level: int, level_str_color: str, level_int_color: str) -> None:
+        text_size = draw.textsize("Уровень", font=self.medium_font)
+        offset_x = BAR_OFFSET_X
+        offset_y = BAR_OFFSET_Y - text_size[1] - 10
+        draw.text((offset_x, offset_y), "Уровень",
+                  font=self.medium_font, fill=level_str_color)
+
+        offset_x += text_size[0] + 5
+        text_size = draw.textsize(str(level), font=self.big_font)
+        offset_y = BAR_OFFSET_Y - text_size[1] - 10
+        draw.text((offset_x, offset_y), str(level),
+                  font=self.big_font, fill=level_int_color)
+
+    def draw_xp(self, draw: ImageDraw.ImageDraw, xp_start: int, xp_end: int,
+                xp_start_color: str, xp_end_color: str) -> None:
+        text_size = draw.textsize(
+            f"/ {xp_end} XP", font=self.small_font)
+        offset_x = BAR_OFFSET_X_1 - text_size[0]
+        offset_y = BAR_OFFSET_Y - text_size[1] - 9
+        draw.text(
+            (offset_x, offset_y), f"/ {xp_end:,} XP", font=self.small_font, fill=xp_end_color)
+        text_size = draw.textsize(f"{xp_start:,}", font=self.small_font)
+        offset_x -= text_size[0] + 8
+        draw.text((offset_x, offset_y),
+                  f"{xp_start:,}", font=self.small_font, fill=xp_start_color)
+
+    def draw_rank(self, draw: ImageDraw.ImageDraw, rank: int, placement_int_color: str,
+                  placement_str_color: str) -> None:
+        text_size = draw.textsize(f"#{rank}", font=self.medium_font)
+        offset_x = BAR_OFFSET_X_1 - text_size[0] + 15
+        offset_y = 10
+        draw.text((offset_x, offset_y),
+                  f"#{rank}", font=self.medium_font, fill=placement_int_color)
+        text_size = draw.textsize("Ранг", font=self.small_font)
+        offset_x -= text_size[0] + 5
+        draw.text((offset_x, offset_y + 15), "Ранг",
+                  font=self.small_font, fill=placement_str_color)
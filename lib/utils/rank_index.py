@@ -0,0 +1,67 @@
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class RankIndex():
+    """
+    In-memory ordered index of users by score (highest score first).
+
+    Lookups of a user's position are O(log N) binary searches over a sorted
+    list of ``(-score, user_id)`` keys; ties are broken by user id.
+    """
+
+    def __init__(self) -> None:
+        self._order: List[Tuple[int, int]] = []
+        self._scores: Dict[int, int] = {}
+        self._data: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._scores
+
+    def load(self, records: Iterable[Tuple[int, int, Any]]) -> None:
+        """
+        Replaces the index content with (user_id, score, data) records
+        """
+        records = list(records)
+        self._scores = {user_id: score for user_id, score, _ in records}
+        self._data = {user_id: data for user_id, _, data in records}
+        self._order = sorted((-score, user_id) for user_id, score in self._scores.items())
+
+    def update(self, user_id: int, score: int, data: Any = None) -> None:
+        """
+        Inserts the user or moves them to the position of the new score
+        """
+        if user_id in self._scores:
+            self._order.pop(bisect_left(self._order, (-self._scores[user_id], user_id)))
+        self._scores[user_id] = score
+        self._data[user_id] = data
+        insort(self._order, (-score, user_id))
+
+    def remove(self, user_id: int) -> None:
+        if user_id not in self._scores:
+            return
+        self._order.pop(bisect_left(self._order, (-self._scores.pop(user_id), user_id)))
+        self._data.pop(user_id, None)
+
+    def score(self, user_id: int) -> Optional[int]:
+        return self._scores.get(user_id)
+
+    def data(self, user_id: int) -> Any:
+        return self._data.get(user_id)
+
+    def position(self, user_id: int) -> Optional[int]:
+        """
+        Returns the 1-based position of the user or None if the user is not indexed
+        """
+        if user_id not in self._scores:
+            return None
+        return bisect_left(self._order, (-self._scores[user_id], user_id)) + 1
+
+    def page(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, int, Any]]:
+        """
+        Returns (user_id, score, data) records of the given slice of the ranking
+        """
+        return [(user_id, -score, self._data[user_id]) for score, user_id in self._order[start:stop]]
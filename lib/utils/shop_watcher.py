@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from hashlib import sha1
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from .http_client import HTTPClient
+
+ITEM_SHOP_ENDPOINT = 'https://fortnite-api.com/v2/shop/br/combined'
+# The shop rotates every day at 00:00 UTC
+ROTATION_WINDOW = (timedelta(minutes=-5), timedelta(minutes=30))
+ROTATION_INTERVAL = 30
+IDLE_INTERVAL = 300
+
+
+class ShopWatcher():
+    """
+    Watches the combined Item Shop of fortnite-api.com for a new rotation.
+
+    ``poll`` sends the ETag and Last-Modified of the previous response, so
+    an unchanged shop costs a 304. A 200 with the same body as before is
+    recognized by hash and not parsed. Only a parsed shop with a different
+    ``hash`` or number of entries is returned.
+
+    The last shop hash is kept in memory and saved to ``path`` on change,
+    it is read from there once, on ``load``.
+    """
+
+    def __init__(self, http_client: HTTPClient, language: str = 'ru',
+                 path: str = 'athena/athena_cache.json') -> None:
+        self.http_client = http_client
+        self.language = language
+        self.path = path
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.digest: Optional[str] = None
+        self.hash: Optional[str] = None
+        self.len: Optional[int] = None
+
+    def _run(self, func, *args):
+        return asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, cache: Dict[str, Any]) -> None:
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+    async def load(self) -> None:
+        try:
+            cache = await self._run(self._read)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Shop cache {self.path} is unreadable: {e!r}')
+            return
+        if cache is not None:
+            self.hash, self.len = cache.get('hash'), cache.get('len')
+
+    @staticmethod
+    def interval(now: Optional[datetime] = None) -> int:
+        """
+        Returns the seconds to wait after a poll at ``now``, short around the daily rotation
+        """
+        now = now or datetime.utcnow()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        for rotation in (midnight, midnight + timedelta(days=1)):
+            if ROTATION_WINDOW[0] <= now - rotation <= ROTATION_WINDOW[1]:
+                return ROTATION_INTERVAL
+        return IDLE_INTERVAL
+
+    @classmethod
+    def next_interval(cls, scheduled: float, now: Optional[datetime] = None) -> int:
+        """
+        Returns the interval to set on the polling loop during a poll at ``now``.
+
+        discord.ext.tasks schedules the next poll before it runs the current
+        one, so a new interval only applies after the poll that is already
+        ``scheduled`` seconds away, and it is computed for that poll.
+        """
+        now = now or datetime.utcnow()
+        return cls.interval(now + timedelta(seconds=scheduled))
+
+    async def poll(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the ``data`` of the shop if it changed since the last poll
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        async with self.http_client.get(ITEM_SHOP_ENDPOINT, params={'language': self.language},
+                                        headers=headers) as r:
+            if r.status == 304:
+                return None
+            if r.status != 200:
+                logger.warning(f'Item shop was not downloaded: {r.status}')
+                return None
+            body = await r.read()
+            self.etag = r.headers.get('ETag')
+            self.last_modified = r.headers.get('Last-Modified')
+
+        digest = sha1(body).hexdigest()
+        if digest == self.digest:
+            return None
+        self.digest = digest
+
+        shop = json.loads(body)['data']
+        new_len = len(shop['featured']['entries']) + len(shop['daily']['entries'])
+        if shop['hash'] == self.hash and new_len == self.len:
+            return None
+
+        self.hash, self.len = shop['hash'], new_len
+        cache = {'hash': self.hash, 'date': datetime.now().strftime('%d.%m.%Y %H:%M:%S'), 'len': self.len}
+        await self._run(self._write, cache)
+        return shop
@@ -4,7 +4,7 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 import aiofiles
 import asyncpg
@@ -12,7 +12,8 @@ import discord
 from discord.ext import commands
 from discord.ext.buttons import Paginator
 
-from ..db import async_db, db
+from ..db import async_db
+from .event_bus import event_bus
 
 
 class Pag(Paginator):
@@ -65,12 +66,41 @@ async def insert_new_user_in_db(db: async_db.DatabaseWrapper, pool: asyncpg.Pool
     await try_to_restore_stats(pool, member)
 
 
+async def insert_new_users_in_db(pool: asyncpg.Pool, members: List[discord.Member]) -> None:
+    """Adds data of several users to the database in bulk"""
+
+    if not members:
+        return
+
+    tables = [
+        'casino', 'durka_stats', 'leveling', 'users_stats',
+        'stats_customization'
+    ]
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            for table in tables:
+                await conn.copy_records_to_table(
+                    table, records=[(member.id,) for member in members], columns=['user_id'])
+
+            await conn.copy_records_to_table(
+                'users_info',
+                records=[(member.id, member.display_name, member.joined_at, member.mention)
+                         for member in members],
+                columns=['user_id', 'nickname', 'joined_at', 'mention'])
+
+    backups = {file.split('_')[0] for file in os.listdir('./data/users_backup/')}
+    for member in members:
+        if str(member.id) in backups:
+            await try_to_restore_stats(pool, member)
+
+
 async def delete_user_from_db(pool: asyncpg.Pool, user_id: int):
     """Deletes user data from the database"""
 
     tables = (
         'casino', 'durka_stats', 'fn_profiles', 'leveling',
-        'users_stats', 'users_info', 'stats_customization'
+        'users_stats', 'users_info', 'stats_customization',
+        'user_achievements', 'purchases'
     )
 
     for table in tables:
@@ -102,6 +132,10 @@ async def dump_user_data_in_json(pool: asyncpg.Pool, member: discord.Member) ->
             temp[key] = value
         data[table] = temp
 
+    for table in ('user_achievements', 'purchases'):
+        data[table] = [dict(record) for record in
+                       await pool.fetch(f'SELECT * FROM {table} WHERE user_id = $1', member.id)]
+
     data['users_stats']['roles'] = [role.name for role in member.roles]
 
     timestamp = int(datetime.now().timestamp())
@@ -123,6 +157,7 @@ async def try_to_restore_stats(pool: asyncpg.Pool, member: discord.Member) -> No
     if (rep_rank := data['users_stats']['rep_rank']) < 0:
         await pool.execute("UPDATE users_stats SET rep_rank = $1 WHERE user_id = $2",
                            rep_rank, member.id)
+        event_bus.publish('counter_changed', member.id, 'reputation', rep_rank)
 
     if (lost_rep := data['users_stats']['lost_reputation']) > 0:
         await pool.execute("UPDATE users_stats SET lost_reputation = $1 WHERE user_id = $2",
@@ -155,29 +190,32 @@ def find_n_term_of_arithmetic_progression(a1: int, d: int, n: int) -> int:
 
 async def edit_user_reputation(pool: asyncpg.Pool, user_id: int = None, action: str = None, value: int = None):
     if action == '+':
-        await pool.execute("UPDATE users_stats SET rep_rank = rep_rank + $1 WHERE user_id = $2",
-                           value, user_id)
+        rep_rank = await pool.fetchval("UPDATE users_stats SET rep_rank = rep_rank + $1 WHERE user_id = $2 "
+                                       "RETURNING rep_rank", value, user_id)
     elif action == '-':
-        await pool.execute("UPDATE users_stats SET rep_rank = rep_rank - $1 WHERE user_id = $2",
-                           value, user_id)
-        await pool.execute("UPDATE users_stats SET lost_reputation = lost_reputation + $1 WHERE user_id = $2",
-                           value, user_id)
+        rep_rank = await pool.fetchval("UPDATE users_stats SET rep_rank = rep_rank - $1, "
+                                       "lost_reputation = lost_reputation + $1 WHERE user_id = $2 "
+                                       "RETURNING rep_rank", value, user_id)
     elif action == '=':
-        await pool.execute("UPDATE users_stats SET rep_rank = $1 WHERE user_id = $2",
-                           value, user_id)
+        rep_rank = await pool.fetchval("UPDATE users_stats SET rep_rank = $1 WHERE user_id = $2 "
+                                       "RETURNING rep_rank", value, user_id)
+    else:
+        return
+
+    if rep_rank is not None:
+        event_bus.publish('counter_changed', user_id, 'reputation', rep_rank)
 
 
-def edit_user_messages_count(user_id: int = None, action: str = None, value: int = None):
+async def edit_user_messages_count(pool: asyncpg.Pool, user_id: int = None, action: str = None, value: int = None):
     if action == '+':
-        db.execute("UPDATE users_stats SET messages_count = messages_count + %s WHERE user_id = %s",
-                   value, user_id)
+        await pool.execute("UPDATE users_stats SET messages_count = messages_count + $1 WHERE user_id = $2",
+                           value, user_id)
     elif action == '-':
-        db.execute("UPDATE users_stats SET messages_count = messages_count - %s WHERE user_id = %s",
-                   value, user_id)
+        await pool.execute("UPDATE users_stats SET messages_count = messages_count - $1 WHERE user_id = $2",
+                           value, user_id)
     elif action == '=':
-        db.execute("UPDATE users_stats SET messages_count = %s WHERE user_id = %s",
-                   value, user_id)
-    db.commit()
+        await pool.execute("UPDATE users_stats SET messages_count = $1 WHERE user_id = $2",
+                           value, user_id)
 
 
 def cooldown_timer_str(retry_after: float) -> str:
@@ -238,8 +276,8 @@ async def get_command_text_channels(cmd: commands.Command) -> str:
 
 async def check_member_privacy(pool: asyncpg.Pool, ctx: commands.Context, member: discord.Member) -> bool:
     """Check the member's privacy settings"""
-    privacy_flag = await pool.fetchval('SELECT is_profile_public FROM users_info WHERE user_id = $1', member.id)
-    if privacy_flag is False:
+    profile = await ctx.bot.profiles.get(member.id)
+    if profile is not None and profile['is_profile_public'] is False:
         return False
     else:
         return True